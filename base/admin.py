@@ -46,7 +46,7 @@ class ContentAdmin(admin.ModelAdmin):
     :attr ContentAdmin.exclude: Controls which fields should be excluded
     :type ContentAdmin.exclude: list[str]
     """
-    readonly_fields = ['creation_date']
+    readonly_fields = ['creation_date', 'rating_average', 'rating_count']
     exclude = ['preview']
 
 
@@ -15,3 +15,14 @@ class BaseConfig(AppConfig):
     :type BaseConfig.name: str
     """
     name = 'base'
+
+    def ready(self):
+        """Ready
+
+        Connects the receivers which keep the search index and the thumbnails up to date
+        and which discard revisions without changes.
+        """
+        # pylint: disable=import-outside-toplevel, unused-import
+        import base.revisions
+        import base.search
+        import base.thumbnails
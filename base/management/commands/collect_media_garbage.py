@@ -0,0 +1,52 @@
+"""Purpose of this file
+
+This file contains the management command to delete the media blobs without references.
+"""
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from base.storage import ContentAddressedStorage
+
+
+class Command(BaseCommand):
+    """Collect media garbage
+
+    Recounts the references of the blobs of the content-addressed media storage and
+    deletes the blobs which are no longer referenced by any file field or stored version.
+
+    :attr Command.help: The help text of the command
+    :type Command.help: str
+    """
+    help = 'Deletes the media blobs which are no longer referenced'
+
+    def add_arguments(self, parser):
+        """Add arguments
+
+        Adds the arguments of the command.
+
+        :param parser: The parser of the arguments
+        :type parser: CommandParser
+        """
+        parser.add_argument('--grace-period', type=int,
+                            help='Minimum age in seconds of a deleted blob, defaults to the '
+                                 'setting MEDIA_BLOB_GRACE_PERIOD')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only show how many blobs would be deleted')
+
+    def handle(self, *args, **options):
+        """Handle
+
+        Executes the command.
+
+        :param args: The arguments
+        :type args: Any
+        :param options: The options of the command
+        :type options: dict[str, Any]
+        """
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError('The default storage is not content-addressed')
+        count, size = default_storage.collect_garbage(options['grace_period'],
+                                                      options['dry_run'])
+        action = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{action} {count} blobs ({size} bytes)'))
@@ -0,0 +1,54 @@
+"""Purpose of this file
+
+This file contains the management command to delete the old versions of the history.
+"""
+
+from django.core.management.base import BaseCommand
+
+from base.revisions import RevisionPolicy
+
+
+class Command(BaseCommand):
+    """Prune revisions
+
+    Deletes the versions which are older than the retention period and not among the
+    latest versions of their object, and the revisions which have no versions left. The
+    media blobs of the deleted versions are deleted by the command collect_media_garbage.
+
+    :attr Command.help: The help text of the command
+    :type Command.help: str
+    """
+    help = 'Deletes the old versions of the history'
+
+    def add_arguments(self, parser):
+        """Add arguments
+
+        Adds the arguments of the command.
+
+        :param parser: The parser of the arguments
+        :type parser: CommandParser
+        """
+        parser.add_argument('--days', type=int,
+                            help='Minimum age in days of a deleted version, defaults to the '
+                                 'setting REVERSION_RETENTION_DAYS')
+        parser.add_argument('--keep', type=int,
+                            help='Number of latest versions of each object which are kept, '
+                                 'defaults to the setting REVERSION_RETENTION_COUNT')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only show how many versions would be deleted')
+
+    def handle(self, *args, **options):
+        """Handle
+
+        Executes the command.
+
+        :param args: The arguments
+        :type args: Any
+        :param options: The options of the command
+        :type options: dict[str, Any]
+        """
+        versions, revisions = RevisionPolicy.prune(options['days'], options['keep'],
+                                                   options['dry_run'])
+        action = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{action} {versions} versions and '
+                                             f'{revisions} revisions'))
@@ -0,0 +1,34 @@
+"""Purpose of this file
+
+This file contains the management command to rebuild the precomputed rating
+aggregates of all contents.
+"""
+
+from django.core.management.base import BaseCommand
+
+from base.models import Content
+
+
+class Command(BaseCommand):
+    """Rebuild rating aggregates
+
+    Recomputes the average and the number of ratings of every content from the
+    stored ratings, e.g. after ratings were changed directly in the database.
+
+    :attr Command.help: The help text of the command
+    :type Command.help: str
+    """
+    help = 'Rebuilds the precomputed rating aggregates of all contents'
+
+    def handle(self, *args, **options):
+        """Handle
+
+        Executes the command.
+
+        :param args: The arguments
+        :type args: Any
+        :param options: The options of the command
+        :type options: dict[str, Any]
+        """
+        count = Content.rebuild_rating_aggregates()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating aggregates of {count} contents'))
@@ -0,0 +1,33 @@
+"""Purpose of this file
+
+This file contains the management command to rebuild the full-text search index.
+"""
+
+from django.core.management.base import BaseCommand
+
+from base.search import SearchIndex
+
+
+class Command(BaseCommand):
+    """Rebuild search index
+
+    Rebuilds the search documents of all courses, topics and contents, e.g. after
+    migrating existing data or after changes directly in the database.
+
+    :attr Command.help: The help text of the command
+    :type Command.help: str
+    """
+    help = 'Rebuilds the full-text search index of all courses, topics and contents'
+
+    def handle(self, *args, **options):
+        """Handle
+
+        Executes the command.
+
+        :param args: The arguments
+        :type args: Any
+        :param options: The options of the command
+        :type options: dict[str, Any]
+        """
+        count = SearchIndex.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} search documents'))
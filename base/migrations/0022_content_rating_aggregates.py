@@ -0,0 +1,34 @@
+# Generated by Django 3.2.20 on 2026-10-18 04:02
+
+from django.db import migrations, models
+from django.db.models import Avg, Count
+
+
+class Migration(migrations.Migration):
+
+    def fill_rating_aggregates(apps, schema_editor):
+        Content = apps.get_model("base", "Content")
+        contents = list(Content.objects.annotate(avg=Avg('rating__rating'),
+                                                 count=Count('rating')))
+        for content in contents:
+            content.rating_average = content.avg
+            content.rating_count = content.count
+        Content.objects.bulk_update(contents, ['rating_average', 'rating_count'], batch_size=500)
+
+    dependencies = [
+        ('base', '0021_display_name_required'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='content',
+            name='rating_average',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Average rating'),
+        ),
+        migrations.AddField(
+            model_name='content',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Number of ratings'),
+        ),
+        migrations.RunPython(fill_rating_aggregates, migrations.RunPython.noop),
+    ]
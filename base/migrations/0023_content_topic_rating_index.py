@@ -0,0 +1,17 @@
+# Generated by Django 3.2.20 on 2026-10-18 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0022_content_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['topic', '-rating_average'], name='content_topic_rating_idx'),
+        ),
+    ]
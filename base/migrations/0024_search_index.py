@@ -0,0 +1,63 @@
+# Generated by Django 3.2.20 on 2026-10-18 04:22
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    def create_fts_table(apps, schema_editor):
+        # Only SQLite builds with FTS5 support get the table, else the search terms are used
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        try:
+            schema_editor.execute("CREATE VIRTUAL TABLE base_searchdocument_fts USING "
+                                  "fts5(title, body, tokenize='unicode61 remove_diacritics 2', "
+                                  "prefix='2 3')")
+        except OperationalError:
+            pass
+
+    def drop_fts_table(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            schema_editor.execute("DROP TABLE IF EXISTS base_searchdocument_fts")
+
+    dependencies = [
+        ('base', '0023_content_topic_rating_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('course', 'Course'), ('topic', 'Topic'), ('content', 'Content')], max_length=10, verbose_name='Kind')),
+                ('object_id', models.PositiveIntegerField(verbose_name='Object ID')),
+                ('title', models.TextField(blank=True, verbose_name='Title')),
+                ('body', models.TextField(blank=True, verbose_name='Body')),
+            ],
+            options={
+                'verbose_name': 'Search Document',
+                'verbose_name_plural': 'Search Documents',
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100, verbose_name='Term')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Weight')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='terms', to='base.searchdocument', verbose_name='Search Document')),
+            ],
+            options={
+                'verbose_name': 'Search Term',
+                'verbose_name_plural': 'Search Terms',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchterm',
+            index=models.Index(fields=['term', 'document'], name='searchterm_term_idx'),
+        ),
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
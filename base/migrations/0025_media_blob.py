@@ -0,0 +1,27 @@
+# Generated by Django 3.2.20 on 2026-10-18 04:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0024_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Name')),
+                ('size', models.PositiveBigIntegerField(default=0, verbose_name='Size')),
+                ('references', models.PositiveIntegerField(default=0, verbose_name='References')),
+                ('creation_date', models.DateTimeField(auto_now_add=True, verbose_name='Creation Date')),
+            ],
+            options={
+                'verbose_name': 'Media Blob',
+                'verbose_name_plural': 'Media Blobs',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.20 on 2026-10-18 04:50
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+class Migration(migrations.Migration):
+
+    def delete_duplicate_favorites(apps, schema_editor):
+        Favorite = apps.get_model("base", "Favorite")
+        # Keep the first favorite of each content in the coursebook of a user
+        earlier = Favorite.objects.filter(user=OuterRef('user'), course=OuterRef('course'),
+                                          content=OuterRef('content'), pk__lt=OuterRef('pk'))
+        Favorite.objects.filter(Exists(earlier)).delete()
+
+    dependencies = [
+        ('base', '0025_media_blob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['content', '-creation_date'], name='comment_content_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='content',
+            index=models.Index(fields=['topic', '-creation_date'], name='content_topic_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coursestructureentry',
+            index=models.Index(fields=['course', 'index'], name='structure_course_index_idx'),
+        ),
+        migrations.RunPython(delete_duplicate_favorites, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='favorite',
+            constraint=models.UniqueConstraint(fields=('user', 'course', 'content'), name='favorite_user_course_content_uniq'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.20 on 2026-10-18 05:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0026_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediablob',
+            name='last_saved',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Last Saved'),
+        ),
+    ]
@@ -6,8 +6,8 @@ content of the course book and can be registered in admin.py.
 """
 
 from django.conf import settings
-from django.db import models
-from django.db.models import Avg, Count
+from django.db import models, transaction
+from django.db.models import Avg, Count, F
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -204,6 +204,17 @@ class Course(models.Model):
         """
         return self.topics.order_by('child_topic__index')
 
+    def count_contents(self):
+        """Count contents
+
+        Returns the number of contents of the topics in the structure of this course.
+        A course list annotates the number as content_count instead.
+
+        :return: the number of contents
+        :rtype: int
+        """
+        return Content.objects.filter(topic__child_topic__course=self).count()
+
     def __str__(self):
         """String representation
 
@@ -269,7 +280,25 @@ class Topic(models.Model):
         :return: the sorted and filtered contents belonging to this topic
         :rtype: QuerySet[Content]
         """
-        contents = self.contents.all()
+        return Topic.sort_and_filter_contents(self.contents.all(), sorted_by, filtered_by)
+
+    @staticmethod
+    def sort_and_filter_contents(contents, sorted_by, filtered_by):
+        """Sort and filter contents
+
+        Sorts and filters the given contents the same way as the contents of a topic
+        are sorted and filtered in the course view.
+
+        :param contents: The contents to sort and filter
+        :type contents: QuerySet[Content]
+        :param sorted_by: The sorting value which the content should be sorted
+        :type sorted_by: str
+        :param filtered_by: The filtered value which the content should be filtered
+        :type filtered_by: str
+
+        :return: the sorted and filtered contents
+        :rtype: QuerySet[Content]
+        """
         # filtered by is a String and represents the decision of the user
         # , how they want to filter the data,
         # e.g. 'Text' means they want to only see all text fields in the topic
@@ -283,7 +312,8 @@ class Topic(models.Model):
         # and the String represent their decision
         if sorted_by != 'None' and sorted_by is not None:
             if sorted_by == 'Rating':
-                contents = sorted(contents, key=lambda x: x.get_rate(), reverse=True)
+                # Sort on the stored rating aggregates, unrated contents last
+                contents = contents.order_by(F('rating_average').desc(nulls_last=True), 'pk')
             elif sorted_by == 'Date':
                 contents = contents.order_by('-' + 'creation_date')
             else:
@@ -364,6 +394,10 @@ class Content(models.Model):
     :type Content.preview: ImageField
     :attr Content.ratings: The ratings from the user to the content
     :type Content.ratings: ManyToManyField - Profile
+    :attr Content.rating_average: The precomputed average of all ratings of the content
+    :type Content.rating_average: FloatField
+    :attr Content.rating_count: The precomputed number of ratings of the content
+    :type Content.rating_count: PositiveIntegerField
     """
     topic = models.ForeignKey(Topic, verbose_name=_("Topic"),
                               related_name='contents',
@@ -402,6 +436,15 @@ class Content(models.Model):
     ratings = models.ManyToManyField("Profile",
                                      through='Rating')
 
+    # Denormalized rating aggregates, kept current by update_rating_aggregates
+    rating_average = models.FloatField(verbose_name=_("Average rating"),
+                                       blank=True,
+                                       null=True,
+                                       editable=False)
+    rating_count = models.PositiveIntegerField(verbose_name=_("Number of ratings"),
+                                               default=0,
+                                               editable=False)
+
     class Meta:
         """Meta options
 
@@ -411,9 +454,15 @@ class Content(models.Model):
         :type Meta.verbose_name: __proxy__
         :attr Meta.verbose_name_plural: A human-readable name for the object in plural
         :type Meta.verbose_name_plural: __proxy__
+        :attr Meta.indexes: The indexes to define on the model
+        :type Meta.indexes: list[Index]
         """
         verbose_name = _("Content")
         verbose_name_plural = _("Contents")
+        indexes = [
+            models.Index(fields=['topic', '-rating_average'], name='content_topic_rating_idx'),
+            models.Index(fields=['topic', '-creation_date'], name='content_topic_date_idx'),
+        ]
 
     def __str__(self):
         """String representation
@@ -443,35 +492,69 @@ class Content(models.Model):
         """Total number of ratings
 
         Returns the amount number of ratings to this content and 0 if there are no ratings present.
+        The value is read from the precomputed rating aggregates.
 
         :return: the amount of ratings
         :rtype: int
 
         """
-        return Rating.objects.filter(content_id=self.id).aggregate(Count('rating'))['rating__count']
+        return self.rating_count
 
     def get_rate(self):
         """Average rating
 
         Returns the average number of ratings and -1 if there are no ratings present.
+        The value is read from the precomputed rating aggregates.
 
         :return: the average number of ratings
         :rtype: float
         """
-        rating = Rating.objects.filter(content_id=self.id).aggregate(Avg('rating'))['rating__avg']
-        if rating is not None:
-            return int(rating)
+        if self.rating_average is not None:
+            return int(self.rating_average)
         return -1
 
     def get_rate_count(self):
         """ Ratings count
 
-        Returns the total count of ratings.
+        Returns the total count of ratings. The value is read from the precomputed
+        rating aggregates.
 
         :return: the total count of ratings
         :rtype: int
         """
-        return self.ratings.count()
+        return self.rating_count
+
+    def update_rating_aggregates(self):
+        """Update rating aggregates
+
+        Recomputes the average and the number of ratings of this content with a single
+        aggregate query and stores them. The values are written with an update query,
+        so no model signals are sent and no revision is created.
+        """
+        aggregates = Rating.objects.filter(content_id=self.id).aggregate(Avg('rating'),
+                                                                         Count('rating'))
+        self.rating_average = aggregates['rating__avg']
+        self.rating_count = aggregates['rating__count']
+        Content.objects.filter(pk=self.pk).update(rating_average=self.rating_average,
+                                                  rating_count=self.rating_count)
+
+    @staticmethod
+    def rebuild_rating_aggregates():
+        """Rebuild rating aggregates
+
+        Recomputes the rating aggregates of all contents from the stored ratings.
+
+        :return: the number of contents whose aggregates were rebuilt
+        :rtype: int
+        """
+        contents = list(Content.objects.annotate(avg=Avg('rating__rating'),
+                                                 count=Count('rating'))
+                        .only('pk', 'rating_average', 'rating_count'))
+        for content in contents:
+            content.rating_average = content.avg
+            content.rating_count = content.count
+        Content.objects.bulk_update(contents, ['rating_average', 'rating_count'], batch_size=500)
+        return len(contents)
 
     def user_already_rated(self, user):
         """Already rated
@@ -505,17 +588,18 @@ class Content(models.Model):
     def rate_content(self, user, rating):
         """Content rating
 
-        Rates the content by the given rating of the user.
+        Rates the content by the given rating of the user. The rating is stored and the
+        rating aggregates are updated in one transaction, the content itself is not saved,
+        so no revision is created.
 
         :param rating: The rating of content by the user
-        :type rating: Rating
+        :type rating: int
         :param user: The user of the rating
-        :type user: User
+        :type user: Profile
         """
-        Rating.objects.filter(user_id=user.user.id, content_id=self.id).delete()
-        rating = Rating.objects.create(user=user, content=self, rating=rating)  # user = profile
-        rating.save()
-        self.save()
+        with transaction.atomic():
+            Rating.upsert(self.pk, user.pk, rating)
+            self.update_rating_aggregates()
 
     def get_index_in_course(self, course):
         """Index in the course structure
@@ -568,9 +652,15 @@ class CourseStructureEntry(models.Model):
         :type Meta.verbose_name: __proxy__
         :attr Meta.verbose_name_plural: A human-readable name for the object in plural
         :type Meta.verbose_name_plural: __proxy__
+        :attr Meta.indexes: The indexes to define on the model
+        :type Meta.indexes: list[Index]
         """
         verbose_name = _("Course Structure Entry")
         verbose_name_plural = _("Course Structure Entries")
+        # Not unique, the indexes are shifted one entry at a time when the structure changes
+        indexes = [
+            models.Index(fields=['course', 'index'], name='structure_course_index_idx'),
+        ]
 
     def __str__(self):
         """String representation
@@ -41,9 +41,16 @@ class Favorite(models.Model):
         :type Meta.verbose_name: __proxy__
         :attr Meta.verbose_name_plural: A human-readable name for the object in plural
         :type Meta.verbose_name_plural: __proxy__
+        :attr Meta.constraints: The constraints to define on the model
+        :type Meta.constraints: list[UniqueConstraint]
         """
         verbose_name = _("Favorite")
         verbose_name_plural = _("Favorites")
+        # The unique index also serves the lookups of the coursebook of a user
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'course', 'content'],
+                                    name='favorite_user_course_content_uniq'),
+        ]
 
     def __str__(self):
         """String representation
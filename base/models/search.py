@@ -0,0 +1,130 @@
+"""Purpose of this file
+
+This file describes or defines the full-text search index of the course book.
+"""
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class SearchDocument(models.Model):
+    """Search document
+
+    This model represents an indexed object of the search. A document stores the
+    searchable text of a course, a topic or a content: the title and the body text. The
+    documents are kept up to date by the search index whenever the objects are saved or
+    deleted.
+
+    :attr SearchDocument.COURSE: The kind of a document of a course
+    :type SearchDocument.COURSE: str
+    :attr SearchDocument.TOPIC: The kind of a document of a topic
+    :type SearchDocument.TOPIC: str
+    :attr SearchDocument.CONTENT: The kind of a document of a content
+    :type SearchDocument.CONTENT: str
+    :attr SearchDocument.KIND_CHOICES: The choices of the kind
+    :type SearchDocument.KIND_CHOICES: list[tuple[str, str]]
+    :attr SearchDocument.kind: The kind of the indexed object
+    :type SearchDocument.kind: CharField
+    :attr SearchDocument.object_id: The id of the indexed object
+    :type SearchDocument.object_id: PositiveIntegerField
+    :attr SearchDocument.title: The indexed title of the object
+    :type SearchDocument.title: TextField
+    :attr SearchDocument.body: The indexed body text of the object
+    :type SearchDocument.body: TextField
+    """
+    COURSE = 'course'
+    TOPIC = 'topic'
+    CONTENT = 'content'
+
+    KIND_CHOICES = [
+        (COURSE, _('Course')),
+        (TOPIC, _('Topic')),
+        (CONTENT, _('Content')),
+    ]
+
+    kind = models.CharField(verbose_name=_("Kind"),
+                            max_length=10,
+                            choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField(verbose_name=_("Object ID"))
+    title = models.TextField(verbose_name=_("Title"),
+                             blank=True)
+    body = models.TextField(verbose_name=_("Body"),
+                            blank=True)
+
+    class Meta:
+        """Meta options
+
+        This class handles all possible meta options that you can give to this model.
+
+        :attr Meta.verbose_name: A human-readable name for the object in singular
+        :type Meta.verbose_name: __proxy__
+        :attr Meta.verbose_name_plural: A human-readable name for the object in plural
+        :type Meta.verbose_name_plural: __proxy__
+        :attr Meta.unique_together: Sets of field names that, taken together, must be unique
+        :type Meta.unique_together: tuple[str, str]
+        """
+        verbose_name = _("Search Document")
+        verbose_name_plural = _("Search Documents")
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        """String representation
+
+        Returns the string representation of this object.
+
+        :return: the string representation of this object
+        :rtype: str
+        """
+        return f"{self.kind} {self.object_id}: {self.title}"
+
+
+class SearchTerm(models.Model):
+    """Search term
+
+    This model represents an entry of the inverted index which is used if the database
+    does not support SQLite FTS5. Each term of a document is stored once with a weight
+    which counts the occurrences of the term, occurrences in the title count more.
+
+    :attr SearchTerm.document: The document containing the term
+    :type SearchTerm.document: ForeignKey - SearchDocument
+    :attr SearchTerm.term: The normalized term
+    :type SearchTerm.term: CharField
+    :attr SearchTerm.weight: The weight of the term in the document
+    :type SearchTerm.weight: PositiveIntegerField
+    """
+    document = models.ForeignKey(SearchDocument,
+                                 verbose_name=_("Search Document"),
+                                 on_delete=models.CASCADE,
+                                 related_name='terms')
+    term = models.CharField(verbose_name=_("Term"),
+                            max_length=100)
+    weight = models.PositiveIntegerField(verbose_name=_("Weight"),
+                                         default=1)
+
+    class Meta:
+        """Meta options
+
+        This class handles all possible meta options that you can give to this model.
+
+        :attr Meta.verbose_name: A human-readable name for the object in singular
+        :type Meta.verbose_name: __proxy__
+        :attr Meta.verbose_name_plural: A human-readable name for the object in plural
+        :type Meta.verbose_name_plural: __proxy__
+        :attr Meta.indexes: The indexes to define on the model
+        :type Meta.indexes: list[Index]
+        """
+        verbose_name = _("Search Term")
+        verbose_name_plural = _("Search Terms")
+        indexes = [
+            models.Index(fields=['term', 'document'], name='searchterm_term_idx'),
+        ]
+
+    def __str__(self):
+        """String representation
+
+        Returns the string representation of this object.
+
+        :return: the string representation of this object
+        :rtype: str
+        """
+        return f"{self.term} ({self.weight}) in {self.document_id}"
@@ -3,7 +3,7 @@
 This file describes or defines the social interaction in the course book.
 """
 
-from django.db import models
+from django.db import connection, models
 from django.utils.translation import gettext_lazy as _
 
 
@@ -67,6 +67,33 @@ class Rating(models.Model):
         """
         return f"Rating for {self.content} by {self.user}"
 
+    @staticmethod
+    def upsert(content_id, user_id, rating):
+        """Upsert
+
+        Stores the rating of the user for the content, an existing rating of the user is
+        replaced. On SQLite and PostgreSQL the rating is stored with a single statement,
+        so that concurrent ratings of the same user do not conflict.
+
+        :param content_id: The id of the rated content
+        :type content_id: int
+        :param user_id: The id of the profile of the rating user
+        :type user_id: int
+        :param rating: The rating number
+        :type rating: int
+        """
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            Rating.objects.update_or_create(content_id=content_id, user_id=user_id,
+                                            defaults={'rating': rating})
+            return
+        table = connection.ops.quote_name(Rating._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f'INSERT INTO {table} (content_id, user_id, rating) '
+                           'VALUES (%s, %s, %s) '
+                           'ON CONFLICT (content_id, user_id) '
+                           'DO UPDATE SET rating = excluded.rating',
+                           [content_id, user_id, rating])
+
 
 class Comment(models.Model):
     """Comment
@@ -113,9 +140,14 @@ class Comment(models.Model):
         :type Meta.verbose_name: __proxy__
         :param Meta.verbose_name_plural: A human-readable name for the object in plural
         :type Meta.verbose_name_plural: __proxy__
+        :attr Meta.indexes: The indexes to define on the model
+        :type Meta.indexes: list[Index]
         """
         verbose_name = _("Comment")
         verbose_name_plural = _("Comments")
+        indexes = [
+            models.Index(fields=['content', '-creation_date'], name='comment_content_date_idx'),
+        ]
 
     def __str__(self):
         """String representation
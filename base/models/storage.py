@@ -0,0 +1,64 @@
+"""Purpose of this file
+
+This file describes or defines the blobs of the content-addressed media storage.
+"""
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class MediaBlob(models.Model):
+    """Media blob
+
+    This model represents a file of the content-addressed media storage. The name of a
+    blob is derived from the hash of its content, so identical uploads share one blob.
+    The number of references is counted by the storage whenever a file is saved or
+    deleted and recounted from the file fields by the garbage collection, which deletes
+    the blobs without references once they have not been saved for a grace period.
+
+    :attr MediaBlob.name: The name of the blob in the storage
+    :type MediaBlob.name: CharField
+    :attr MediaBlob.size: The size of the blob in bytes
+    :type MediaBlob.size: PositiveBigIntegerField
+    :attr MediaBlob.references: The number of file fields which reference the blob
+    :type MediaBlob.references: PositiveIntegerField
+    :attr MediaBlob.creation_date: The creation date of the blob
+    :type MediaBlob.creation_date: DateTimeField
+    :attr MediaBlob.last_saved: The date when a file was last saved as the blob
+    :type MediaBlob.last_saved: DateTimeField
+    """
+    name = models.CharField(verbose_name=_("Name"),
+                            max_length=100,
+                            unique=True)
+    size = models.PositiveBigIntegerField(verbose_name=_("Size"),
+                                          default=0)
+    references = models.PositiveIntegerField(verbose_name=_("References"),
+                                             default=0)
+    creation_date = models.DateTimeField(verbose_name=_("Creation Date"),
+                                         auto_now_add=True)
+    last_saved = models.DateTimeField(verbose_name=_("Last Saved"),
+                                      default=timezone.now)
+
+    class Meta:
+        """Meta options
+
+        This class handles all possible meta options that you can give to this model.
+
+        :attr Meta.verbose_name: A human-readable name for the object in singular
+        :type Meta.verbose_name: __proxy__
+        :attr Meta.verbose_name_plural: A human-readable name for the object in plural
+        :type Meta.verbose_name_plural: __proxy__
+        """
+        verbose_name = _("Media Blob")
+        verbose_name_plural = _("Media Blobs")
+
+    def __str__(self):
+        """String representation
+
+        Returns the string representation of this object.
+
+        :return: the string representation of this object
+        :rtype: str
+        """
+        return f"{self.name} ({self.references})"
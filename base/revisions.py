@@ -0,0 +1,153 @@
+"""Purpose of this file
+
+This file contains the revision policy of the versioned models: revisions which do not
+change any version are discarded and old versions can be pruned.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reversion.models import Revision, Version
+from reversion.signals import post_revision_commit
+
+
+class RevisionPolicy:
+    """Revision policy
+
+    This class decides which revisions are kept. Revisions are only created by the edit
+    views, a revision whose versions have the same serialized data as the previous
+    versions of their objects is deleted again, e.g. if a form is saved without changes.
+    The versions which are older than the setting REVERSION_RETENTION_DAYS and not among
+    the REVERSION_RETENTION_COUNT latest versions of their object can be pruned.
+    """
+
+    @staticmethod
+    def is_duplicate(revision, versions):
+        """Is duplicate
+
+        Returns whether every version of a revision has the same serialized data as the
+        previous version of its object.
+
+        :param revision: The revision
+        :type revision: Revision
+        :param versions: The versions of the revision
+        :type versions: list[Version]
+
+        :return: true if the revision does not change any object
+        :rtype: bool
+        """
+        if not versions:
+            return False
+        for version in versions:
+            previous = Version.objects \
+                .filter(content_type_id=version.content_type_id, object_id=version.object_id,
+                        db=version.db, revision_id__lt=revision.pk) \
+                .order_by('-pk').values_list('serialized_data', flat=True).first()
+            if previous != version.serialized_data:
+                return False
+        return True
+
+    @staticmethod
+    def expired_versions(days=None, keep=None):
+        """Expired versions
+
+        Returns the versions which are older than the given number of days and not among
+        the latest versions of their object. Only the versions older than the retention
+        period are looked at, the newer versions of each of their objects are counted in
+        the database.
+
+        :param days: The minimum age of a pruned version in days, the setting
+        REVERSION_RETENTION_DAYS by default
+        :type days: int or None
+        :param keep: The number of latest versions of each object which are kept, the
+        setting REVERSION_RETENTION_COUNT by default
+        :type keep: int or None
+
+        :return: the expired versions
+        :rtype: QuerySet[Version]
+        """
+        if days is None:
+            days = settings.REVERSION_RETENTION_DAYS
+        if keep is None:
+            keep = settings.REVERSION_RETENTION_COUNT
+        versions = Version.objects.filter(
+            revision__date_created__lt=RevisionPolicy.expiry_date(days))
+        if keep <= 0:
+            return versions
+        newer = Version.objects \
+            .filter(content_type_id=OuterRef('content_type_id'), object_id=OuterRef('object_id'),
+                    db=OuterRef('db'), pk__gt=OuterRef('pk')) \
+            .order_by().values('db').annotate(count=Count('pk')).values('count')
+        return versions.annotate(newer=Coalesce(Subquery(newer), 0)).filter(newer__gte=keep)
+
+    @staticmethod
+    def expiry_date(days):
+        """Expiry date
+
+        Returns the date before which the versions are older than the retention period.
+
+        :param days: The retention period in days
+        :type days: int
+
+        :return: the expiry date
+        :rtype: datetime
+        """
+        return timezone.now() - timedelta(days=days)
+
+    @staticmethod
+    def prune(days=None, keep=None, dry_run=False):
+        """Prune
+
+        Deletes the expired versions and the revisions which have no versions left.
+
+        :param days: The minimum age of a pruned version in days, the setting
+        REVERSION_RETENTION_DAYS by default
+        :type days: int or None
+        :param keep: The number of latest versions of each object which are kept, the
+        setting REVERSION_RETENTION_COUNT by default
+        :type keep: int or None
+        :param dry_run: Only count the versions and revisions which would be deleted
+        :type dry_run: bool
+
+        :return: the number of deleted versions and revisions
+        :rtype: tuple[int, int]
+        """
+        if days is None:
+            days = settings.REVERSION_RETENTION_DAYS
+        with transaction.atomic():
+            expired = RevisionPolicy.expired_versions(days, keep)
+            versions, _ = Version.objects.filter(pk__in=expired.values('pk')).delete()
+            # Only the revisions of the deleted versions are old enough to be empty now
+            revisions, _ = Revision.objects \
+                .filter(date_created__lt=RevisionPolicy.expiry_date(days), version__isnull=True) \
+                .delete()
+            # The dry run counts the deleted objects of the rolled back transaction
+            if dry_run:
+                transaction.set_rollback(True)
+        return versions, revisions
+
+
+@receiver(post_revision_commit)
+def delete_duplicate_revision(sender, revision, versions, **kwargs):
+    # pylint: disable=unused-argument
+    """Delete duplicate revision
+
+    Deletes a committed revision which does not change any of its objects.
+
+    :param sender: The sender of the signal
+    :type sender: Any
+    :param revision: The committed revision
+    :type revision: Revision
+    :param versions: The versions of the revision
+    :type versions: list[Version]
+    :param kwargs: The keyword arguments
+    :type kwargs: Any
+    """
+    if RevisionPolicy.is_duplicate(revision, versions):
+        revision.delete()
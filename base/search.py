@@ -0,0 +1,473 @@
+"""Purpose of this file
+
+This file contains the full-text search index of courses, topics and contents.
+"""
+
+import re
+import unicodedata
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from base.models import Content, Course, SearchDocument, SearchTerm, Topic
+
+
+class SearchIndex:
+    """Search index
+
+    This class maintains the inverted index of the search. Course titles and descriptions,
+    topic titles, content descriptions and the text bodies of the contents are stored as
+    search documents, which are updated whenever the objects are saved or deleted.
+
+    If the database is SQLite with FTS5 support, the documents are additionally stored in
+    the FTS5 table created by the migrations and ranked with bm25. Otherwise the terms of
+    each document are stored in the table of SearchTerm and ranked by their weights. In
+    both cases a search is answered with a single query and the last term of the query
+    also matches as a prefix.
+
+    :attr SearchIndex.fts_table: The name of the FTS5 table
+    :type SearchIndex.fts_table: str
+    :attr SearchIndex.title_weight: The weight of the title compared to the body
+    :type SearchIndex.title_weight: int
+    :attr SearchIndex.max_term_length: The maximum length of an indexed term
+    :type SearchIndex.max_term_length: int
+    """
+    fts_table = 'base_searchdocument_fts'
+    title_weight = 10
+    max_term_length = 100
+
+    # Pattern: LaTeX commands, e.g. \section
+    _latex_command = re.compile(r'\\[a-zA-Z]+')
+    _term = re.compile(r'\w+')
+    _fts = {}
+
+    @staticmethod
+    def fts_enabled():
+        """FTS enabled
+
+        Returns whether the FTS5 table exists in the current database. The migrations
+        only create it if the database is SQLite with FTS5 support.
+
+        :return: true if the FTS5 table is used
+        :rtype: bool
+        """
+        if connection.vendor != 'sqlite':
+            return False
+        name = connection.settings_dict['NAME']
+        if name not in SearchIndex._fts:
+            with connection.cursor() as cursor:
+                SearchIndex._fts[name] = SearchIndex.fts_table in \
+                    connection.introspection.table_names(cursor)
+        return SearchIndex._fts[name]
+
+    @staticmethod
+    def tokenize(text):
+        """Tokenize
+
+        Splits the text into lower case terms without diacritics.
+
+        :param text: The text to split
+        :type text: str
+
+        :return: the terms of the text
+        :rtype: list[str]
+        """
+        text = unicodedata.normalize('NFKD', text or '')
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+        return [term[:SearchIndex.max_term_length]
+                for term in SearchIndex._term.findall(text.lower())]
+
+    @staticmethod
+    def content_bodies(ids=None):
+        """Content bodies
+
+        Returns the body texts of the contents with a text field, e.g. Textfield, Markdown
+        and LaTeX contents, with one query per content type. LaTeX commands are removed.
+        The extracted text of the PDFs of the contents is appended.
+
+        :param ids: The ids of the contents or None for all contents
+        :type ids: list[int] or None
+
+        :return: the body texts by the ids of the contents
+        :rtype: dict[int, str]
+        """
+        # pylint: disable=import-outside-toplevel
+        from content.models import CONTENT_TYPES, PDFPageText
+
+        bodies = {}
+        for model in CONTENT_TYPES.values():
+            try:
+                model._meta.get_field('textfield')  # pylint: disable=protected-access
+            except FieldDoesNotExist:
+                continue
+            texts = model.objects.all()
+            if ids is not None:
+                texts = texts.filter(content_id__in=ids)
+            for content_id, text in texts.values_list('content_id', 'textfield'):
+                if model.TYPE == 'Latex':
+                    text = SearchIndex._latex_command.sub(' ', text)
+                bodies[content_id] = text
+        pages = PDFPageText.objects.all()
+        if ids is not None:
+            pages = pages.filter(content_id__in=ids)
+        for content_id, text in pages.order_by('content_id', 'page') \
+                .values_list('content_id', 'text'):
+            bodies[content_id] = f'{bodies.get(content_id, "")}\n{text}'
+        return bodies
+
+    @staticmethod
+    def index(kind, object_id, title, body):
+        """Index
+
+        Stores or updates the search document of an object.
+
+        :param kind: The kind of the object
+        :type kind: str
+        :param object_id: The id of the object
+        :type object_id: int
+        :param title: The title of the object
+        :type title: str
+        :param body: The body text of the object
+        :type body: str
+        """
+        with transaction.atomic():
+            document, _ = SearchDocument.objects.update_or_create(
+                kind=kind, object_id=object_id, defaults={'title': title, 'body': body})
+            if SearchIndex.fts_enabled():
+                with connection.cursor() as cursor:
+                    cursor.execute(f'INSERT OR REPLACE INTO {SearchIndex.fts_table} '
+                                   f'(rowid, title, body) VALUES (%s, %s, %s)',
+                                   [document.pk, title, body])
+                return
+            weights = Counter()
+            for term in SearchIndex.tokenize(title):
+                weights[term] += SearchIndex.title_weight
+            weights.update(SearchIndex.tokenize(body))
+            document.terms.all().delete()
+            SearchTerm.objects.bulk_create(SearchTerm(document=document, term=term, weight=weight)
+                                           for term, weight in weights.items())
+
+    @staticmethod
+    def remove(kind, object_id):
+        """Remove
+
+        Removes the search document of an object. It is called while the object is
+        deleted, i.e. within the transaction of the deletion.
+
+        :param kind: The kind of the object
+        :type kind: str
+        :param object_id: The id of the object
+        :type object_id: int
+        """
+        if SearchIndex.fts_enabled():
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {SearchIndex.fts_table} WHERE rowid IN '
+                               f'(SELECT id FROM base_searchdocument '
+                               f'WHERE kind = %s AND object_id = %s)', [kind, object_id])
+        SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+    @staticmethod
+    def index_course(course):
+        """Index course
+
+        Indexes the title and the description of the course.
+
+        :param course: The course to index
+        :type course: Course
+        """
+        SearchIndex.index(SearchDocument.COURSE, course.pk, course.title, course.description)
+
+    @staticmethod
+    def index_topic(topic):
+        """Index topic
+
+        Indexes the title of the topic.
+
+        :param topic: The topic to index
+        :type topic: Topic
+        """
+        SearchIndex.index(SearchDocument.TOPIC, topic.pk, topic.title, '')
+
+    @staticmethod
+    def index_content(content, body=None):
+        """Index content
+
+        Indexes the description and the body text of the content.
+
+        :param content: The content to index
+        :type content: Content
+        :param body: The body text of the content, it is loaded if it is not given
+        :type body: str or None
+        """
+        if body is None:
+            body = SearchIndex.content_bodies([content.pk]).get(content.pk, '')
+        SearchIndex.index(SearchDocument.CONTENT, content.pk, content.description, body)
+
+    @staticmethod
+    def rebuild():
+        """Rebuild
+
+        Rebuilds the whole search index from the courses, topics and contents.
+
+        :return: the number of indexed documents
+        :rtype: int
+        """
+        with transaction.atomic():
+            if SearchIndex.fts_enabled():
+                with connection.cursor() as cursor:
+                    cursor.execute(f'DELETE FROM {SearchIndex.fts_table}')
+            SearchDocument.objects.all().delete()
+            for course in Course.objects.iterator():
+                SearchIndex.index_course(course)
+            for topic in Topic.objects.iterator():
+                SearchIndex.index_topic(topic)
+            bodies = SearchIndex.content_bodies()
+            for content in Content.objects.iterator():
+                SearchIndex.index_content(content, bodies.get(content.pk, ''))
+        return SearchDocument.objects.count()
+
+    @staticmethod
+    def search(query, kinds=None, limit=None, after=None):
+        """Search
+
+        Searches the documents matching all terms of the query with a single query. The
+        last term also matches as a prefix, e.g. while the query is still typed.
+
+        :param query: The search query
+        :type query: str
+        :param kinds: The kinds of the documents to search or None for all kinds
+        :type kinds: list[str] or None
+        :param limit: The maximum number of documents or None for all documents
+        :type limit: int or None
+        :param after: The cursor of the last document of the previous page
+        :type after: str or None
+
+        :return: the matching documents ordered by their rank, best first, each document
+        has its rank in the attribute rank
+        :rtype: list[SearchDocument]
+        """
+        return list(SearchIndex.documents(query, kinds, limit, after))
+
+    @staticmethod
+    def documents(query, kinds=None, limit=None, after=None):
+        """Documents
+
+        Returns the lazy query of the documents matching the query, see search. The
+        documents can be iterated with iterator() while they are fetched from the
+        database.
+
+        :param query: The search query
+        :type query: str
+        :param kinds: The kinds of the documents to search or None for all kinds
+        :type kinds: list[str] or None
+        :param limit: The maximum number of documents or None for all documents
+        :type limit: int or None
+        :param after: The cursor of the last document of the previous page
+        :type after: str or None
+
+        :return: the matching documents ordered by their rank
+        :rtype: QuerySet[SearchDocument] or RawQuerySet
+        """
+        terms = list(dict.fromkeys(SearchIndex.tokenize(query)))
+        if not terms:
+            return SearchDocument.objects.none()
+        after = SearchIndex.parse_cursor(after)
+        if SearchIndex.fts_enabled():
+            return SearchIndex._search_fts(terms, kinds, limit, after)
+        return SearchIndex._search_terms(terms, kinds, limit, after)
+
+    @staticmethod
+    def cursor(document):
+        """Cursor
+
+        Returns the cursor of a found document. The next page of the search starts after
+        the document with this cursor.
+
+        :param document: The found document
+        :type document: SearchDocument
+
+        :return: the cursor of the document
+        :rtype: str
+        """
+        return f'{document.rank!r}:{document.pk}'
+
+    @staticmethod
+    def parse_cursor(cursor):
+        """Parse cursor
+
+        Returns the rank and the id of the document of a cursor.
+
+        :param cursor: The cursor
+        :type cursor: str or None
+
+        :return: the rank and the id or None if the cursor is not valid
+        :rtype: tuple[float, int] or None
+        """
+        try:
+            rank, pk = cursor.split(':')
+            return float(rank), int(pk)
+        except (AttributeError, ValueError):
+            return None
+
+    @staticmethod
+    def _search_fts(terms, kinds, limit, after):
+        """Search FTS
+
+        Searches the FTS5 table, the documents are ranked with bm25.
+
+        :param terms: The terms of the query
+        :type terms: list[str]
+        :param kinds: The kinds of the documents to search or None for all kinds
+        :type kinds: list[str] or None
+        :param limit: The maximum number of documents or None for all documents
+        :type limit: int or None
+        :param after: The rank and the id of the last document of the previous page
+        :type after: tuple[float, int] or None
+
+        :return: the matching documents ordered by their rank
+        :rtype: RawQuerySet
+        """
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        params = [SearchIndex.title_weight, match]
+        kind_filter = ''
+        if kinds is not None:
+            kind_filter = f' AND document.kind IN ({", ".join(["%s"] * len(kinds))})'
+            params.extend(kinds)
+        page_filter = ''
+        if after is not None:
+            page_filter = ' WHERE rank < %s OR (rank = %s AND id > %s)'
+            params.extend([after[0], after[0], after[1]])
+        page_limit = ''
+        if limit is not None:
+            page_limit = ' LIMIT %s'
+            params.append(limit)
+        table = SearchIndex.fts_table
+        return SearchDocument.objects.raw(
+            f'SELECT * FROM (SELECT document.id, document.kind, document.object_id, '
+            f'document.title, document.body, -bm25({table}, %s, 1.0) AS rank '
+            f'FROM {table} JOIN base_searchdocument document ON document.id = {table}.rowid '
+            f'WHERE {table} MATCH %s{kind_filter}) AS ranked{page_filter} '
+            f'ORDER BY rank DESC, id{page_limit}',
+            params)
+
+    @staticmethod
+    def _search_terms(terms, kinds, limit, after):
+        """Search terms
+
+        Searches the inverted index of the search terms, the documents are ranked by the
+        summed weights of the matching terms.
+
+        :param terms: The terms of the query
+        :type terms: list[str]
+        :param kinds: The kinds of the documents to search or None for all kinds
+        :type kinds: list[str] or None
+        :param limit: The maximum number of documents or None for all documents
+        :type limit: int or None
+        :param after: The rank and the id of the last document of the previous page
+        :type after: tuple[float, int] or None
+
+        :return: the matching documents ordered by their rank
+        :rtype: QuerySet[SearchDocument]
+        """
+        matches = [Q(terms__term=term) for term in terms[:-1]]
+        matches.append(Q(terms__term__startswith=terms[-1]))
+        documents = SearchDocument.objects.filter(reduce(or_, matches))
+        if kinds is not None:
+            documents = documents.filter(kind__in=kinds)
+        # Every term of the query has to match
+        counts = {f'match_{i}': Count('terms', filter=match) for i, match in enumerate(matches)}
+        documents = documents.annotate(rank=Sum('terms__weight'), **counts) \
+            .filter(**{f'{name}__gt': 0 for name in counts}) \
+            .order_by('-rank', 'pk')
+        if after is not None:
+            documents = documents.filter(Q(rank__lt=after[0]) | Q(rank=after[0], pk__gt=after[1]))
+        if limit is not None:
+            documents = documents[:limit]
+        return documents
+
+
+@receiver(post_save, sender=Course)
+def index_course(sender, instance, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """Index course
+
+    Updates the search document of a saved course.
+
+    :param sender: The model class
+    :type sender: type
+    :param instance: The saved course
+    :type instance: Course
+    :param raw: Whether the course is saved exactly as presented, e.g. from a fixture
+    :type raw: bool
+    :param kwargs: The keyword arguments
+    :type kwargs: Any
+    """
+    if not raw:
+        SearchIndex.index_course(instance)
+
+
+@receiver(post_save, sender=Topic)
+def index_topic(sender, instance, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """Index topic
+
+    Updates the search document of a saved topic.
+
+    :param sender: The model class
+    :type sender: type
+    :param instance: The saved topic
+    :type instance: Topic
+    :param raw: Whether the topic is saved exactly as presented, e.g. from a fixture
+    :type raw: bool
+    :param kwargs: The keyword arguments
+    :type kwargs: Any
+    """
+    if not raw:
+        SearchIndex.index_topic(instance)
+
+
+@receiver(post_save, sender=Content)
+@receiver(post_save, sender='content.TextField')
+@receiver(post_save, sender='content.MDContent')
+@receiver(post_save, sender='content.Latex')
+def index_content(sender, instance, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """Index content
+
+    Updates the search document of a saved content or of the content of a saved
+    content type.
+
+    :param sender: The model class
+    :type sender: type
+    :param instance: The saved content or content type
+    :type instance: Content or BaseContentModel
+    :param raw: Whether the object is saved exactly as presented, e.g. from a fixture
+    :type raw: bool
+    :param kwargs: The keyword arguments
+    :type kwargs: Any
+    """
+    if not raw:
+        SearchIndex.index_content(instance if isinstance(instance, Content) else instance.content)
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Topic)
+@receiver(post_delete, sender=Content)
+def remove_document(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Remove document
+
+    Removes the search document of a deleted course, topic or content.
+
+    :param sender: The model class
+    :type sender: type
+    :param instance: The deleted object
+    :type instance: Course or Topic or Content
+    :param kwargs: The keyword arguments
+    :type kwargs: Any
+    """
+    kinds = {Course: SearchDocument.COURSE, Topic: SearchDocument.TOPIC,
+             Content: SearchDocument.CONTENT}
+    SearchIndex.remove(kinds[sender], instance.pk)
@@ -0,0 +1,324 @@
+"""Purpose of this file
+
+This file contains the content-addressed storage of the uploaded media files.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from base.models import MediaBlob
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Content-addressed storage
+
+    This storage stores the content of each saved file once as a blob named by its
+    SHA-256 hash, e.g. blobs/3f/3f2a....pdf. The name of the saved file keeps the hash and
+    the original file name, e.g. blobs/3f2a.../script.pdf, and is mapped to the blob when
+    the file is accessed. Identical files, e.g. the attachments of a duplicated content or
+    a LaTeX PDF which is compiled again after a revert, are written only once and share
+    one blob.
+
+    The storage counts the references of each blob: saving a file adds a reference and
+    deleting a file removes one. A blob is never deleted directly, since file fields can
+    also share a blob by copying its name. Blobs without references are deleted by the
+    garbage collection of the management command collect_media_garbage, which recounts
+    the references from the file fields and the stored versions.
+
+    :attr ContentAddressedStorage.blob_folder: The folder of the blobs
+    :type ContentAddressedStorage.blob_folder: str
+    :attr ContentAddressedStorage.max_length: The maximum length of the name of a file
+    :type ContentAddressedStorage.max_length: int
+    :attr ContentAddressedStorage.batch_size: The number of blobs which are deleted at once
+    :type ContentAddressedStorage.batch_size: int
+    """
+    blob_folder = 'blobs'
+    max_length = 100
+    batch_size = 500
+
+    # Pattern: The name of a saved file, e.g. blobs/3f2a.../script.pdf
+    _file_name = re.compile(r'blobs/([0-9a-f]{64})/[^"/\\]+')
+
+    def blob_name(self, digest, name):
+        """Blob name
+
+        Returns the name of the blob of a file. The extension of the file is kept, so
+        that the blob is served with the correct content type.
+
+        :param digest: The hex digest of the content of the file
+        :type digest: str
+        :param name: The name of the file
+        :type name: str
+
+        :return: the name of the blob
+        :rtype: str
+        """
+        extension = os.path.splitext(name)[1].lower()
+        return f'{self.blob_folder}/{digest[:2]}/{digest}{extension}'
+
+    def blob(self, name):
+        """Blob
+
+        Returns the name of the blob of a saved file.
+
+        :param name: The name of the saved file
+        :type name: str
+
+        :return: the name of the blob or None if the file is not stored as a blob
+        :rtype: str or None
+        """
+        match = self._file_name.fullmatch(name or '')
+        if match is None:
+            return None
+        return self.blob_name(match.group(1), name)
+
+    def path(self, name):
+        """Path
+
+        Returns the path of a file, the path of the blob for a saved file.
+
+        :param name: The name of the file
+        :type name: str
+
+        :return: the path of the file
+        :rtype: str
+        """
+        return super().path(self.blob(name) or name)
+
+    def url(self, name):
+        """URL
+
+        Returns the URL of a file, the URL of the blob for a saved file.
+
+        :param name: The name of the file
+        :type name: str
+
+        :return: the URL of the file
+        :rtype: str
+        """
+        return super().url(self.blob(name) or name)
+
+    def _save(self, name, content):
+        """Save
+
+        Saves the content as a blob unless an identical blob already exists and adds a
+        reference to the blob.
+
+        :param name: The name of the file
+        :type name: str
+        :param content: The content of the file
+        :type content: File
+
+        :return: the name of the saved file
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        blob_name = self.blob_name(digest, name)
+        if not self.exists(blob_name):
+            self.write_blob(blob_name, content)
+        with transaction.atomic():
+            blob, _ = MediaBlob.objects.get_or_create(name=blob_name,
+                                                      defaults={'size': self.size(blob_name)})
+            # Restarts the grace period of the garbage collection
+            MediaBlob.objects.filter(pk=blob.pk).update(references=F('references') + 1,
+                                                        last_saved=timezone.now())
+
+        # Shortens the original file name, so that the name fits into the file field
+        prefix = f'{self.blob_folder}/{digest}/'
+        stem, extension = os.path.splitext(os.path.basename(name))
+        stem = stem[:max(1, self.max_length - len(prefix) - len(extension))]
+        return f'{prefix}{stem}{extension}'
+
+    def write_blob(self, blob_name, content):
+        """Write blob
+
+        Writes the content into a temporary file next to the blob and moves it to the
+        name of the blob. If the same content is saved concurrently, the blob is replaced
+        by an identical file, so the blob always keeps the name of its digest instead of
+        being saved under an alternative name.
+
+        :param blob_name: The name of the blob
+        :type blob_name: str
+        :param content: The content of the file
+        :type content: File
+        """
+        path = super().path(blob_name)
+        directory = os.path.dirname(path)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                for chunk in content.chunks():
+                    file.write(chunk)
+            # The temporary file is only readable by its owner, a new file gets the
+            # permissions of the umask
+            mode = self.file_permissions_mode
+            if mode is None:
+                umask = os.umask(0)
+                os.umask(umask)
+                mode = 0o666 & ~umask
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def delete(self, name):
+        """Delete
+
+        Removes a reference of a blob, the blob itself is deleted by the garbage
+        collection. Files which are not stored as blobs are deleted directly.
+
+        :param name: The name of the file
+        :type name: str
+        """
+        blob_name = self.blob(name)
+        if blob_name is None:
+            super().delete(name)
+            return
+        MediaBlob.objects.filter(name=blob_name, references__gt=0) \
+            .update(references=F('references') - 1)
+
+    def file_fields(self):
+        """File fields
+
+        Returns the file fields of all models which are stored in this storage.
+
+        :return: the default managers of the models and the names of their file fields
+        :rtype: list[tuple[Manager, str]]
+        """
+        return [(model._default_manager, field.attname)
+                for model in apps.get_models() for field in model._meta.concrete_fields
+                if isinstance(field, models.FileField)
+                and isinstance(field.storage, ContentAddressedStorage)]
+
+    def is_referenced(self, name):
+        """Is referenced
+
+        Returns whether a file field of any model references the blob of a saved file.
+
+        :param name: The name of the saved file
+        :type name: str
+
+        :return: true if the blob is referenced
+        :rtype: bool
+        """
+        blob_name = self.blob(name)
+        if blob_name is None:
+            return False
+        prefix = f'{os.path.dirname(name)}/'
+        return any(manager.filter(**{f'{field}__startswith': prefix}).exists()
+                   for manager, field in self.file_fields())
+
+    def count_references(self):
+        """Count references
+
+        Counts the references of the blobs by the file fields of all models and by the
+        stored versions of django-reversion, which can restore a file on a revert.
+
+        :return: the number of references of each referenced blob
+        :rtype: Counter[str]
+        """
+        references = Counter()
+        for manager, field in self.file_fields():
+            names = manager.filter(**{f'{field}__startswith': f'{self.blob_folder}/'}) \
+                .values_list(field, flat=True)
+            references.update(filter(None, map(self.blob, names)))
+        if apps.is_installed('reversion'):
+            versions = apps.get_model('reversion', 'Version').objects \
+                .filter(serialized_data__contains=f'{self.blob_folder}/')
+            for data in versions.values_list('serialized_data', flat=True).iterator():
+                # Keeps the blobs of the versions without counting them as references
+                references.update({self.blob(match.group()): 0
+                                   for match in self._file_name.finditer(data)})
+        return references
+
+    def blob_files(self):
+        """Blob files
+
+        Returns the names of all blob files in the storage.
+
+        :return: the names of the blob files
+        :rtype: list[str]
+        """
+        if not self.exists(self.blob_folder):
+            return []
+        return [f'{self.blob_folder}/{folder}/{file}'
+                for folder in self.listdir(self.blob_folder)[0]
+                for file in self.listdir(f'{self.blob_folder}/{folder}')[1]]
+
+    def collect_garbage(self, grace_period=None, dry_run=False):
+        """Collect garbage
+
+        Recounts the references of all blobs and deletes the blobs without references
+        which have not been saved within the grace period, so that files which were just
+        saved but are not referenced by a committed object yet are kept. A blob which is
+        saved again during the garbage collection is kept as well. Blob files without a
+        database entry are deleted if they were not modified within the grace period.
+
+        :param grace_period: The minimum age of a deleted blob in seconds, the setting
+        MEDIA_BLOB_GRACE_PERIOD by default
+        :type grace_period: int or None
+        :param dry_run: Only count the blobs which would be deleted
+        :type dry_run: bool
+
+        :return: the number of deleted blobs and their size in bytes
+        :rtype: tuple[int, int]
+        """
+        if grace_period is None:
+            grace_period = settings.MEDIA_BLOB_GRACE_PERIOD
+        expired = timezone.now() - timedelta(seconds=grace_period)
+        references = self.count_references()
+
+        blobs = list(MediaBlob.objects.all())
+        for blob in blobs:
+            blob.references = references.get(blob.name, 0)
+        if not dry_run:
+            MediaBlob.objects.bulk_update(blobs, ['references'], batch_size=self.batch_size)
+
+        garbage = [blob for blob in blobs
+                   if blob.name not in references and blob.last_saved < expired]
+        known = {blob.name for blob in blobs}
+        untracked = [name for name in self.blob_files()
+                     if name not in known and name not in references
+                     and self.get_modified_time(name) < expired]
+
+        size = sum(map(self.size, untracked))
+        if dry_run:
+            return len(garbage) + len(untracked), size + sum(blob.size for blob in garbage)
+        for name in untracked:
+            super().delete(name)
+        deleted = []
+        for start in range(0, len(garbage), self.batch_size):
+            with transaction.atomic():
+                # The blobs which were saved since the recount are referenced again
+                batch = MediaBlob.objects.filter(
+                    pk__in=[blob.pk for blob in garbage[start:start + self.batch_size]],
+                    last_saved__lt=expired)
+                deleted += batch.values_list('name', 'size')
+                batch.delete()
+        for name, _ in deleted:
+            super().delete(name)
+        return len(deleted) + len(untracked), size + sum(size for _, size in deleted)
@@ -0,0 +1,199 @@
+"""Purpose of this file
+
+This file contains the responsive thumbnails of the uploaded images of courses,
+categories, image contents and image attachments.
+"""
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+from imagekit import ImageSpec, register
+from imagekit.cachefiles import ImageCacheFile
+from imagekit.cachefiles.backends import CacheFileState
+from imagekit.exceptions import MissingSource
+from imagekit.processors import ResizeToFit
+
+from base.models import Category, Course
+from base.storage import ContentAddressedStorage
+
+
+class Thumbnail(ImageSpec):
+    """Thumbnail
+
+    This class defines a thumbnail of an image which is scaled down to a width of the
+    setting THUMBNAIL_WIDTHS and stored in a format of the setting THUMBNAIL_FORMATS.
+    Images are never scaled up.
+
+    :attr Thumbnail.processors: The processors which scale the image
+    :type Thumbnail.processors: list[ResizeToFit]
+    :attr Thumbnail.format: The format of the thumbnail
+    :type Thumbnail.format: str
+    :attr Thumbnail.options: The options to save the thumbnail
+    :type Thumbnail.options: dict[str, Any]
+    """
+
+    def __init__(self, source, width, image_format):
+        """Initializer
+
+        Initializes the thumbnail of an image.
+
+        :param source: The image
+        :type source: File
+        :param width: The maximum width of the thumbnail
+        :type width: int
+        :param image_format: The format of the thumbnail, e.g. WEBP or JPEG
+        :type image_format: str
+        """
+        self.processors = [ResizeToFit(width=width, upscale=False)]
+        self.format = image_format
+        self.options = {'quality': settings.THUMBNAIL_QUALITY}
+        super().__init__(source)
+
+
+# Only the thumbnails of registered generators are generated when they are requested
+register.generator('base:thumbnail', Thumbnail)
+
+
+class Thumbnails:
+    """Thumbnails
+
+    This class creates the thumbnails of the uploaded images with django-imagekit. The
+    thumbnails are generated when they are requested for the first time and are stored in
+    the cache directory of imagekit in the media folder. Whenever an image is replaced or
+    deleted and no other object uses its blob, its thumbnails are deleted as well.
+
+    :attr Thumbnails.models: The models with an image and the name of the image field
+    :type Thumbnails.models: dict[str, str]
+    """
+    models = {
+        'base.Course': 'image',
+        'base.Category': 'image',
+        'content.ImageContent': 'image',
+        'attachment.ImageAttachment': 'image',
+    }
+
+    @staticmethod
+    def files(image, image_format):
+        """Files
+
+        Returns the thumbnails of an image in the given format, one for each width.
+
+        :param image: The image
+        :type image: File
+        :param image_format: The format of the thumbnails, e.g. WEBP or JPEG
+        :type image_format: str
+
+        :return: the widths and thumbnails ordered by their width
+        :rtype: list[tuple[int, ImageCacheFile]]
+        """
+        return [(width, ImageCacheFile(Thumbnail(image, width, image_format)))
+                for width in sorted(settings.THUMBNAIL_WIDTHS)]
+
+    @staticmethod
+    def srcset(image, image_format):
+        """Srcset
+
+        Returns the srcset attribute of an image in the given format. Missing thumbnails
+        are generated.
+
+        :param image: The image
+        :type image: File
+        :param image_format: The format of the thumbnails, e.g. WEBP or JPEG
+        :type image_format: str
+
+        :return: the srcset attribute or an empty string if the image can not be read
+        :rtype: str
+        """
+        try:
+            return ', '.join(f'{thumbnail.url} {width}w'
+                             for width, thumbnail in Thumbnails.files(image, image_format))
+        except (MissingSource, OSError):
+            return ''
+
+    @staticmethod
+    def delete(name):
+        """Delete
+
+        Deletes the thumbnails of an image.
+
+        :param name: The name of the image in the storage
+        :type name: str
+        """
+        image = File(None, name=name)
+        for image_format in settings.THUMBNAIL_FORMATS:
+            for _, thumbnail in Thumbnails.files(image, image_format):
+                thumbnail.storage.delete(thumbnail.name)
+                thumbnail.cachefile_backend.set_state(thumbnail, CacheFileState.DOES_NOT_EXIST)
+
+    @staticmethod
+    def release(name, storage):
+        """Release
+
+        Deletes the thumbnails of an image which is no longer used by an object. Identical
+        images share a blob, so the thumbnails are kept while a file field still
+        references the blob of the image.
+
+        :param name: The name of the image in the storage
+        :type name: str
+        :param storage: The storage of the image
+        :type storage: Storage
+        """
+        if isinstance(storage, ContentAddressedStorage) and storage.is_referenced(name):
+            return
+        Thumbnails.delete(name)
+
+
+@receiver(pre_save, sender=Course)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender='content.ImageContent')
+@receiver(pre_save, sender='attachment.ImageAttachment')
+def delete_replaced_thumbnails(sender, instance, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """Delete replaced thumbnails
+
+    Deletes the thumbnails of the previous image of a saved object once the transaction
+    is committed, if the image was replaced or removed and its blob is not used by
+    another object.
+
+    :param sender: The model class
+    :type sender: type
+    :param instance: The saved object
+    :type instance: Model
+    :param raw: Whether the object is saved exactly as presented, e.g. from a fixture
+    :type raw: bool
+    :param kwargs: The keyword arguments
+    :type kwargs: Any
+    """
+    if raw or instance.pk is None:
+        return
+    field = Thumbnails.models[sender._meta.label]
+    image = getattr(instance, field)
+    previous = sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+    if previous and (previous != image.name or not image._committed):  # pylint: disable=protected-access
+        storage = image.storage
+        transaction.on_commit(lambda: Thumbnails.release(previous, storage))
+
+
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender='content.ImageContent')
+@receiver(post_delete, sender='attachment.ImageAttachment')
+def delete_thumbnails(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Delete thumbnails
+
+    Deletes the thumbnails of the image of a deleted object once the transaction is
+    committed, if its blob is not used by another object.
+
+    :param sender: The model class
+    :type sender: type
+    :param instance: The deleted object
+    :type instance: Model
+    :param kwargs: The keyword arguments
+    :type kwargs: Any
+    """
+    image = getattr(instance, Thumbnails.models[sender._meta.label])
+    name, storage = image.name, image.storage
+    if name:
+        transaction.on_commit(lambda: Thumbnails.release(name, storage))
@@ -3,9 +3,10 @@
 This file contains the utility functions used in this module.
 """
 
+from django.db.models import Count, F, OuterRef, Prefetch, Subquery
 from django.utils import timezone
 
-from .models import CourseStructureEntry
+from .models import Content, CourseStructureEntry, Topic
 
 
 def create_topic_and_subtopic_list(topics, course):
@@ -54,6 +55,100 @@ def create_topic_and_subtopic_list(topics, course):
     return [(topic[1], topic[2], topic[3]) for topic in sorted_topics]
 
 
+def get_course_structure(course, sorted_by, filtered_by):
+    """Get course structure
+
+    Loads the structure of the course with its (sub-)topics and their sorted and
+    filtered contents. The entries, topics, contents, authors, content types,
+    tags and image attachments are fetched in a fixed number of queries which does
+    not grow with the size of the course. Only one level of sub topics is handled.
+
+    :param course: The course whose structure should be loaded
+    :type course: Course
+    :param sorted_by: The sorting value which the contents should be sorted
+    :type sorted_by: str
+    :param filtered_by: The filtered value which the contents should be filtered
+    :type filtered_by: str
+
+    :return: the main topics with their contents, content count and sub topics
+    :rtype: list[dict[str, Any]]
+    """
+    contents = Topic.sort_and_filter_contents(get_content_queryset(), sorted_by, filtered_by)
+
+    structure_entries = CourseStructureEntry.objects.filter(course=course) \
+        .select_related('topic') \
+        .annotate(content_count=Count('topic__contents')) \
+        .prefetch_related(Prefetch('topic__contents',
+                                   queryset=contents,
+                                   to_attr='structure_contents'))
+    structure_entries = sorted(structure_entries, key=lambda x: structure_to_tuple(x.index))
+
+    topics_recursive = []
+    current_topic = None
+    for entry in structure_entries:
+        topic_data = {'topic': entry.topic,
+                      'topic_contents': entry.topic.structure_contents,
+                      'content_count': entry.content_count}
+        # Topic
+        if len(entry.index.split('/')) == 1:
+            current_topic = dict(topic_data, subtopics=[])
+            topics_recursive.append(current_topic)
+        # Subtopic
+        else:
+            current_topic['subtopics'].append(topic_data)
+    return topics_recursive
+
+
+def get_content_queryset():
+    """Get content queryset
+
+    Returns the queryset of the contents with the objects needed to display them: the
+    author and the content type row are joined, the tags and image attachments are
+    prefetched.
+
+    :return: the queryset of the contents
+    :rtype: QuerySet[Content]
+    """
+    from content.models import CONTENT_TYPES  # pylint: disable=import-outside-toplevel
+
+    # Content type rows are reverse one to one relations named after their model
+    content_type_relations = [model._meta.model_name  # pylint: disable=protected-access
+                              for model in CONTENT_TYPES.values()]
+    return Content.objects.select_related('author', 'topic', *content_type_relations) \
+        .prefetch_related('tags', 'ImageAttachments')
+
+
+def get_coursebook(profile, course):
+    """Get coursebook
+
+    Returns the contents of the coursebook of a user, the favourites of the user in the
+    course, in the order of the course structure. The contents are loaded in a single
+    query together with their position in the structure, contents of the same topic keep
+    the order in which they were added. Contents whose topic is no longer part of the
+    course follow at the end.
+
+    :param profile: The profile of the user
+    :type profile: Profile
+    :param course: The course
+    :type course: Course
+
+    :return: the contents of the coursebook
+    :rtype: list[Content]
+    """
+    index = CourseStructureEntry.objects.filter(course=course, topic=OuterRef('topic')) \
+        .order_by('index').values('index')[:1]
+    contents = get_content_queryset() \
+        .filter(favorite__user=profile, favorite__course=course) \
+        .annotate(structure_index=Subquery(index), favorite_id=F('favorite__pk'))
+
+    def position(content):
+        if content.structure_index is None:
+            return True, (0, 0), content.favorite_id
+        return False, structure_to_tuple(content.structure_index), content.favorite_id
+
+    return sorted(contents, key=position)
+
+
 def structure_to_tuple(structure):
     """Structure to tuple
 
@@ -56,6 +56,7 @@ INSTALLED_APPS = [
     'content.attachment',
     'export',
     'debug_toolbar',
+    'imagekit',
     'reversion',  # https://github.com/etianen/django-reversion
     'reversion_compare',  # https://github.com/jedie/django-reversion-compare
 ]
@@ -70,7 +71,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'reversion.middleware.RevisionMiddleware',
 ]
 
 ROOT_URLCONF = 'collab_coursebook.urls'
@@ -166,6 +166,13 @@ STATICFILES_DIRS = (
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Uploaded files are stored once per content as blobs named by their hash
+DEFAULT_FILE_STORAGE = 'base.storage.ContentAddressedStorage'
+# Minimum age in seconds of a blob without references before it is deleted by the
+# management command collect_media_garbage
+MEDIA_BLOB_GRACE_PERIOD = 24 * 60 * 60
+# The thumbnails are named by their source and settings and stored as they are
+IMAGEKIT_DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
 
 # Used for Debug Toolbar
 INTERNAL_IPS = [
@@ -203,13 +210,87 @@ ADD_REVERSION_ADMIN = True
 # optional settings:
 REVERSION_COMPARE_FOREIGN_OBJECTS_AS_ID = False
 REVERSION_COMPARE_IGNORE_NOT_REGISTERED = False
+# Versions which are older than the days and not among the latest versions of their object
+# are deleted by the management command prune_revisions
+REVERSION_RETENTION_DAYS = 180
+REVERSION_RETENTION_COUNT = 10
 
 DATA_PROTECTION_REQURE_CONFIRMATION = False
 
 # Allowed image extensions
 ALLOWED_IMAGE_EXTENSIONS = ['png', 'jpeg', 'jpg']
 
+# Cache for compiled LaTeX documents, identical sources are only compiled once
+LATEX_CACHE_ENABLED = True
+LATEX_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'latex')
+# Maximum size of the cache in bytes, least recently used entries are evicted first
+LATEX_CACHE_MAX_SIZE = 512 * 1024 * 1024
+# Cache for Markdown contents converted to PDF, identical HTML is only converted once
+MARKDOWN_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'markdown')
+MARKDOWN_CACHE_MAX_SIZE = 256 * 1024 * 1024
+# Precompile the preamble of the export template into a format file with mylatexformat
+LATEX_FORMAT_ENABLED = True
+LATEX_FORMAT_DIR = os.path.join(BASE_DIR, 'cache', 'latex_formats')
+# Timeout in seconds to build a format
+LATEX_FORMAT_TIMEOUT = 120
+# Auxiliary files of the exports, kept so that unchanged exports need a single pass
+LATEX_AUX_DIR = os.path.join(BASE_DIR, 'cache', 'latex_aux')
+# The tests run with the cache directories in a temporary directory
+TEST_RUNNER = 'test.runner.TestRunner'
+
+# Compile the contents of an export separately and stitch them together afterwards
+LATEX_EXPORT_FRAGMENTS = True
+# Number of contents which are compiled or converted from Markdown in parallel
+LATEX_EXPORT_WORKERS = os.cpu_count() or 1
+
+# Number of worker threads per process which compile export jobs in the background,
+# 0 compiles the jobs directly in the request
+EXPORT_JOB_WORKERS = 2
+# Seconds after which a running export job is considered interrupted and resumed
+EXPORT_JOB_TIMEOUT = 60 * 60
+# Seconds after which finished export jobs and their files are deleted
+EXPORT_JOB_RETENTION = 7 * 24 * 60 * 60
+
 YT_API_KEY = secrets.YT_API_KEY if secrets is not  None else ""
+YT_API_URL = "https://www.googleapis.com/youtube/v3/videos"
+# Seconds to wait for a response of the YouTube API
+YT_API_TIMEOUT = 10
+
+# Number of worker threads per process which extract the text of PDFs in the background,
+# 0 extracts the text directly in the request
+PDF_TEXT_WORKERS = 1
+# Seconds to wait for the text extraction of a PDF
+PDF_TEXT_TIMEOUT = 2 * 60
+
+# Number of worker threads per process which generate the previews of contents in the
+# background, 0 generates the previews directly in the request after its commit
+PREVIEW_WORKERS = 2
+# Number of retries of a failed preview generation of a worker and the delay before the
+# first retry in seconds, the delay grows with each retry
+PREVIEW_RETRIES = 2
+PREVIEW_RETRY_DELAY = 5
+# Bounding boxes (width, height) of the previews of PDFs in pixels, the first size is shown
+# on the cards and stored with the content. Only add further sizes, e.g.
+# 'detail': (900, 1300), if a template shows them with the filter preview_url, since every
+# size is rendered and stored whenever a PDF changes
+PREVIEW_SIZES = {
+    'card': (400, 600),
+}
+# JPEG quality of the previews
+PREVIEW_QUALITY = 80
+
+# Widths of the thumbnails of uploaded images in pixels
+THUMBNAIL_WIDTHS = (320, 640, 1280)
+# Formats of the thumbnails of uploaded images, the last format is the fallback for
+# browsers which support none of the others
+THUMBNAIL_FORMATS = ('WEBP', 'JPEG')
+# Quality of the thumbnails of uploaded images
+THUMBNAIL_QUALITY = 80
+
+# Number of search results per section and page of the search
+SEARCH_RESULTS_LIMIT = 20
+# Maximum number of search results returned by a single request of the JSON search
+SEARCH_STREAM_LIMIT = 1000
 
 include(optional("settings/*.py"))
 
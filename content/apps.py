@@ -15,3 +15,11 @@ class ContenttypesConfig(AppConfig):
     :type ContenttypesConfig.name: str
     """
     name = 'content'
+
+    def ready(self):
+        """Ready
+
+        Connects the receivers which extract the text of saved PDFs.
+        """
+        # pylint: disable=import-outside-toplevel, unused-import
+        import content.extraction
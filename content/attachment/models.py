@@ -7,6 +7,8 @@ attachments.
 import reversion
 
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.core.validators import FileExtensionValidator
@@ -84,3 +86,21 @@ IMAGE_ATTACHMENT_TYPES = {
 # else we can specify configuration
 reversion.register(ImageAttachment,
                    fields=['image', 'source', 'license'])
+
+
+@receiver(post_save, sender=ImageAttachment)
+@receiver(post_delete, sender=ImageAttachment)
+def invalidate_markdown_html(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Invalidate Markdown HTML
+
+    Discards the rendered HTML of a Markdown content if one of its attachments was
+    saved or deleted, since the HTML contains the paths of the attachments.
+
+    :param sender: The model class of the attachment
+    :type sender: type
+    :param instance: The saved or deleted attachment
+    :type instance: ImageAttachment
+    :param kwargs: The keyword arguments
+    :type kwargs: Any
+    """
+    MDContent.invalidate_html(instance.content_id)
@@ -0,0 +1,199 @@
+"""Purpose of this file
+
+This file contains the extraction of the text of the PDFs of contents.
+"""
+
+import hashlib
+import logging
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from base.search import SearchIndex
+
+from content.models import Latex, PDFContent, PDFPageText
+
+logger = logging.getLogger(__name__)
+
+
+class PDFTextExtractor:
+    """PDF text extractor
+
+    This class extracts the text of each page of the PDFs of PDF and LaTeX contents with
+    pdftotext of poppler, which is also used by pdf2image to generate the previews. The
+    text is extracted by a local pool of worker threads after the PDF was saved, so that
+    the extraction does not block the request. The size of the pool is configured with
+    the setting PDF_TEXT_WORKERS. If it is set to 0, the text is extracted directly.
+
+    The hash of the extracted PDF is stored with the content, a PDF whose hash did not
+    change is not extracted again.
+
+    :attr PDFTextExtractor.models: The content types with a PDF
+    :type PDFTextExtractor.models: tuple[type]
+    """
+    models = (PDFContent, Latex)
+
+    _executor = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def executor():
+        """Executor
+
+        Returns the worker pool of this process and starts it if necessary.
+
+        :return: the worker pool or None if the text is extracted directly
+        :rtype: ThreadPoolExecutor or None
+        """
+        if settings.PDF_TEXT_WORKERS <= 0:
+            return None
+        with PDFTextExtractor._lock:
+            if PDFTextExtractor._executor is None:
+                PDFTextExtractor._executor = ThreadPoolExecutor(
+                    max_workers=settings.PDF_TEXT_WORKERS,
+                    thread_name_prefix='pdf-text')
+        return PDFTextExtractor._executor
+
+    @staticmethod
+    def submit(content_id):
+        """Submit
+
+        Queues the extraction of the text of the PDF of a content. The extraction starts
+        once the current transaction is committed.
+
+        :param content_id: The id of the content
+        :type content_id: int
+        """
+        executor = PDFTextExtractor.executor()
+        if executor is None:
+            PDFTextExtractor.extract(content_id)
+        else:
+            transaction.on_commit(lambda: executor.submit(PDFTextExtractor.work, content_id))
+
+    @staticmethod
+    def work(content_id):
+        """Work
+
+        Extracts the text in a worker thread and releases the database connection of
+        the thread afterwards.
+
+        :param content_id: The id of the content
+        :type content_id: int
+        """
+        close_old_connections()
+        try:
+            PDFTextExtractor.extract(content_id)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('The text of the PDF of content %s could not be extracted',
+                             content_id)
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def file_hash(path):
+        """File hash
+
+        Computes the hash of a file in chunks.
+
+        :param path: The path of the file
+        :type path: str
+
+        :return: the hex digest of the file
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(65536), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def read_pages(path):
+        """Read pages
+
+        Reads the text of each page of a PDF with pdftotext.
+
+        :param path: The path of the PDF
+        :type path: str
+
+        :return: the text of each page
+        :rtype: list[str]
+        """
+        process = subprocess.run(['pdftotext', '-enc', 'UTF-8', path, '-'],
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                 timeout=settings.PDF_TEXT_TIMEOUT, check=True)
+        # The pages are separated by form feeds, the last page ends with one
+        pages = process.stdout.decode('utf-8', errors='ignore').split('\f')
+        if pages and not pages[-1].strip():
+            pages.pop()
+        return [page.strip() for page in pages]
+
+    @staticmethod
+    def extract(content_id, force=False):
+        """Extract
+
+        Extracts the text of the PDF of a content and stores it page by page, unless the
+        PDF did not change since the last extraction. Afterwards the content is indexed
+        again for the search.
+
+        :param content_id: The id of the content
+        :type content_id: int
+        :param force: Extract the text even if the PDF did not change
+        :type force: bool
+
+        :return: true if the text was extracted
+        :rtype: bool
+        """
+        for model in PDFTextExtractor.models:
+            pdf_content = model.objects.select_related('content').filter(pk=content_id).first()
+            if pdf_content is not None:
+                break
+        else:
+            return False
+        if not pdf_content.pdf:
+            return False
+
+        try:
+            pdf_hash = PDFTextExtractor.file_hash(pdf_content.pdf.path)
+            if not force and pdf_hash == pdf_content.text_hash:
+                return False
+            pages = PDFTextExtractor.read_pages(pdf_content.pdf.path)
+        except (OSError, subprocess.SubprocessError) as error:
+            logger.warning('The text of the PDF of content %s could not be extracted: %s',
+                           content_id, error)
+            return False
+
+        with transaction.atomic():
+            PDFPageText.objects.filter(content_id=content_id).delete()
+            PDFPageText.objects.bulk_create(
+                PDFPageText(content_id=content_id, page=page, text=text)
+                for page, text in enumerate(pages, start=1) if text)
+            # Stored with an update query, so the text is not extracted again by the signal
+            model.objects.filter(pk=content_id).update(text_hash=pdf_hash)
+            SearchIndex.index_content(pdf_content.content)
+        return True
+
+
+@receiver(post_save, sender=PDFContent)
+@receiver(post_save, sender=Latex)
+def extract_pdf_text(sender, instance, raw=False, **kwargs):  # pylint: disable=unused-argument
+    """Extract PDF text
+
+    Queues the extraction of the text of the PDF of a saved content.
+
+    :param sender: The model class
+    :type sender: type
+    :param instance: The saved content type
+    :type instance: PDFContent or Latex
+    :param raw: Whether the object is saved exactly as presented, e.g. from a fixture
+    :type raw: bool
+    :param kwargs: The keyword arguments
+    :type kwargs: Any
+    """
+    if not raw and instance.pdf:
+        PDFTextExtractor.submit(instance.pk)
@@ -0,0 +1,50 @@
+"""Purpose of this file
+
+This file contains the management command to extract the text of the PDFs of the
+contents.
+"""
+
+from django.core.management.base import BaseCommand
+
+from content.extraction import PDFTextExtractor
+
+
+class Command(BaseCommand):
+    """Extract PDF text
+
+    Extracts the text of the PDFs of all PDF and LaTeX contents whose PDF changed since
+    the last extraction, e.g. for contents which were created before the text was
+    extracted.
+
+    :attr Command.help: The help text of the command
+    :type Command.help: str
+    """
+    help = 'Extracts the text of the PDFs of the PDF and LaTeX contents'
+
+    def add_arguments(self, parser):
+        """Add arguments
+
+        Adds the arguments of the command.
+
+        :param parser: The parser of the arguments
+        :type parser: CommandParser
+        """
+        parser.add_argument('--force', action='store_true',
+                            help='Also extract the PDFs which did not change')
+
+    def handle(self, *args, **options):
+        """Handle
+
+        Executes the command.
+
+        :param args: The arguments
+        :type args: Any
+        :param options: The options of the command
+        :type options: dict[str, Any]
+        """
+        count = 0
+        for model in PDFTextExtractor.models:
+            for content_id in model.objects.exclude(pdf='').values_list('pk', flat=True):
+                if PDFTextExtractor.extract(content_id, force=options['force']):
+                    count += 1
+        self.stdout.write(self.style.SUCCESS(f'Extracted the text of {count} PDFs'))
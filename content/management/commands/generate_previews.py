@@ -0,0 +1,47 @@
+"""Purpose of this file
+
+This file contains the management command to generate the previews of the contents.
+"""
+
+from django.core.management.base import BaseCommand
+
+from content.previews import PreviewQueue
+
+
+class Command(BaseCommand):
+    """Generate previews
+
+    Generates the previews of all contents whose preview is missing, e.g. because the
+    generation failed or the contents were created before the previews were generated in
+    the background.
+
+    :attr Command.help: The help text of the command
+    :type Command.help: str
+    """
+    help = 'Generates the missing previews of the contents'
+
+    def add_arguments(self, parser):
+        """Add arguments
+
+        Adds the arguments of the command.
+
+        :param parser: The parser of the arguments
+        :type parser: CommandParser
+        """
+        parser.add_argument('--all', action='store_true',
+                            help='Also generate the previews which already exist')
+
+    def handle(self, *args, **options):
+        """Handle
+
+        Executes the command.
+
+        :param args: The arguments
+        :type args: Any
+        :param options: The options of the command
+        :type options: dict[str, Any]
+        """
+        content_ids = PreviewQueue.all() if options['all'] else PreviewQueue.missing()
+        count = sum(1 for content_id in content_ids if PreviewQueue.work(content_id))
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {count} of {len(content_ids)} previews'))
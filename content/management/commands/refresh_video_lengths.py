@@ -0,0 +1,48 @@
+"""Purpose of this file
+
+This file contains the management command to refresh the stored lengths of the
+YouTube videos.
+"""
+
+from django.core.management.base import BaseCommand
+
+from content.models import YTVideoContent
+
+
+class Command(BaseCommand):
+    """Refresh video lengths
+
+    Requests the lengths of the YouTube videos from the YouTube API in batches and
+    stores them, e.g. for videos which were created before the lengths were stored.
+
+    :attr Command.help: The help text of the command
+    :type Command.help: str
+    """
+    help = 'Refreshes the stored lengths of the YouTube videos'
+
+    def add_arguments(self, parser):
+        """Add arguments
+
+        Adds the arguments of the command.
+
+        :param parser: The parser of the arguments
+        :type parser: CommandParser
+        """
+        parser.add_argument('--missing', action='store_true',
+                            help='Only refresh the videos without a stored length')
+
+    def handle(self, *args, **options):
+        """Handle
+
+        Executes the command.
+
+        :param args: The arguments
+        :type args: Any
+        :param options: The options of the command
+        :type options: dict[str, Any]
+        """
+        videos = YTVideoContent.objects.all()
+        if options['missing']:
+            videos = videos.filter(length__isnull=True)
+        count = YTVideoContent.refresh_lengths(videos)
+        self.stdout.write(self.style.SUCCESS(f'Refreshed the lengths of {count} videos'))
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.20 on 2026-10-18 04:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0013_auto_20220315_1711'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mdcontent',
+            name='html',
+            field=models.TextField(blank=True, editable=False, null=True, verbose_name='Rendered HTML'),
+        ),
+        migrations.AddField(
+            model_name='mdcontent',
+            name='html_absolute',
+            field=models.TextField(blank=True, editable=False, null=True, verbose_name='Rendered HTML with absolute paths'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.20 on 2026-10-18 04:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0014_mdcontent_html'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ytvideocontent',
+            name='length',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Video Length'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.20 on 2026-10-18 04:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0024_search_index'),
+        ('content', '0015_ytvideocontent_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='latex',
+            name='text_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Hash of the extracted PDF'),
+        ),
+        migrations.AddField(
+            model_name='pdfcontent',
+            name='text_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='Hash of the extracted PDF'),
+        ),
+        migrations.CreateModel(
+            name='PDFPageText',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page', models.PositiveIntegerField(verbose_name='Page')),
+                ('text', models.TextField(blank=True, verbose_name='Text')),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pdf_pages', to='base.content', verbose_name='Content')),
+            ],
+            options={
+                'verbose_name': 'PDF Page Text',
+                'verbose_name_plural': 'PDF Page Texts',
+                'ordering': ['content', 'page'],
+                'unique_together': {('content', 'page')},
+            },
+        ),
+    ]
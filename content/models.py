@@ -16,12 +16,15 @@ from django.core.validators import FileExtensionValidator
 
 
 from pdf2image import convert_from_path
+from PIL import Image
 
 from base.models import Content
+from base.storage import ContentAddressedStorage
 
 from content.mixin import GeneratePreviewMixin
 from content.validator import Validator
-from content.static.yt_api import get_video_length, timestamp_to_seconds, seconds_to_timestamp
+from content.static.yt_api import get_video_length, get_video_lengths, timestamp_to_seconds, \
+    seconds_to_timestamp
 
 
 class BaseContentModel(models.Model, GeneratePreviewMixin):
@@ -71,11 +74,17 @@ class BasePDFModel(models.Model):
 
     :attr BasePDFModel.pdf: Describes the PDF file of this model
     :type BasePDFModel.pdf: FileField
+    :attr BasePDFModel.text_hash: The hash of the PDF file whose text was extracted
+    :type BasePDFModel.text_hash: CharField
     """
     pdf = models.FileField(verbose_name=_("PDF"),
                            upload_to='uploads/contents/%Y/%m/%d/',
                            blank=True,
                            validators=(Validator.validate_pdf,))
+    text_hash = models.CharField(verbose_name=_("Hash of the extracted PDF"),
+                                 max_length=64,
+                                 blank=True,
+                                 editable=False)
 
     class Meta:
         """Meta options
@@ -87,10 +96,51 @@ class BasePDFModel(models.Model):
         """
         abstract = True
 
+    @staticmethod
+    def preview_name(preview, size):
+        """Preview name
+
+        Returns the name of the preview in the given size. The preview stored with the
+        content has the first size of the setting PREVIEW_SIZES, the other sizes are stored
+        next to it with the size as suffix.
+
+        :param preview: The name of the stored preview
+        :type preview: str
+        :param size: The name of the size
+        :type size: str
+
+        :return: the name of the preview in the given size
+        :rtype: str
+        """
+        if size == next(iter(settings.PREVIEW_SIZES)):
+            return preview
+        root, extension = os.path.splitext(preview)
+        return f'{root}_{size}{extension}'
+
+    def preview_stem(self):
+        """Preview stem
+
+        Returns the name of the preview without extension. The file name of the PDF does
+        not identify it, e.g. all LaTeX PDFs of a topic have the same name, so the preview
+        is named after the digest of the stored PDF or after the content if the PDF is
+        not stored as a blob.
+
+        :return: the name of the preview without extension
+        :rtype: str
+        """
+        if isinstance(self.pdf.storage, ContentAddressedStorage):
+            blob = self.pdf.storage.blob(self.pdf.name)
+            if blob is not None:
+                return os.path.splitext(os.path.basename(blob))[0]
+        return f'content_{self.pk}'
+
     def generate_preview(self):
         """Generate preview
 
-        Generates a preview of this model, more precisely the PDF is generated as a preview.
+        Generates the previews of this model, more precisely the first page of the PDF is
+        rendered as thumbnails in the sizes of the setting PREVIEW_SIZES. Only the first
+        page is rendered, at the width of the largest size, and each smaller thumbnail is
+        scaled down from the previous one.
 
         :return: the string which represents the concatenated path components.
         :rtype: str
@@ -100,12 +150,68 @@ class BasePDFModel(models.Model):
         # Checks if Folder exists
         if not os.path.exists(os.path.join(settings.MEDIA_ROOT, preview_folder)):
             os.makedirs(os.path.join(settings.MEDIA_ROOT, preview_folder))
-        base_filename = os.path.splitext(os.path.basename(self.pdf.name))[0] + '.jpg'
-        # Get images for every page
-        pages = convert_from_path(self.pdf.path, last_page=2)
-        # Save first page to disk
-        pages[0].save(os.path.join(settings.MEDIA_ROOT, preview_folder, base_filename))
-        return os.path.join(preview_folder, base_filename)
+        preview = os.path.join(preview_folder, self.preview_stem() + '.jpg')
+        sizes = sorted(settings.PREVIEW_SIZES.items(), key=lambda item: item[1], reverse=True)
+        # Get an image of the first page only
+        image = convert_from_path(self.pdf.path, first_page=1, last_page=1,
+                                  size=(sizes[0][1][0], None))[0].convert('RGB')
+        for size, bounds in sizes:
+            image.thumbnail(bounds, Image.Resampling.LANCZOS)
+            image.save(os.path.join(settings.MEDIA_ROOT, BasePDFModel.preview_name(preview, size)),
+                       'JPEG', quality=settings.PREVIEW_QUALITY, optimize=True, progressive=True)
+        return preview
+
+
+class PDFPageText(models.Model):
+    """PDF page text
+
+    This model represents the text of a page of the PDF of a content, e.g. of an uploaded
+    PDF or a compiled LaTeX content. The text is extracted in the background whenever
+    the PDF changes and is used by the search and the reading mode.
+
+    :attr PDFPageText.content: The content of the PDF
+    :type PDFPageText.content: ForeignKey - Content
+    :attr PDFPageText.page: The number of the page, starting with 1
+    :type PDFPageText.page: PositiveIntegerField
+    :attr PDFPageText.text: The text of the page
+    :type PDFPageText.text: TextField
+    """
+    content = models.ForeignKey(Content,
+                                verbose_name=_("Content"),
+                                on_delete=models.CASCADE,
+                                related_name='pdf_pages')
+    page = models.PositiveIntegerField(verbose_name=_("Page"))
+    text = models.TextField(verbose_name=_("Text"),
+                            blank=True)
+
+    class Meta:
+        """Meta options
+
+        This class handles all possible meta options that you can give to this model.
+
+        :attr Meta.verbose_name: A human-readable name for the object in singular
+        :type Meta.verbose_name: __proxy__
+        :attr Meta.verbose_name_plural: A human-readable name for the object in plural
+        :type Meta.verbose_name_plural: __proxy__
+        :attr Meta.ordering: The default ordering for the object
+        :type Meta.ordering: list[str]
+        :attr Meta.unique_together: Sets of field names that, taken together, must be unique
+        :type Meta.unique_together: tuple[str, str]
+        """
+        verbose_name = _("PDF Page Text")
+        verbose_name_plural = _("PDF Page Texts")
+        ordering = ['content', 'page']
+        unique_together = ('content', 'page')
+
+    def __str__(self):
+        """String representation
+
+        Returns the string representation of this object.
+
+        :return: the string representation of this object
+        :rtype: str
+        """
+        return f"{self.content}: page {self.page}"
 
 
 class BaseSourceModel(models.Model):
@@ -294,6 +400,12 @@ class MDContent(BaseContentModel):
     :type MDContent.source: TextField
     :attr MDContent.source: The source of this content
     :type MDContent.source: TextField
+    :attr MDContent.html: The rendered HTML with relative attachment paths, None if it
+    has to be rendered again
+    :type MDContent.html: TextField
+    :attr MDContent.html_absolute: The rendered HTML with absolute attachment paths, None
+    if it has to be rendered again
+    :type MDContent.html_absolute: TextField
     """
     TYPE = "MD"
     DESC = _("Markdown")
@@ -308,6 +420,15 @@ class MDContent(BaseContentModel):
                                  blank=True)
     source = models.TextField(verbose_name=_("Source"))
 
+    html = models.TextField(verbose_name=_("Rendered HTML"),
+                            blank=True,
+                            null=True,
+                            editable=False)
+    html_absolute = models.TextField(verbose_name=_("Rendered HTML with absolute paths"),
+                                     blank=True,
+                                     null=True,
+                                     editable=False)
+
     class Meta:
         """Meta options
 
@@ -331,6 +452,33 @@ class MDContent(BaseContentModel):
         """
         return f"{self.content}; {self.pk} "
 
+    def save(self, *args, **kwargs):
+        """Save
+
+        Saves the content and discards the rendered HTML, it is rendered again with the
+        saved Markdown script when it is needed.
+
+        :param args: The arguments
+        :type args: Any
+        :param kwargs: The keyword arguments
+        :type kwargs: Any
+        """
+        self.html = None
+        self.html_absolute = None
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def invalidate_html(content_id):
+        """Invalidate HTML
+
+        Discards the rendered HTML of the Markdown content with the given id, e.g. if its
+        attachments changed.
+
+        :param content_id: The id of the content
+        :type content_id: int
+        """
+        MDContent.objects.filter(pk=content_id).update(html=None, html_absolute=None)
+
     @staticmethod
     def filter_by_own_type(contents):
         return contents.filter(mdcontent__isnull=False)
@@ -395,6 +543,8 @@ class YTVideoContent(BaseContentModel):
     :type YTVideoContent.DESC: __proxy__
     :attr YTVideoContent.url: The link of the YouTube video
     :type YTVideoContent.url: URLField
+    :attr YTVideoContent.length: The length of the YouTube video in seconds
+    :type YTVideoContent.length: FloatField
     """
     TYPE = "YouTubeVideo"
     DESC = _("YouTube Video")
@@ -410,6 +560,11 @@ class YTVideoContent(BaseContentModel):
                                help_text=_(
                                    "Type in the time as HH:MM:SS (e.g. 2:05:10, 2:05, 0:50)."))
 
+    length = models.FloatField(verbose_name=_("Video Length"),
+                               blank=True,
+                               null=True,
+                               editable=False)
+
     class Meta:
         """Meta options
 
@@ -457,6 +612,46 @@ class YTVideoContent(BaseContentModel):
     def filter_by_own_type(contents):
         return contents.filter(ytvideocontent__isnull=False)
 
+    def get_length(self):
+        """Get length
+
+        Returns the length of the video. The length is stored when the content is saved,
+        it is only requested from the YouTube API if it is missing.
+
+        :return: the length of the video in seconds or None if the video could not be found
+        :rtype: float or None
+        """
+        if self.length is None:
+            self.length = get_video_length(self.id)
+            if self.length is not None:
+                YTVideoContent.objects.filter(pk=self.pk).update(length=self.length)
+        return self.length
+
+    @staticmethod
+    def refresh_lengths(videos=None):
+        """Refresh lengths
+
+        Requests the lengths of the given videos from the YouTube API in batches and
+        stores them. The lengths of videos which could not be found are not changed.
+
+        :param videos: The videos to refresh, defaults to all videos
+        :type videos: QuerySet[YTVideoContent] or None
+
+        :return: the number of refreshed videos
+        :rtype: int
+        """
+        if videos is None:
+            videos = YTVideoContent.objects.all()
+        videos = list(videos)
+        lengths = get_video_lengths([video.id for video in videos])
+        refreshed = []
+        for video in videos:
+            if video.id in lengths:
+                video.length = lengths[video.id]
+                refreshed.append(video)
+        YTVideoContent.objects.bulk_update(refreshed, ['length'], batch_size=500)
+        return len(refreshed)
+
     def clean(self):
 
         colon_regex = "^((((0?[1-9]|1[0-2]):)?[0-5][0-9]:[0-5][0-9])|[0-9]:[0-5][0-9])$"
@@ -469,6 +664,10 @@ class YTVideoContent(BaseContentModel):
             raise ValidationError(_("Please input a correct format for your ending time."))
 
         seconds = get_video_length(self.id)
+        if seconds is None:
+            raise ValidationError(_('The video could not be found.'))
+        # Store the length, so that it does not need to be requested again
+        self.length = seconds
         start_time = timestamp_to_seconds(self.start_time)
         end_time = timestamp_to_seconds(self.end_time)
         if end_time == 0:
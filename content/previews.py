@@ -0,0 +1,193 @@
+"""Purpose of this file
+
+This file contains the queue which generates the previews of contents in the background.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from base.models import Content
+
+from content.mixin import GeneratePreviewMixin
+from content.models import CONTENT_TYPES
+
+logger = logging.getLogger(__name__)
+
+
+class PreviewQueue:
+    """Preview queue
+
+    This class takes care of generating the previews of contents, e.g. rasterizing the
+    first page of a PDF. The previews are generated by a local pool of worker threads
+    after the content was saved, so that the request does not wait for them. The size of
+    the pool is configured with the setting PREVIEW_WORKERS. If it is set to 0, the
+    previews are generated directly after the commit of the request's transaction, with
+    a single attempt.
+
+    Until its preview is generated, a content has no preview and a placeholder is shown.
+    A failed generation is retried PREVIEW_RETRIES times, previews which are still missing
+    can be generated with the management command generate_previews.
+    """
+    _executor = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def executor():
+        """Executor
+
+        Returns the worker pool of this process and starts it if necessary.
+
+        :return: the worker pool or None if the previews are generated directly
+        :rtype: ThreadPoolExecutor or None
+        """
+        if settings.PREVIEW_WORKERS <= 0:
+            return None
+        with PreviewQueue._lock:
+            if PreviewQueue._executor is None:
+                PreviewQueue._executor = ThreadPoolExecutor(
+                    max_workers=settings.PREVIEW_WORKERS,
+                    thread_name_prefix='preview')
+        return PreviewQueue._executor
+
+    @staticmethod
+    def has_preview(content_type):
+        """Has preview
+
+        Returns whether contents of the given type have a generated preview.
+
+        :param content_type: The type of the content
+        :type content_type: str
+
+        :return: true if the previews of the type are generated
+        :rtype: bool
+        """
+        model = CONTENT_TYPES.get(content_type)
+        return model is not None and \
+            model.generate_preview is not GeneratePreviewMixin.generate_preview
+
+    @staticmethod
+    def all():
+        """All
+
+        Returns the ids of the contents which have a generated preview.
+
+        :return: the ids of the contents
+        :rtype: list[int]
+        """
+        types = [content_type for content_type in CONTENT_TYPES
+                 if PreviewQueue.has_preview(content_type)]
+        return list(Content.objects.filter(type__in=types).values_list('pk', flat=True))
+
+    @staticmethod
+    def missing():
+        """Missing
+
+        Returns the ids of the contents whose preview is missing.
+
+        :return: the ids of the contents
+        :rtype: list[int]
+        """
+        types = [content_type for content_type in CONTENT_TYPES
+                 if PreviewQueue.has_preview(content_type)]
+        return list(Content.objects.filter(type__in=types, preview__in=['', None])
+                    .values_list('pk', flat=True))
+
+    @staticmethod
+    def submit(content):
+        """Submit
+
+        Discards the preview of the content and queues the generation of a new preview.
+        The generation starts once the current transaction is committed, also if the
+        previews are generated directly.
+
+        :param content: The content
+        :type content: Content
+        """
+        if not PreviewQueue.has_preview(content.type):
+            return
+        # Show the placeholder until the new preview is generated
+        Content.objects.filter(pk=content.pk).update(preview='')
+        content.preview = ''
+        executor = PreviewQueue.executor()
+        if executor is None:
+            transaction.on_commit(lambda: PreviewQueue.generate_directly(content.pk))
+        else:
+            transaction.on_commit(lambda: executor.submit(PreviewQueue.work, content.pk))
+
+    @staticmethod
+    def generate_directly(content_id):
+        """Generate directly
+
+        Generates the preview of the content in the current thread without retries, so
+        the request is not delayed and its database connection is kept. A failed
+        generation is only logged, the missing preview can be generated with the
+        management command generate_previews.
+
+        :param content_id: The id of the content
+        :type content_id: int
+
+        :return: true if the preview was generated
+        :rtype: bool
+        """
+        try:
+            return PreviewQueue.generate(content_id)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('The preview of content %s could not be generated', content_id)
+            return False
+
+    @staticmethod
+    def work(content_id):
+        """Work
+
+        Generates the preview of the content and retries it if the generation failed.
+        Afterwards the database connection of the thread is released.
+
+        :param content_id: The id of the content
+        :type content_id: int
+
+        :return: true if the preview was generated
+        :rtype: bool
+        """
+        close_old_connections()
+        try:
+            for attempt in range(settings.PREVIEW_RETRIES + 1):
+                if attempt:
+                    time.sleep(settings.PREVIEW_RETRY_DELAY * attempt)
+                try:
+                    return PreviewQueue.generate(content_id)
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception('The preview of content %s could not be generated '
+                                     '(attempt %s)', content_id, attempt + 1)
+            return False
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def generate(content_id):
+        """Generate
+
+        Generates the preview of the content and stores it. The preview is stored with an
+        update query, so no model signals are sent and no revision is created.
+
+        :param content_id: The id of the content
+        :type content_id: int
+
+        :return: true if the preview was generated
+        :rtype: bool
+        """
+        content = Content.objects.filter(pk=content_id).first()
+        if content is None or not PreviewQueue.has_preview(content.type):
+            return False
+        content_type = CONTENT_TYPES[content.type].objects.filter(pk=content_id).first()
+        if content_type is None:
+            return False
+        preview = content_type.generate_preview()
+        if not preview:
+            return False
+        Content.objects.filter(pk=content_id).update(preview=preview)
+        return True
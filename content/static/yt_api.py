@@ -1,12 +1,14 @@
 import json
 import math
 import isodate
-import urllib
+import urllib.parse
+import urllib.request
 
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
-yt_api_key = settings.YT_API_KEY
+# The maximum number of videos which can be requested at once
+YT_API_BATCH_SIZE = 50
 
 
 def seconds_to_time(seconds_total):
@@ -96,16 +98,38 @@ def get_video_length(id):
     :attr id: the id of the YouTube video to get the length from
     :type id: str
 
-    :return: the length of the video in seconds
-    :rtype: float
+    :return: the length of the video in seconds or None if the video could not be found,
+    e.g. because it is private or was deleted
+    :rtype: float or None
     """
-    yt_url = "https://www.googleapis.com/youtube/v3/videos?id="+id+"&key="+yt_api_key+"&part=contentDetails"
-    response = urllib.request.urlopen(yt_url).read()
-    data = json.loads(response)
-    data_items=data['items']
-    duration=data_items[0]['contentDetails']['duration']
-    dur = isodate.parse_duration(duration)
-    return dur.total_seconds()
+    return get_video_lengths([id]).get(id)
+
+def get_video_lengths(ids):
+    """Get Video Lengths
+
+    Gets the lengths of YouTube videos in seconds from their YouTube ids. The videos are
+    requested in batches of YT_API_BATCH_SIZE ids. Videos which could not be found are
+    not contained in the result.
+
+    :attr ids: the ids of the YouTube videos to get the lengths from
+    :type ids: list[str]
+
+    :return: the lengths of the videos in seconds by their ids
+    :rtype: dict[str, float]
+    """
+    ids = list(dict.fromkeys(ids))
+    lengths = {}
+    for start in range(0, len(ids), YT_API_BATCH_SIZE):
+        query = urllib.parse.urlencode({'id': ','.join(ids[start:start + YT_API_BATCH_SIZE]),
+                                        'key': settings.YT_API_KEY,
+                                        'part': 'contentDetails'})
+        yt_url = f"{settings.YT_API_URL}?{query}"
+        with urllib.request.urlopen(yt_url, timeout=settings.YT_API_TIMEOUT) as response:
+            data = json.loads(response.read())
+        for item in data['items']:
+            duration = isodate.parse_duration(item['contentDetails']['duration'])
+            lengths[item['id']] = duration.total_seconds()
+    return lengths
 
 def time_to_string(total_hours, total_minutes, total_seconds):
     vid_len = ""
@@ -0,0 +1,24 @@
+"""Purpose of this file
+
+This file describes the export jobs in the admin panel. This can be found in the Export
+section of the admin panel.
+"""
+
+from django.contrib import admin
+
+from export.models import ExportJob
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """Export job admin
+
+    Represents the export job model in the admin panel.
+
+    :attr ExportJobAdmin.list_display: Controls which fields are displayed
+    :type ExportJobAdmin.list_display: list[str]
+    :attr ExportJobAdmin.readonly_fields: Controls which fields are non-editable
+    :type ExportJobAdmin.readonly_fields: list[str]
+    """
+    list_display = ['file_name', 'course', 'user', 'status', 'creation_date']
+    readonly_fields = ['creation_date', 'start_date', 'end_date']
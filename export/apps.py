@@ -15,3 +15,11 @@ class ExportConfig(AppConfig):
     :type ExportConfig.name: str
     """
     name = 'export'
+
+    def ready(self):
+        """Ready
+
+        Connects the receiver which resumes the unfinished export jobs.
+        """
+        # pylint: disable=import-outside-toplevel, unused-import
+        import export.jobs
@@ -0,0 +1,405 @@
+"""Purpose of this file
+
+This file contains the content-addressed caches for compiled LaTeX documents and
+converted Markdown contents.
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+
+from django.conf import settings
+
+
+class CompilationCache:
+    """Compilation cache
+
+    This class stores the results of LaTeX compilations on disk, addressed by a hash of
+    everything the compilation depends on: the rendered template, the number of pdflatex
+    passes and the contents of all files the template refers to. Identical sources are
+    therefore compiled only once. The total size of the cache is bounded, the least
+    recently used entries are evicted first. The size of a cache directory is estimated
+    from the stored entries, the directory is only walked to evict entries once the
+    estimate exceeds the maximum size. The eviction reduces the cache to a fraction of
+    its maximum size, so the following entries are stored without evictions.
+
+    Each entry is a directory named after its key containing the PDF (if the compilation
+    produced one), the pdflatex log and the final rendered template.
+
+    :attr CompilationCache.pdf_name: The file name of the cached PDF
+    :type CompilationCache.pdf_name: str
+    :attr CompilationCache.log_name: The file name of the cached pdflatex log
+    :type CompilationCache.log_name: str
+    :attr CompilationCache.tex_name: The file name of the cached rendered template
+    :type CompilationCache.tex_name: str
+    :attr CompilationCache.eviction_ratio: The fraction of the maximum size to which the
+    eviction reduces the cache
+    :type CompilationCache.eviction_ratio: float
+    """
+    pdf_name = 'texput.pdf'
+    log_name = 'texput.log'
+    tex_name = 'texput.tex'
+    eviction_ratio = 0.9
+
+    # The estimated sizes of the cache directories in bytes, entries stored by other
+    # processes are only counted when the directory is walked
+    _sizes = {}
+    _sizes_lock = threading.Lock()
+
+    # Pattern: Arguments in braces which may be file paths, e.g. \includegraphics{/path}
+    _path_pattern = re.compile(rb'{([^{}]+)}')
+
+    @staticmethod
+    def enabled():
+        """Enabled
+
+        Returns whether compilation results should be cached.
+
+        :return: true if the cache is enabled
+        :rtype: bool
+        """
+        return getattr(settings, 'LATEX_CACHE_ENABLED', True)
+
+    @staticmethod
+    def directory():
+        """Directory
+
+        Returns the directory of the cache and creates it if necessary.
+
+        :return: the path to the cache directory
+        :rtype: str
+        """
+        directory = settings.LATEX_CACHE_DIR
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    @staticmethod
+    def hash_file(path, digest):
+        """Hash file
+
+        Updates the given digest with the contents of the file in chunks.
+
+        :param path: The path of the file
+        :type path: str
+        :param digest: The digest to update
+        :type digest: hashlib._Hash
+        """
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(65536), b''):
+                digest.update(chunk)
+
+    @staticmethod
+    def key(rendered_tpl, passes, directory=None):
+        """Key
+
+        Computes the cache key of a compilation. The key covers the rendered template,
+        the number of pdflatex passes, every existing file referenced by an absolute
+        path in the template (e.g. attachments) and every file in the working
+        directory (e.g. converted Markdown contents or uploaded preview attachments).
+
+        :param rendered_tpl: The rendered template to be compiled
+        :type rendered_tpl: bytes
+        :param passes: The number of pdflatex passes
+        :type passes: int
+        :param directory: The working directory of the compilation
+        :type directory: str or None
+
+        :return: the key of the compilation
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        digest.update(f'passes={passes}\n'.encode())
+        digest.update(rendered_tpl)
+
+        paths = set()
+        for match in CompilationCache._path_pattern.finditer(rendered_tpl):
+            path = os.fsdecode(match.group(1).strip())
+            if os.path.isabs(path) and os.path.isfile(path):
+                paths.add(path)
+        if directory is not None:
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                if os.path.isfile(path):
+                    paths.add(path)
+
+        for path in sorted(paths):
+            digest.update(b'\0' + os.fsencode(os.path.basename(path)) + b'\0')
+            CompilationCache.hash_file(path, digest)
+        return digest.hexdigest()
+
+    @staticmethod
+    def get(key):
+        """Get
+
+        Returns the cached result of the compilation with the given key and marks the
+        entry as recently used.
+
+        :param key: The key of the compilation
+        :type key: str
+
+        :return: the PDF, PDF LaTeX output and the rendered template or None if there is
+        no cached result
+        :rtype: tuple[bytes, tuple[bytes, None], bytes] or None
+        """
+        entry = os.path.join(CompilationCache.directory(), key)
+        try:
+            with open(os.path.join(entry, CompilationCache.log_name), 'rb') as file:
+                log = file.read()
+            with open(os.path.join(entry, CompilationCache.tex_name), 'rb') as file:
+                rendered_tpl = file.read()
+            pdf_path = os.path.join(entry, CompilationCache.pdf_name)
+            pdf = None
+            if os.path.exists(pdf_path):
+                with open(pdf_path, 'rb') as file:
+                    pdf = file.read()
+            # Mark as recently used for the eviction
+            os.utime(entry)
+        except OSError:
+            return None
+        return pdf, (log, None), rendered_tpl
+
+    @staticmethod
+    def set(key, pdf, pdflatex_output, rendered_tpl):
+        """Set
+
+        Stores the result of a compilation in the cache and evicts the least recently used
+        entries if the cache exceeds its maximum size.
+
+        :param key: The key of the compilation
+        :type key: str
+        :param pdf: The compiled PDF or None if the compilation failed
+        :type pdf: bytes or None
+        :param pdflatex_output: The PDF LaTeX output
+        :type pdflatex_output: tuple[bytes, bytes]
+        :param rendered_tpl: The final rendered template
+        :type rendered_tpl: bytes
+        """
+        directory = CompilationCache.directory()
+        entry = os.path.join(directory, key)
+        if os.path.isdir(entry):
+            return
+        # Write into a temporary directory first, so readers never see partial entries
+        tempdir = tempfile.mkdtemp(dir=directory, prefix='.tmp-')
+        try:
+            if pdf is not None:
+                with open(os.path.join(tempdir, CompilationCache.pdf_name), 'wb') as file:
+                    file.write(pdf)
+            with open(os.path.join(tempdir, CompilationCache.log_name), 'wb') as file:
+                file.write(pdflatex_output[0] or b'')
+            with open(os.path.join(tempdir, CompilationCache.tex_name), 'wb') as file:
+                file.write(rendered_tpl)
+            os.rename(tempdir, entry)
+        except OSError:
+            # Another process stored the same entry in the meantime
+            shutil.rmtree(tempdir, ignore_errors=True)
+            return
+        size = len(pdf or b'') + len(pdflatex_output[0] or b'') + len(rendered_tpl)
+        CompilationCache.track(directory, size, settings.LATEX_CACHE_MAX_SIZE)
+
+    @staticmethod
+    def track(directory, size, max_size):
+        """Track
+
+        Adds the size of a stored entry to the estimated size of the given cache directory
+        and evicts the least recently used entries once the estimate exceeds the given
+        size. The directory is only walked for the first entry stored by this process and
+        for the evictions.
+
+        :param directory: The path of the cache directory
+        :type directory: str
+        :param size: The size of the stored entry in bytes
+        :type size: int
+        :param max_size: The maximum size in bytes
+        :type max_size: int
+        """
+        with CompilationCache._sizes_lock:
+            total = CompilationCache._sizes.get(directory)
+            if total is not None and total + size <= max_size:
+                CompilationCache._sizes[directory] = total + size
+                return
+            CompilationCache._sizes[directory] = CompilationCache.evict_directory(
+                directory, max_size, int(max_size * CompilationCache.eviction_ratio))
+
+    @staticmethod
+    def entry_size(entry):
+        """Entry size
+
+        Returns the size of the files of a cache entry.
+
+        :param entry: The path of the entry
+        :type entry: str
+
+        :return: the size in bytes
+        :rtype: int
+        """
+        size = 0
+        for name in os.listdir(entry):
+            size += os.path.getsize(os.path.join(entry, name))
+        return size
+
+    @staticmethod
+    def evict(max_size=None):
+        """Evict
+
+        Removes the least recently used entries until the cache does not exceed the
+        given size.
+
+        :param max_size: The maximum size in bytes, defaults to the setting LATEX_CACHE_MAX_SIZE
+        :type max_size: int or None
+        """
+        if max_size is None:
+            max_size = settings.LATEX_CACHE_MAX_SIZE
+        directory = CompilationCache.directory()
+        with CompilationCache._sizes_lock:
+            CompilationCache._sizes[directory] = CompilationCache.evict_directory(directory,
+                                                                                   max_size)
+
+    @staticmethod
+    def evict_directory(directory, max_size, target_size=None):
+        """Evict directory
+
+        Removes the least recently used entries (files or directories) of the given cache
+        directory if it exceeds the given size, until it does not exceed the target size.
+        Hidden entries are skipped, they are still being written.
+
+        :param directory: The path of the cache directory
+        :type directory: str
+        :param max_size: The maximum size in bytes
+        :type max_size: int
+        :param target_size: The size in bytes to which the directory is reduced, defaults
+                            to the maximum size
+        :type target_size: int or None
+
+        :return: the remaining size of the directory in bytes
+        :rtype: int
+        """
+        if target_size is None:
+            target_size = max_size
+        entries = []
+        total = 0
+        for name in os.listdir(directory):
+            entry = os.path.join(directory, name)
+            if name.startswith('.'):
+                continue
+            try:
+                if os.path.isdir(entry):
+                    size = CompilationCache.entry_size(entry)
+                else:
+                    size = os.path.getsize(entry)
+                entries.append((os.path.getmtime(entry), size, entry))
+            except OSError:
+                continue
+            total += size
+        if total <= max_size:
+            return total
+        # Oldest (least recently used) entries first
+        entries.sort()
+        for _, size, entry in entries:
+            if total <= target_size:
+                break
+            if os.path.isdir(entry):
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                try:
+                    os.remove(entry)
+                except OSError:
+                    pass
+            total -= size
+        return total
+
+    @staticmethod
+    def clear():
+        """Clear
+
+        Removes all entries from the cache.
+        """
+        CompilationCache.evict(max_size=0)
+
+
+class MarkdownCache:
+    """Markdown cache
+
+    This class stores the PDFs converted from the HTML of Markdown contents on disk,
+    addressed by a hash of the HTML and the conversion options. The total size of the
+    cache is bounded like the size of the compilation cache, the least recently used
+    PDFs are evicted first.
+    """
+
+    @staticmethod
+    def directory():
+        """Directory
+
+        Returns the directory of the cache and creates it if necessary.
+
+        :return: the path to the cache directory
+        :rtype: str
+        """
+        directory = settings.MARKDOWN_CACHE_DIR
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    @staticmethod
+    def key(html, options):
+        """Key
+
+        Computes the cache key of a conversion.
+
+        :param html: The HTML to be converted
+        :type html: str
+        :param options: The options of the conversion
+        :type options: dict[str, str]
+
+        :return: the key of the conversion
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        for option, value in sorted(options.items()):
+            digest.update(f'{option}={value}\n'.encode())
+        digest.update(html.encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def get(key):
+        """Get
+
+        Returns the cached PDF of the conversion with the given key and marks it as
+        recently used.
+
+        :param key: The key of the conversion
+        :type key: str
+
+        :return: the PDF or None if there is no cached PDF
+        :rtype: bytes or None
+        """
+        path = os.path.join(MarkdownCache.directory(), f'{key}.pdf')
+        try:
+            with open(path, 'rb') as file:
+                pdf = file.read()
+            # Mark as recently used for the eviction
+            os.utime(path)
+        except OSError:
+            return None
+        return pdf
+
+    @staticmethod
+    def set(key, pdf):
+        """Set
+
+        Stores the PDF of a conversion in the cache and evicts the least recently used
+        PDFs if the cache exceeds its maximum size.
+
+        :param key: The key of the conversion
+        :type key: str
+        :param pdf: The converted PDF
+        :type pdf: bytes
+        """
+        directory = MarkdownCache.directory()
+        # Write into a temporary file first, so readers never see partial files
+        descriptor, path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(pdf)
+        os.replace(path, os.path.join(directory, f'{key}.pdf'))
+        CompilationCache.track(directory, len(pdf), settings.MARKDOWN_CACHE_MAX_SIZE)
@@ -0,0 +1,344 @@
+"""Purpose of this file
+
+This file contains the precompiled preamble formats, the auxiliary files and the
+timings of the LaTeX compilations.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PreambleFormat:
+    """Preamble format
+
+    This class precompiles the preamble of the export template into a custom format file
+    with the package mylatexformat, so that pdflatex does not load the packages of the
+    preamble again for each compilation. The preamble ends with the marker
+    \\csname endofdump\\endcsname, a compilation with the format skips everything before
+    the marker and only processes the document body. Without the format the marker does
+    nothing, so the same source can be compiled with and without the format.
+
+    The formats are stored in the directory LATEX_FORMAT_DIR and named after a hash of
+    the preamble and the pdflatex version, a changed template or a pdflatex update
+    therefore builds a new format. If a format can not be built, e.g. because
+    mylatexformat is not installed, the documents are compiled without it.
+
+    :attr PreambleFormat.marker: The marker which ends the precompiled preamble
+    :type PreambleFormat.marker: bytes
+    """
+    marker = rb'\csname endofdump\endcsname'
+
+    _lock = threading.Lock()
+    _version = None
+    # The names of the formats which could not be built by this process
+    _failed = set()
+
+    @staticmethod
+    def enabled():
+        """Enabled
+
+        Returns whether the preamble should be precompiled.
+
+        :return: true if the formats are enabled
+        :rtype: bool
+        """
+        return getattr(settings, 'LATEX_FORMAT_ENABLED', True)
+
+    @staticmethod
+    def version():
+        """Version
+
+        Returns the version output of pdflatex, which is part of the format names since a
+        format can only be loaded by the pdflatex which built it.
+
+        :return: the version output or None if pdflatex is not available
+        :rtype: bytes or None
+        """
+        if PreambleFormat._version is None:
+            try:
+                process = subprocess.run(['pdflatex', '--version'], stdin=subprocess.DEVNULL,
+                                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                         cwd=tempfile.gettempdir(), check=True,
+                                         timeout=settings.LATEX_FORMAT_TIMEOUT)
+                PreambleFormat._version = process.stdout
+            except (OSError, subprocess.SubprocessError):
+                PreambleFormat._version = b''
+        return PreambleFormat._version or None
+
+    @staticmethod
+    def preamble(rendered_tpl):
+        """Preamble
+
+        Returns the preamble of a rendered template including the marker.
+
+        :param rendered_tpl: The rendered template
+        :type rendered_tpl: bytes
+
+        :return: the preamble or None if the template has no marker
+        :rtype: bytes or None
+        """
+        index = rendered_tpl.find(PreambleFormat.marker)
+        if index < 0:
+            return None
+        return rendered_tpl[:index + len(PreambleFormat.marker)]
+
+    @staticmethod
+    def name(preamble, version):
+        """Name
+
+        Returns the name of the format of a preamble.
+
+        :param preamble: The preamble
+        :type preamble: bytes
+        :param version: The version output of pdflatex
+        :type version: bytes
+
+        :return: the name of the format
+        :rtype: str
+        """
+        digest = hashlib.sha256(version + b'\0' + preamble).hexdigest()
+        return f'preamble-{digest[:32]}'
+
+    @staticmethod
+    def build(name, preamble):
+        """Build
+
+        Builds the format of a preamble in a temporary directory and moves it into the
+        format directory, so that other processes never load a partial format.
+
+        :param name: The name of the format
+        :type name: str
+        :param preamble: The preamble
+        :type preamble: bytes
+
+        :return: true if the format was built
+        :rtype: bool
+        """
+        directory = settings.LATEX_FORMAT_DIR
+        os.makedirs(directory, exist_ok=True)
+        tempdir = tempfile.mkdtemp(dir=directory, prefix='.tmp-')
+        try:
+            with open(os.path.join(tempdir, 'preamble.tex'), 'wb') as file:
+                file.write(preamble)
+            subprocess.run(['pdflatex', '-ini', '-interaction=nonstopmode',
+                            f'-jobname={name}', '&pdflatex', 'mylatexformat.ltx',
+                            'preamble.tex'],
+                           stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, cwd=tempdir,
+                           timeout=settings.LATEX_FORMAT_TIMEOUT, check=False)
+            os.replace(os.path.join(tempdir, f'{name}.fmt'),
+                       os.path.join(directory, f'{name}.fmt'))
+            return True
+        except (OSError, subprocess.SubprocessError):
+            logger.warning('The LaTeX format %s could not be built, compiling without it',
+                           name)
+            return False
+        finally:
+            shutil.rmtree(tempdir, ignore_errors=True)
+
+    @staticmethod
+    def command(rendered_tpl):
+        """Command
+
+        Returns the pdflatex command and its environment to compile a rendered template.
+        The format of its preamble is built if it does not exist yet.
+
+        :param rendered_tpl: The rendered template
+        :type rendered_tpl: bytes
+
+        :return: the command and the environment, which is None for the default environment
+        :rtype: tuple[list[str], dict[str, str] or None]
+        """
+        command = ['pdflatex']
+        preamble = PreambleFormat.preamble(rendered_tpl)
+        if not PreambleFormat.enabled() or preamble is None:
+            return command, None
+        version = PreambleFormat.version()
+        if version is None:
+            return command, None
+        name = PreambleFormat.name(preamble, version)
+        directory = settings.LATEX_FORMAT_DIR
+        path = os.path.join(directory, f'{name}.fmt')
+        if not os.path.exists(path):
+            with PreambleFormat._lock:
+                if name in PreambleFormat._failed:
+                    return command, None
+                if not os.path.exists(path) and not PreambleFormat.build(name, preamble):
+                    PreambleFormat._failed.add(name)
+                    return command, None
+        # The trailing separator keeps the default search path of the formats
+        env = dict(os.environ, TEXFORMATS=os.path.abspath(directory) + os.pathsep)
+        return command + [f'-fmt={name}'], env
+
+
+class CompilationTimings:
+    """Compilation timings
+
+    This class measures the duration of the phases of a compilation, e.g. rendering the
+    templates, converting the Markdown contents, loading the format and the pdflatex
+    passes. Phases with the same name are summed up, e.g. the passes of parallel
+    fragments.
+
+    :attr CompilationTimings.phases: The duration of each phase in seconds
+    :type CompilationTimings.phases: dict[str, float]
+    """
+
+    def __init__(self):
+        """Initializer
+
+        Initializes the timings without any phases.
+        """
+        self.phases = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Phase
+
+        Measures the duration of the enclosed block as the given phase.
+
+        :param name: The name of the phase
+        :type name: str
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + duration
+
+    def __str__(self):
+        """String representation
+
+        Returns the duration of each phase, e.g. render=0.012s pass 1=0.830s.
+
+        :return: the string representation of the timings
+        :rtype: str
+        """
+        return ' '.join(f'{name}={duration:.3f}s' for name, duration in self.phases.items())
+
+
+class AuxFiles:
+    """Auxiliary files
+
+    This class keeps the auxiliary files of a compilation, e.g. the table of contents,
+    between the builds of a document, so that a further pass is only needed if they
+    changed. The files are stored in the directory LATEX_AUX_DIR under the key of the
+    document, e.g. the course of an export.
+
+    :attr AuxFiles.extensions: The extensions of the auxiliary files
+    :type AuxFiles.extensions: tuple[str]
+    :attr AuxFiles.jobname: The name of the compiled document
+    :type AuxFiles.jobname: str
+    """
+    extensions = ('.aux', '.toc', '.out', '.lof', '.lot')
+    jobname = 'texput'
+
+    @staticmethod
+    def directory(key):
+        """Directory
+
+        Returns the directory of the stored auxiliary files of a document.
+
+        :param key: The key of the document
+        :type key: str
+
+        :return: the path to the directory
+        :rtype: str
+        """
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(settings.LATEX_AUX_DIR, digest)
+
+    @staticmethod
+    def snapshot(directory):
+        """Snapshot
+
+        Returns the auxiliary files in the working directory of a compilation.
+
+        :param directory: The working directory
+        :type directory: str
+
+        :return: the contents of the auxiliary files by their name
+        :rtype: dict[str, bytes]
+        """
+        files = {}
+        for extension in AuxFiles.extensions:
+            name = AuxFiles.jobname + extension
+            try:
+                with open(os.path.join(directory, name), 'rb') as file:
+                    files[name] = file.read()
+            except OSError:
+                continue
+        return files
+
+    @staticmethod
+    def restore(key, directory):
+        """Restore
+
+        Copies the stored auxiliary files of a document into the working directory.
+
+        :param key: The key of the document
+        :type key: str
+        :param directory: The working directory
+        :type directory: str
+        """
+        for name, data in AuxFiles.snapshot(AuxFiles.directory(key)).items():
+            with open(os.path.join(directory, name), 'wb') as file:
+                file.write(data)
+
+    @staticmethod
+    def store(key, directory):
+        """Store
+
+        Stores the auxiliary files of the working directory for the next build of a
+        document. Each file is replaced atomically.
+
+        :param key: The key of the document
+        :type key: str
+        :param directory: The working directory
+        :type directory: str
+        """
+        target = AuxFiles.directory(key)
+        os.makedirs(target, exist_ok=True)
+        files = AuxFiles.snapshot(directory)
+        for extension in AuxFiles.extensions:
+            name = AuxFiles.jobname + extension
+            path = os.path.join(target, name)
+            if name not in files:
+                if os.path.exists(path):
+                    os.remove(path)
+                continue
+            descriptor, temp_path = tempfile.mkstemp(dir=target, prefix='.tmp-')
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(files[name])
+            os.replace(temp_path, path)
+
+    @staticmethod
+    def stable(before, after):
+        """Stable
+
+        Returns whether a pass did not change the auxiliary files, so that a further pass
+        would produce the same document. Without any auxiliary file the stability can not
+        be determined.
+
+        :param before: The auxiliary files before the pass
+        :type before: dict[str, bytes]
+        :param after: The auxiliary files after the pass
+        :type after: dict[str, bytes]
+
+        :return: true if no further pass is needed
+        :rtype: bool
+        """
+        return bool(after) and before == after
@@ -3,30 +3,77 @@
 This file contains utility functions related to exporting and rendering files.
 """
 
+import logging
 import os
 import re
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from subprocess import Popen, PIPE
 import pdfkit
 from markdown_it import MarkdownIt
 from mdit_py_plugins.front_matter import front_matter_plugin
 from mdit_py_plugins.footnote import footnote_plugin
 
+from django.conf import settings
 from django.template.loader import get_template
+from django.utils import translation
 
+from export.cache import CompilationCache, MarkdownCache
+from export.engine import AuxFiles, CompilationTimings, PreambleFormat
 from export.templatetags.cc_export_tags import export_template, tex_escape, ret_path
-from content.static.yt_api import seconds_to_time, get_video_length, time_to_string
+from content.models import MDContent
+from content.static.yt_api import seconds_to_time, time_to_string
 
+logger = logging.getLogger(__name__)
 
-class Markdown: # pylint: disable=too-few-public-methods
+
+class Markdown:
     """Markdown
 
     This class provides the function for rendering Markdown into HTML.
+
+    :attr Markdown.parser: The parser for Markdown which is shared by all renderings
+    :type Markdown.parser: MarkdownIt
     """
+    parser = (
+        MarkdownIt()
+        .use(front_matter_plugin)
+        .use(footnote_plugin)
+        .enable('table')
+        .enable('strikethrough')
+        .enable('linkify')
+    )
+
     @staticmethod
     def render(content, is_absolute):
         """Render
 
+        Returns the HTML of the Markdown content with either relative or absolute paths
+        of the attachments. The HTML is stored with the content and only rendered again
+        after the Markdown script or the attachments changed.
+
+        :param content: Markdown content to compile HTML from
+        :type content: MDContent
+        :param is_absolute: decides whether absolute or relative path will be used
+        :type is_absolute: bool
+
+        :return: the rendered HTML
+        :rtype: str
+        """
+        md_content = content.mdcontent
+        field = 'html_absolute' if is_absolute else 'html'
+        html = getattr(md_content, field)
+        if html is None:
+            html = Markdown.render_html(content, is_absolute)
+            # Store the HTML without saving, saving discards the rendered HTML
+            MDContent.objects.filter(pk=md_content.pk).update(**{field: html})
+            setattr(md_content, field, html)
+        return html
+
+    @staticmethod
+    def render_html(content, is_absolute):
+        """Render HTML
+
         Replaces all attachment embedding code in the Markdown content with the path of
         the corresponding attachment, either relative or absolute,
         then compiles and returns the HTML from the Markdown content.
@@ -35,27 +82,20 @@ class Markdown: # pylint: disable=too-few-public-methods
         :type content: MDContent
         :param is_absolute: decides whether absolute or relative path will be used
         :type is_absolute: bool
+
+        :return: the rendered HTML
+        :rtype: str
         """
         text = content.mdcontent.textfield
-        if content.ImageAttachments.count() > 0:
-            attachments = content.ImageAttachments.all()
-            for idx, attachment in enumerate(attachments):
-                if is_absolute:
-                    path = ret_path(attachment.image.url)
-                else:
-                    path = attachment.image.url
-                text = re.sub(rf"!\[(.*?)]\(Image-{idx}(.*?)\)",
-                              rf"![\1]({path}\2)",
-                              text)
-        md_instance = (
-            MarkdownIt()
-            .use(front_matter_plugin)
-            .use(footnote_plugin)
-            .enable('table')
-            .enable('strikethrough')
-            .enable('linkify')
-        )
-        return md_instance.render(text)
+        for idx, attachment in enumerate(content.ImageAttachments.all()):
+            if is_absolute:
+                path = ret_path(attachment.image.url)
+            else:
+                path = attachment.image.url
+            text = re.sub(rf"!\[(.*?)]\(Image-{idx}(.*?)\)",
+                          rf"![\1]({path}\2)",
+                          text)
+        return Markdown.parser.render(text)
 
 
 class Latex:
@@ -71,19 +111,27 @@ class Latex:
     :type Latex.error_prefix: str
     :attr Latex.error_template: The name of the error template
     :type Latex.error_template: str
+    :attr Latex.markdown_options: The options for wkhtmltopdf to convert Markdown contents
+    :type Latex.markdown_options: dict[str, str]
     """
     encoding = 'utf-8'
     error_prefix = '!'
     error_template = 'error'
+    markdown_options = {
+        '--enable-local-file-access': '',
+        'margin-top': '2cm',
+        'margin-right': '1cm',
+        'margin-bottom': '2cm',
+        'margin-left': '1cm'
+    }
 
     @staticmethod
-    def render(context, template_name):
-        # pylint: disable=too-many-locals
-        # pylint: disable=consider-using-with
+    def render(context, template_name, timings=None):
         """Render
 
         Renders the LaTeX code with its content and then compiles the code to generate
-        a PDF with its log.
+        a PDF with its log. The results are cached, identical sources are only compiled once.
+        The duration of each phase of the compilation is logged.
 
         https://github.com/d120/pyophase/blob/master/ophasebase/helper.py
         Retrieved 10.08.2020
@@ -92,71 +140,300 @@ class Latex:
         :type context: dict
         :param template_name: The name of the template to use
         :type template_name: str
+        :param timings: The timings to which the phases are added
+        :type timings: CompilationTimings or None
 
         :return: the rendered LaTeX code as PDF, PDF LaTeX output and its the rendered template
         :rtype: tuple[bytes, tuple[bytes, bytes], str]
         """
+        if timings is None:
+            timings = CompilationTimings()
+        with tempfile.TemporaryDirectory() as tempdir:
+            with timings.phase('render'):
+                template = get_template(template_name)
+                rendered_tpl = template.render(context).encode(Latex.encoding)
+                if 'preview_data' in context:
+                    formset = context['image_formset']
+                    rendered_tpl += Latex.preview_prerender(context['preview_data'], formset,
+                                                            tempdir)
+                else:
+                    # Prerender content templates
+                    for content in context['contents']:
+                        rendered_tpl += Latex.pre_render(content, context['export_pdf'])
+                    rendered_tpl += r"\end{document}".encode(Latex.encoding)
+            if 'preview_data' not in context:
+                with timings.phase('markdown'):
+                    Latex.render_markdown([(content, tempdir) for content in context['contents']
+                                           if content.type == 'MD'], context['export_pdf'])
+            # Have to compile up to 2 times for table of contents to work
+            passes = 2 if context['export_pdf'] else 1
+            result = Latex.compile(template, context, rendered_tpl, passes, tempdir, timings,
+                                   Latex.aux_key(context, template_name))
+        logger.info('Compiled %s: %s', template_name, timings)
+        return result
+
+    @staticmethod
+    def render_fragments(context, template_name, max_workers=None, timings=None):
+        # pylint: disable=too-many-locals
+        """Render fragments
+
+        Renders and compiles every content of the context as a separate document (fragment)
+        and stitches the fragments together with a title page and a table of contents. The
+        fragments are compiled in parallel and cached independently, so the compilation
+        scales with the number of cores and unchanged contents are not compiled again. An
+        erroneous content only replaces its own fragment with the error log. Each fragment
+        starts with the section number of its position, so the sections are numbered as
+        in a single document.
+
+        :param context: The context of the contents to be rendered
+        :type context: dict
+        :param template_name: The name of the template to use
+        :type template_name: str
+        :param max_workers: The number of parallel compilations, defaults to the setting
+                            LATEX_EXPORT_WORKERS
+        :type max_workers: int or None
+        :param timings: The timings to which the phases are added
+        :type timings: CompilationTimings or None
+
+        :return: the stitched PDF, PDF LaTeX output and the rendered stitching template
+        :rtype: tuple[bytes, tuple[bytes, bytes], str]
+        """
+        if max_workers is None:
+            max_workers = settings.LATEX_EXPORT_WORKERS
+        if timings is None:
+            timings = CompilationTimings()
         template = get_template(template_name)
-        rendered_tpl = template.render(context).encode(Latex.encoding)
+        # The fragments do not depend on the course or the user, so they can be shared
+        fragment_context = {'fragment': True, 'export_pdf': context['export_pdf']}
 
         with tempfile.TemporaryDirectory() as tempdir:
-            if 'preview_data' in context:
-                formset = context['image_formset']
-                rendered_tpl += Latex.preview_prerender(context['preview_data'], formset, tempdir)
-            else:
-                # Options for wkhtmltopdf
-                options = {
-                    '--enable-local-file-access': '',
-                    'margin-top': '2cm',
-                    'margin-right': '1cm',
-                    'margin-bottom': '2cm',
-                    'margin-left': '1cm'
-                }
-                # Prerender content templates
-                for content in context['contents']:
+            # Render the fragments here, the database is not accessed by the workers
+            fragments = []
+            with timings.phase('render'):
+                preamble = template.render(fragment_context).encode(Latex.encoding)
+                for idx, content in enumerate(context['contents']):
+                    directory = os.path.join(tempdir, f'fragment_{idx}')
+                    os.mkdir(directory)
+                    # Continue the section numbering of the previous fragments
+                    rendered_tpl = preamble + f'\\setcounter{{section}}{{{idx}}}\n' \
+                        .encode(Latex.encoding)
                     rendered_tpl += Latex.pre_render(content, context['export_pdf'])
-                    if content.type == 'MD':
-                        # Convert Markdown to HTML to PDF to put into export file
-                        md_string = ''
-                        if context['export_pdf']:
-                            # File header
-                            md_string += f"<meta charset='UTF-8'>" \
-                                  f"<h2><span style=\"font-weight:bold\">{content.topic.title}" \
-                                  + "</span></h2><i>" \
-                                  + "Description" \
-                                  + f":</i> {tex_escape(content.description)}"
-                        md_string += Markdown.render(content, True)
-                        pdf = pdfkit.from_string(md_string, options=options)
-                        name = f'MD_{content.pk}.pdf'
-                        md_path = os.path.join(tempdir, name)
-                        with open(md_path, 'wb') as temp_pdf:
-                            temp_pdf.write(pdf)
-                            temp_pdf.close()
-                rendered_tpl += r"\end{document}".encode(Latex.encoding)
-            # Have to compile 2 times for table of contents to work
-            for i in range(0, 2 if context['export_pdf'] else 1):
-                process = Popen(['pdflatex'], stdin=PIPE, stdout=PIPE, cwd=tempdir, )
-                # Output is a byte tuple of stdout and stderr
-                pdflatex_output = process.communicate(rendered_tpl)
-            # Filter error messages in log (stdout)
-            error_log = Latex.errors(pdflatex_output[0])
-            # Error log
-            if len(error_log) != 0:
+                    rendered_tpl += r"\end{document}".encode(Latex.encoding)
+                    fragments.append({'content': content,
+                                      'number': idx + 1,
+                                      'name': f'fragment_{idx}.pdf',
+                                      'directory': directory,
+                                      'tex': rendered_tpl})
+            with timings.phase('markdown'):
+                Latex.render_markdown([(fragment['content'], fragment['directory'])
+                                       for fragment in fragments
+                                       if fragment['content'].type == 'MD'],
+                                      context['export_pdf'], max_workers)
+
+            language = translation.get_language()
+
+            def compile_fragment(fragment):
+                with translation.override(language):
+                    return Latex.compile(template, fragment_context, fragment['tex'], 1,
+                                         fragment['directory'], timings)
+
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                results = list(executor.map(compile_fragment, fragments))
+
+            stitched = []
+            for fragment, (pdf, _, _) in zip(fragments, results):
+                if pdf is None:
+                    continue
+                with open(os.path.join(tempdir, fragment['name']), 'wb') as file:
+                    file.write(pdf)
+                stitched.append(fragment)
+
+            with timings.phase('render'):
                 rendered_tpl = template.render(context).encode(Latex.encoding)
-                # Prerender errors templates
-                rendered_tpl += Latex.pre_render(len(error_log), context['export_pdf'],
-                                                 Latex.error_template, False)
+                rendered_tpl += re.sub('{~~', '{', get_template('content/export/fragments.tex')
+                                       .render({'fragments': stitched})).encode(Latex.encoding)
                 rendered_tpl += r"\end{document}".encode(Latex.encoding)
+            # Have to compile up to 2 times for table of contents to work
+            result = Latex.compile(template, context, rendered_tpl, 2, tempdir, timings,
+                                   Latex.aux_key(context, template_name, fragments=True))
+        logger.info('Compiled %s in fragments: %s', template_name, timings)
+        return result
+
+    @staticmethod
+    def aux_key(context, template_name, fragments=False):
+        """Aux key
+
+        Returns the key under which the auxiliary files of an export are kept between its
+        builds. The exports of the whole course and of the coursebook of a user, the
+        templates and the stitched and directly compiled documents have different
+        auxiliary files, so each of them is kept separately.
+
+        :param context: The context of the rendered template
+        :type context: dict
+        :param template_name: The name of the template
+        :type template_name: str
+        :param fragments: Whether the document is stitched from fragments
+        :type fragments: bool
 
-                process = Popen(['pdflatex'], stdin=PIPE, stdout=PIPE, cwd=tempdir, )
+        :return: the key or None if the auxiliary files are not kept
+        :rtype: str or None
+        """
+        if not context.get('export_pdf') or context.get('course') is None:
+            return None
+        user = context.get('user')
+        export = 'course' if context.get('exp_all') else 'coursebook'
+        mode = 'fragments' if fragments else 'document'
+        return f'{template_name}-{export}-{mode}-course-{context["course"].pk}-' \
+               f'user-{getattr(user, "pk", None)}'
+
+    @staticmethod
+    def compile(template, context, rendered_tpl, passes, directory, timings=None,
+                aux_key=None):
+        # pylint: disable=consider-using-with,too-many-arguments,too-many-locals
+        """Compile
+
+        Compiles the rendered LaTeX code in the given directory. If the compilation fails,
+        the template is compiled again with the error log instead of the contents. The
+        results are cached, identical sources are only compiled once. The preamble is
+        loaded from its precompiled format, so pdflatex only processes the document body.
+
+        The number of passes is a maximum, the compilation stops as soon as a pass does
+        not change the auxiliary files such as the table of contents. With an aux key the
+        auxiliary files of the previous build are restored first, so an unchanged document
+        needs a single pass.
+
+        :param template: The template which was rendered
+        :type template: Template
+        :param context: The context of the rendered template
+        :type context: dict
+        :param rendered_tpl: The rendered LaTeX code
+        :type rendered_tpl: bytes
+        :param passes: The number of pdflatex passes
+        :type passes: int
+        :param directory: The working directory of the compilation
+        :type directory: str
+        :param timings: The timings to which the phases are added
+        :type timings: CompilationTimings or None
+        :param aux_key: The key under which the auxiliary files are kept between builds
+        :type aux_key: str or None
+
+        :return: the PDF, PDF LaTeX output and the final rendered template
+        :rtype: tuple[bytes, tuple[bytes, bytes], str]
+        """
+        if timings is None:
+            timings = CompilationTimings()
+        cache_key = None
+        if CompilationCache.enabled():
+            with timings.phase('cache'):
+                cache_key = CompilationCache.key(rendered_tpl, passes, directory)
+                cached = CompilationCache.get(cache_key)
+            if cached is not None:
+                return cached
+        with timings.phase('format'):
+            command, env = PreambleFormat.command(rendered_tpl)
+        # Restore the auxiliary files after computing the cache key, they are only a hint
+        if aux_key is not None:
+            AuxFiles.restore(aux_key, directory)
+        for idx in range(0, passes):
+            aux_files = AuxFiles.snapshot(directory)
+            with timings.phase(f'pass {idx + 1}'):
+                process = Popen(command, stdin=PIPE, stdout=PIPE, cwd=directory, env=env)
+                # Output is a byte tuple of stdout and stderr
+                pdflatex_output = process.communicate(rendered_tpl)
+            if AuxFiles.stable(aux_files, AuxFiles.snapshot(directory)):
+                break
+        # Filter error messages in log (stdout)
+        error_log = Latex.errors(pdflatex_output[0])
+        if len(error_log) == 0 and aux_key is not None:
+            AuxFiles.store(aux_key, directory)
+        # Error log
+        if len(error_log) != 0:
+            rendered_tpl = template.render(context).encode(Latex.encoding)
+            # Prerender errors templates
+            rendered_tpl += Latex.pre_render(len(error_log), context['export_pdf'],
+                                             Latex.error_template, False)
+            rendered_tpl += r"\end{document}".encode(Latex.encoding)
+
+            with timings.phase('error pass'):
+                process = Popen(command, stdin=PIPE, stdout=PIPE, cwd=directory, env=env)
                 pdflatex_output = process.communicate(rendered_tpl)
-            try:
-                with open(os.path.join(tempdir, 'texput.pdf'), 'rb') as file:
-                    pdf = file.read()
-            except FileNotFoundError:
-                pdf = None
+        try:
+            with open(os.path.join(directory, 'texput.pdf'), 'rb') as file:
+                pdf = file.read()
+        except FileNotFoundError:
+            pdf = None
+        if cache_key is not None:
+            CompilationCache.set(cache_key, pdf, pdflatex_output, rendered_tpl)
         return pdf, pdflatex_output, rendered_tpl
 
+    @staticmethod
+    def render_markdown(contents, export_flag, max_workers=None):
+        """Render Markdown
+
+        Converts the Markdown contents to HTML and then to PDFs in the given directories,
+        so that they can be included into the LaTeX code. The HTML is rendered first,
+        then the conversions run in parallel. The PDFs are cached by the HTML, unchanged
+        contents are not converted again.
+
+        :param contents: The Markdown contents with the directory of their compilation
+        :type contents: list[tuple[Content, str]]
+        :param export_flag: True if export, False if simple content compilation
+        :type export_flag: bool
+        :param max_workers: The number of parallel conversions, defaults to the setting
+                            LATEX_EXPORT_WORKERS
+        :type max_workers: int or None
+        """
+        if not contents:
+            return
+        if max_workers is None:
+            max_workers = settings.LATEX_EXPORT_WORKERS
+        # Render the HTML here, the database is not accessed by the workers
+        documents = []
+        for content, directory in contents:
+            md_string = ''
+            if export_flag:
+                # File header
+                md_string += f"<meta charset='UTF-8'>" \
+                      f"<h2><span style=\"font-weight:bold\">{content.topic.title}" \
+                      + "</span></h2><i>" \
+                      + "Description" \
+                      + f":</i> {tex_escape(content.description)}"
+            md_string += Markdown.render(content, True)
+            documents.append((md_string, os.path.join(directory, f'MD_{content.pk}.pdf')))
+
+        # Identical HTML is only converted once
+        sources = list(dict.fromkeys(html for html, _ in documents))
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            pdfs = dict(zip(sources, executor.map(Latex.convert_markdown, sources)))
+
+        for html, md_path in documents:
+            with open(md_path, 'wb') as temp_pdf:
+                temp_pdf.write(pdfs[html])
+
+    @staticmethod
+    def convert_markdown(html):
+        """Convert Markdown
+
+        Converts the HTML of a Markdown content to a PDF. The results are cached,
+        identical HTML is only converted once.
+
+        :param html: The HTML of the Markdown content
+        :type html: str
+
+        :return: the converted PDF
+        :rtype: bytes
+        """
+        cache_key = None
+        if CompilationCache.enabled():
+            cache_key = MarkdownCache.key(html, Latex.markdown_options)
+            pdf = MarkdownCache.get(cache_key)
+            if pdf is not None:
+                return pdf
+        pdf = pdfkit.from_string(html, options=Latex.markdown_options)
+        if cache_key is not None:
+            MarkdownCache.set(cache_key, pdf)
+        return pdf
+
     @staticmethod
     def errors(lob):
         """Error log
@@ -219,20 +496,16 @@ class Latex:
         # Set context for rendering
         # Set value for preview_flag to avoid error when rendering template for LaTeX
         context = {'content': content, 'export_pdf': export_flag, 'preview_flag': False}
-        if no_error:
-            if content.description == '':
-                context['no_desc'] = True
-            else:
-                context['no_desc'] = False
         if no_error and content.type == 'YouTubeVideo':
 
             context['startTime'] = content.ytvideocontent.start_time
             context['endTime'] = content.ytvideocontent.end_time
 
-            total_hours, total_minutes, total_seconds = \
-                seconds_to_time(get_video_length(content.ytvideocontent.id))
-
-            context['length'] = time_to_string(total_hours, total_minutes, total_seconds)
+            # The length of a video which can not be found is not shown
+            length = content.ytvideocontent.get_length()
+            if length is not None:
+                total_hours, total_minutes, total_seconds = seconds_to_time(length)
+                context['length'] = time_to_string(total_hours, total_minutes, total_seconds)
 
         # render the template and use escape for triple braces with escape character ~~
         # this is relevant when using triple braces for file paths in tex data
@@ -0,0 +1,203 @@
+"""Purpose of this file
+
+This file contains the queue which compiles export jobs in the background.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.signals import request_started
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.dispatch import receiver
+from django.utils import timezone, translation
+
+from export.models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+class ExportJobQueue:
+    """Export job queue
+
+    This class takes care of submitting and compiling export jobs. The jobs are compiled
+    by a local pool of worker threads, so that the compilation does not block the worker
+    which handles the request. The size of the pool limits the number of concurrent
+    compilations per process and is configured with the setting EXPORT_JOB_WORKERS. If it
+    is set to 0, jobs are compiled directly when they are submitted.
+
+    Jobs are stored in the database and claimed atomically before they are compiled.
+    Pending jobs of a previous run and jobs which were interrupted while running are
+    resumed when the pool is started, which happens with the first request handled by
+    the process. If jobs are compiled directly, they are only resumed by the management
+    command run_export_jobs.
+    """
+    _executor = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def executor():
+        """Executor
+
+        Returns the worker pool of this process and starts it if necessary. When the pool
+        is started, unfinished jobs from previous runs are resumed.
+
+        :return: the worker pool or None if jobs are compiled directly
+        :rtype: ThreadPoolExecutor or None
+        """
+        if settings.EXPORT_JOB_WORKERS <= 0:
+            return None
+        with ExportJobQueue._lock:
+            if ExportJobQueue._executor is None:
+                ExportJobQueue._executor = ThreadPoolExecutor(
+                    max_workers=settings.EXPORT_JOB_WORKERS,
+                    thread_name_prefix='export-job')
+                for job_id in ExportJobQueue.resumable():
+                    ExportJobQueue._executor.submit(ExportJobQueue.work, job_id)
+        return ExportJobQueue._executor
+
+    @staticmethod
+    def submit(user, course, exp_all, file_name):
+        """Submit
+
+        Creates an export job and queues it for compilation. The job is compiled in the
+        language which is active when it is submitted.
+
+        :param user: The user who requests the export
+        :type user: Profile
+        :param course: The course to export
+        :type course: Course
+        :param exp_all: Indicator if the whole course (T) or the coursebook (F) should be
+                        exported
+        :type exp_all: bool
+        :param file_name: The name of the exported file without extension
+        :type file_name: str
+
+        :return: the created job
+        :rtype: ExportJob
+        """
+        ExportJobQueue.delete_expired()
+        job = ExportJob.objects.create(user=user, course=course, exp_all=exp_all,
+                                       file_name=str(file_name),
+                                       language=translation.get_language() or '')
+        executor = ExportJobQueue.executor()
+        if executor is None:
+            ExportJobQueue.run(job.pk)
+            job.refresh_from_db()
+        else:
+            # Only queue the job once it is visible to the worker threads
+            transaction.on_commit(lambda: executor.submit(ExportJobQueue.work, job.pk))
+        return job
+
+    @staticmethod
+    def resumable():
+        """Resumable jobs
+
+        Resets jobs which are running longer than the setting EXPORT_JOB_TIMEOUT, e.g.
+        because the process compiling them was stopped, and returns the ids of all jobs
+        which are waiting to be compiled.
+
+        :return: the ids of the pending jobs
+        :rtype: list[int]
+        """
+        timeout = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_TIMEOUT)
+        ExportJob.objects.filter(status=ExportJob.RUNNING, start_date__lt=timeout) \
+            .update(status=ExportJob.PENDING, start_date=None)
+        return list(ExportJob.objects.filter(status=ExportJob.PENDING)
+                    .order_by('creation_date').values_list('pk', flat=True))
+
+    @staticmethod
+    def work(job_id):
+        """Work
+
+        Compiles the job in a worker thread and releases the database connection of
+        the thread afterwards.
+
+        :param job_id: The id of the job
+        :type job_id: int
+        """
+        close_old_connections()
+        try:
+            ExportJobQueue.run(job_id)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Export job %s could not be compiled', job_id)
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def run(job_id):
+        """Run
+
+        Claims the job with the given id and compiles it. If the job was already claimed,
+        e.g. by another process, nothing happens.
+
+        :param job_id: The id of the job
+        :type job_id: int
+
+        :return: true if the job was compiled by this call
+        :rtype: bool
+        """
+        # pylint: disable=import-outside-toplevel
+        from export.views import compile_course
+
+        claimed = ExportJob.objects.filter(pk=job_id, status=ExportJob.PENDING) \
+            .update(status=ExportJob.RUNNING, start_date=timezone.now())
+        if not claimed:
+            return False
+
+        job = ExportJob.objects.select_related('user__user').get(pk=job_id)
+        try:
+            with translation.override(job.language or settings.LANGUAGE_CODE):
+                pdf, pdflatex_output, tex_template = compile_course(job.user.user,
+                                                                    job.course_id,
+                                                                    job.exp_all)
+            job.log = pdflatex_output[0].decode('utf-8', errors='ignore')
+            job.tex = tex_template.decode('utf-8', errors='ignore')
+            if pdf:
+                job.pdf.save(f'{job.file_name}.pdf', ContentFile(pdf), save=False)
+                job.status = ExportJob.DONE
+            else:
+                job.status = ExportJob.FAILED
+        except Exception as error:  # pylint: disable=broad-except
+            logger.exception('Export job %s failed', job_id)
+            job.log = str(error)
+            job.status = ExportJob.FAILED
+        job.end_date = timezone.now()
+        job.save()
+        return True
+
+    @staticmethod
+    def delete_expired():
+        """Delete expired jobs
+
+        Deletes finished jobs and their files which are older than the setting
+        EXPORT_JOB_RETENTION (in seconds).
+        """
+        expired = timezone.now() - timedelta(seconds=settings.EXPORT_JOB_RETENTION)
+        jobs = ExportJob.objects.filter(Q(status=ExportJob.DONE) | Q(status=ExportJob.FAILED),
+                                        end_date__lt=expired)
+        for job in jobs:
+            if job.pdf:
+                job.pdf.delete(save=False)
+            job.delete()
+
+
+@receiver(request_started)
+def start_export_jobs(sender, **kwargs):  # pylint: disable=unused-argument
+    """Start export jobs
+
+    Starts the worker pool with the first request of the process, so that the unfinished
+    jobs of previous runs are resumed without waiting for a new export. The receiver is
+    disconnected once the pool is started.
+
+    :param sender: The sender of the signal
+    :type sender: type
+    :param kwargs: The keyword arguments
+    :type kwargs: Any
+    """
+    if ExportJobQueue.executor() is not None:
+        request_started.disconnect(start_export_jobs)
@@ -0,0 +1,38 @@
+"""Purpose of this file
+
+This file contains the management command to compile the pending export jobs.
+"""
+
+from django.core.management.base import BaseCommand
+
+from export.jobs import ExportJobQueue
+
+
+class Command(BaseCommand):
+    """Run export jobs
+
+    Compiles all pending export jobs and the jobs which were interrupted, e.g. by a
+    restart of the server. Jobs which are compiled by another process in the meantime
+    are skipped.
+
+    :attr Command.help: The help text of the command
+    :type Command.help: str
+    """
+    help = 'Compiles the pending export jobs'
+
+    def handle(self, *args, **options):
+        """Handle
+
+        Executes the command.
+
+        :param args: The arguments
+        :type args: Any
+        :param options: The options of the command
+        :type options: dict[str, Any]
+        """
+        ExportJobQueue.delete_expired()
+        count = 0
+        for job_id in ExportJobQueue.resumable():
+            if ExportJobQueue.run(job_id):
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f'Compiled {count} export jobs'))
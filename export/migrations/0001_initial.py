@@ -0,0 +1,44 @@
+# Generated by Django 3.2.20 on 2026-10-18 04:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('base', '0023_content_topic_rating_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exp_all', models.BooleanField(default=True, verbose_name='Export whole course')),
+                ('file_name', models.CharField(max_length=250, verbose_name='File name')),
+                ('language', models.CharField(blank=True, max_length=30, verbose_name='Language')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10, verbose_name='Status')),
+                ('creation_date', models.DateTimeField(blank=True, default=django.utils.timezone.now, verbose_name='Creation Date')),
+                ('start_date', models.DateTimeField(blank=True, null=True, verbose_name='Start Date')),
+                ('end_date', models.DateTimeField(blank=True, null=True, verbose_name='End Date')),
+                ('pdf', models.FileField(blank=True, upload_to='uploads/exports/%Y/%m/%d/', verbose_name='PDF')),
+                ('log', models.TextField(blank=True, verbose_name='Log')),
+                ('tex', models.TextField(blank=True, verbose_name='Rendered template')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='base.course', verbose_name='Course')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_jobs', to='base.profile', verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Export Job',
+                'verbose_name_plural': 'Export Jobs',
+                'ordering': ['-creation_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='exportjob',
+            index=models.Index(fields=['status', 'start_date'], name='exportjob_status_idx'),
+        ),
+    ]
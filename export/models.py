@@ -0,0 +1,145 @@
+"""Purpose of this file
+
+This file describes or defines the export jobs which compile courses and
+coursebooks in the background.
+"""
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class ExportJob(models.Model):
+    """Export job
+
+    This model represents the export of a course or a coursebook into a PDF. The job is
+    persisted, so that it survives restarts of the server, and compiled in the background
+    by the export job queue. After the compilation the PDF or, if the compilation failed,
+    the PDF LaTeX output and the rendered template are stored.
+
+    :attr ExportJob.PENDING: The status of a job waiting to be compiled
+    :type ExportJob.PENDING: str
+    :attr ExportJob.RUNNING: The status of a job being compiled
+    :type ExportJob.RUNNING: str
+    :attr ExportJob.DONE: The status of a successfully compiled job
+    :type ExportJob.DONE: str
+    :attr ExportJob.FAILED: The status of a job whose compilation failed
+    :type ExportJob.FAILED: str
+    :attr ExportJob.STATUS_CHOICES: The choices of the status
+    :type ExportJob.STATUS_CHOICES: list[tuple[str, str]]
+    :attr ExportJob.user: The user who requested the export
+    :type ExportJob.user: ForeignKey - Profile
+    :attr ExportJob.course: The course to export
+    :type ExportJob.course: ForeignKey - Course
+    :attr ExportJob.exp_all: Indicator if the whole course (T) or the coursebook (F) is exported
+    :type ExportJob.exp_all: BooleanField
+    :attr ExportJob.file_name: The name of the exported file without extension
+    :type ExportJob.file_name: CharField
+    :attr ExportJob.language: The language to compile the export in
+    :type ExportJob.language: CharField
+    :attr ExportJob.status: The status of the job
+    :type ExportJob.status: CharField
+    :attr ExportJob.creation_date: The date when the job was submitted
+    :type ExportJob.creation_date: DateTimeField
+    :attr ExportJob.start_date: The date when the compilation started
+    :type ExportJob.start_date: DateTimeField
+    :attr ExportJob.end_date: The date when the compilation finished
+    :type ExportJob.end_date: DateTimeField
+    :attr ExportJob.pdf: The exported PDF
+    :type ExportJob.pdf: FileField
+    :attr ExportJob.log: The PDF LaTeX output of the compilation
+    :type ExportJob.log: TextField
+    :attr ExportJob.tex: The rendered template of the compilation
+    :type ExportJob.tex: TextField
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, _('Pending')),
+        (RUNNING, _('Running')),
+        (DONE, _('Done')),
+        (FAILED, _('Failed')),
+    ]
+
+    user = models.ForeignKey("base.Profile",
+                             verbose_name=_("User"),
+                             on_delete=models.CASCADE,
+                             related_name="export_jobs")
+    course = models.ForeignKey("base.Course",
+                               verbose_name=_("Course"),
+                               on_delete=models.CASCADE,
+                               related_name="export_jobs")
+    exp_all = models.BooleanField(verbose_name=_("Export whole course"),
+                                  default=True)
+    file_name = models.CharField(verbose_name=_("File name"),
+                                 max_length=250)
+    language = models.CharField(verbose_name=_("Language"),
+                                max_length=30,
+                                blank=True)
+
+    status = models.CharField(verbose_name=_("Status"),
+                              max_length=10,
+                              choices=STATUS_CHOICES,
+                              default=PENDING)
+    creation_date = models.DateTimeField(verbose_name=_('Creation Date'),
+                                         default=timezone.now,
+                                         blank=True)
+    start_date = models.DateTimeField(verbose_name=_('Start Date'),
+                                      blank=True,
+                                      null=True)
+    end_date = models.DateTimeField(verbose_name=_('End Date'),
+                                    blank=True,
+                                    null=True)
+
+    pdf = models.FileField(verbose_name=_("PDF"),
+                           upload_to='uploads/exports/%Y/%m/%d/',
+                           blank=True)
+    log = models.TextField(verbose_name=_("Log"),
+                           blank=True)
+    tex = models.TextField(verbose_name=_("Rendered template"),
+                           blank=True)
+
+    class Meta:
+        """Meta options
+
+        This class handles all possible meta options that you can give to this model.
+
+        :attr Meta.verbose_name: A human-readable name for the object in singular
+        :type Meta.verbose_name: __proxy__
+        :attr Meta.verbose_name_plural: A human-readable name for the object in plural
+        :type Meta.verbose_name_plural: __proxy__
+        :attr Meta.ordering: The default ordering for the object
+        :type Meta.ordering: list[str]
+        :attr Meta.indexes: The indexes to define on the model
+        :type Meta.indexes: list[Index]
+        """
+        verbose_name = _("Export Job")
+        verbose_name_plural = _("Export Jobs")
+        ordering = ['-creation_date']
+        indexes = [
+            models.Index(fields=['status', 'start_date'], name='exportjob_status_idx'),
+        ]
+
+    def __str__(self):
+        """String representation
+
+        Returns the string representation of this object.
+
+        :return: the string representation of this object
+        :rtype: str
+        """
+        return f"{self.file_name} ({self.status}) for {self.user}"
+
+    @property
+    def finished(self):
+        """Finished
+
+        Returns whether the compilation of the job is finished.
+
+        :return: true if the job is done or failed
+        :rtype: bool
+        """
+        return self.status in (ExportJob.DONE, ExportJob.FAILED)
@@ -3,12 +3,19 @@
 This file contains functions related to generating views.
 """
 
-from django.http import HttpResponse
-from django.shortcuts import render
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.views.decorators.http import require_POST
 
-from base.models import Course, Favorite, Content
+from base.models import Course, Content
+from base.utils import get_coursebook
 
 from export.helper_functions import Latex
+from export.jobs import ExportJobQueue
+from export.models import ExportJob
 
 
 def pdf_compile(request, pk, exp_all,  # pylint: disable=invalid-name
@@ -34,16 +41,42 @@ def pdf_compile(request, pk, exp_all,  # pylint: disable=invalid-name
             template
     :rtype: tuple[bytes, tuple[bytes, bytes], str]
     """
+    return compile_course(request.user, pk, exp_all, template, context)
+
+
+def compile_course(user, pk, exp_all,  # pylint: disable=invalid-name
+                   template="content/export/base.tex",
+                   context=None):
+    """Compile course
+
+    Compiles the course or the coursebook of the given user. This is used by requests
+    as well as by the export job queue, which has no request.
+
+    :param user: The user who exports the course
+    :type user: User
+    :param pk: The primary key of the course
+    :type pk: int
+    :param exp_all: Indicator if the whole course (T) or the coursebook (F)should be
+                    exported
+    :type exp_all: bool
+    :param template: The path of the LaTeX template to use
+    :type template: str
+    :param context: The context of the content
+    :type context: dict[str, Any]
+    :return: the generated coursebook as PDF, PDF LaTeX output and as an rendered
+            template
+    :rtype: tuple[bytes, tuple[bytes, bytes], str]
+    """
 
     if context is None:
         context = {}
-    user = request.user
     course = Course.objects.get(pk=pk)
 
     # Set Context
     context['user'] = user
     context['course'] = course
     context['export_pdf'] = True
+    context['exp_all'] = exp_all
     context['contents'] = []
 
     # Check if we want to export the whole course or only the coursebook
@@ -53,14 +86,13 @@ def pdf_compile(request, pk, exp_all,  # pylint: disable=invalid-name
             for content in contents:
                 context['contents'].append(content)
     else:
-        context['contents'] = [
-            favorite.content
-            for favorite in
-            Favorite.objects.filter(user=user.profile, course=course)
-        ]
+        context['contents'] = get_coursebook(user.profile, course)
 
     # Perform compilation given context and template
-    (pdf, pdflatex_output, tex_template) = Latex.render(context, template)
+    if settings.LATEX_EXPORT_FRAGMENTS:
+        (pdf, pdflatex_output, tex_template) = Latex.render_fragments(context, template)
+    else:
+        (pdf, pdflatex_output, tex_template) = Latex.render(context, template)
     return pdf, pdflatex_output, tex_template
 
 
@@ -93,6 +125,99 @@ def generate_coursebook_response(request, pk, exp_all, file_name=None):  # pylin
     (pdf, pdflatex_output, tex_template) = pdf_compile(request, pk, exp_all)
     return write_response(request, pdf, pdflatex_output, tex_template, file_name + ".pdf")
 
+
+def export_job_data(job):
+    """Export job data
+
+    Returns the JSON representation of an export job which is used to poll its status.
+
+    :param job: The export job
+    :type job: ExportJob
+
+    :return: the id, status and the URLs of the job
+    :rtype: dict[str, Any]
+    """
+    return {'id': job.pk,
+            'status': job.status,
+            'status_url': reverse('frontend:export-job', args=(job.pk,)),
+            'download_url': reverse('frontend:export-job-download', args=(job.pk,))}
+
+
+@login_required
+@require_POST
+def submit_export_job(request, pk, exp_all, file_name=None):  # pylint: disable=invalid-name
+    """Submit export job
+
+    Queues the export of a course or a coursebook. The PDF is compiled in the background,
+    the status of the job can be polled with the returned status URL and the PDF can be
+    downloaded with the download URL once the job is done.
+
+    :param request: The given request
+    :type request: WSGIRequest
+    :param pk: The primary key of the course
+    :type pk: int
+    :param exp_all: Indicator if the whole course (T) or the coursebook (F) should
+                    be exported
+    :type exp_all: bool
+    :param file_name: The name of the file
+    :type file_name: str
+
+    :return: the JSON response describing the submitted job
+    :rtype: JsonResponse
+    """
+    course = get_object_or_404(Course, pk=pk)
+    # If we have no file name, name the file after the course title
+    if not file_name:
+        file_name = f"{course.title}"
+    job = ExportJobQueue.submit(request.user.profile, course, exp_all, file_name)
+    return JsonResponse(export_job_data(job), status=202)
+
+
+@login_required
+def export_job_status(request, pk):  # pylint: disable=invalid-name
+    """Export job status
+
+    Returns the status of an export job of the user.
+
+    :param request: The given request
+    :type request: WSGIRequest
+    :param pk: The primary key of the export job
+    :type pk: int
+
+    :return: the JSON response describing the job
+    :rtype: JsonResponse
+    """
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user.profile)
+    return JsonResponse(export_job_data(job))
+
+
+@login_required
+def export_job_download(request, pk):  # pylint: disable=invalid-name
+    """Export job download
+
+    Sends the PDF of a finished export job of the user. If the compilation failed, the
+    rendering error is shown instead.
+
+    :param request: The given request
+    :type request: WSGIRequest
+    :param pk: The primary key of the export job
+    :type pk: int
+
+    :return: the http response of the PDF file
+    :rtype: HttpResponse
+    """
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user.profile)
+    if job.status == ExportJob.FAILED:
+        return render(request,
+                      "frontend/coursebook/rendering-error.html",
+                      {"content": job.log,
+                       "tex_template": job.tex})
+    if job.status != ExportJob.DONE:
+        return JsonResponse(export_job_data(job), status=409)
+    return FileResponse(job.pdf.open('rb'), as_attachment=True,
+                        filename=job.file_name + ".pdf",
+                        content_type='application/pdf')
+
 # pylint: disable=too-many-arguments
 def write_response(request, pdf, pdflatex_output, tex_template, filename,
                    content_type='application/pdf'):
@@ -0,0 +1,50 @@
+/**
+ * The interval in milliseconds to poll the status of an export job.
+ * @type {number}
+ */
+const EXPORT_POLL_INTERVAL = 2000;
+
+/**
+ * Polls the status of the given export job until it is finished. If the job is done, the PDF is
+ * downloaded, if it failed, the rendering error is shown.
+ *
+ * @param job the export job as returned by the server
+ */
+function pollExportJob(job) {
+    if (job.status === "done" || job.status === "failed") {
+        window.location.href = job.download_url;
+        return;
+    }
+    setTimeout(function () {
+        $.getJSON(job.status_url)
+            .done(pollExportJob)
+            .fail(function (data) {
+                const message = gettext("Error during data transfer to the server - status: %s");
+                showNotification(interpolate(message, [data.status]), "alert-danger");
+            });
+    }, EXPORT_POLL_INTERVAL);
+}
+
+/**
+ * Submits an export job for the clicked export link and downloads the PDF once it is compiled.
+ * The link itself is used as fallback if the job could not be submitted.
+ *
+ * @param event the click event of the export link
+ * @param url the url to submit the export job
+ */
+function startExport(event, url) {
+    event.preventDefault();
+    const fallback = event.currentTarget.href;
+    sendRequest({
+        url: url,
+        data: {},
+        success: function (job) {
+            showNotification(gettext("The export has started, the PDF will be downloaded when it is ready."),
+                "alert-info");
+            pollExportJob(job);
+        },
+        error: function () {
+            window.open(fallback, "_blank");
+        }
+    });
+}
@@ -0,0 +1,24 @@
+/**
+ * Rates the content with the clicked star without reloading the page and shows the new average
+ * rating. The rating link is used as fallback if the rating could not be sent.
+ *
+ * @param event the click event of the star
+ * @param url the url to send the rating
+ * @param fallback the url to rate the content by loading the page
+ */
+function rateContent(event, url, fallback) {
+    event.preventDefault();
+    sendRequest({
+        url: url,
+        data: {},
+        success: function (data) {
+            $('#rating-average').text(data.average + '/5');
+            $('.starrating input').each(function () {
+                $(this).toggleClass('active', Number(this.value) <= data.average);
+            });
+        },
+        error: function () {
+            window.location.href = fallback;
+        }
+    });
+}
@@ -7,12 +7,14 @@ import re
 
 from django import template
 from django.conf import settings
+from django.templatetags.static import static
 
-from base.models import Favorite
+from base.utils import get_coursebook as get_coursebook_contents
+from base.thumbnails import Thumbnails
 
 from collab_coursebook.settings import ALLOW_PUBLIC_COURSE_EDITING_BY_EVERYONE
 
-from content.models import CONTENT_TYPES
+from content.models import CONTENT_TYPES, BasePDFModel
 
 register = template.Library()
 
@@ -51,23 +53,45 @@ def footer_info():
 
 
 @register.filter
-def count_content(topic_queryset):
+def count_content(course):
     """Count content
 
-    This method counts the contents of the topics in a queryset.
+    This method counts the contents of a course. The number annotated by the course list
+    is used if available, so that no further query is needed.
 
-    :param topic_queryset: The queryset
-    :type topic_queryset: QuerySet[Topic]
+    :param course: The course
+    :type course: Course
 
     :return: the number of contents
     :rtype: str
     """
-    count = 0
-    for topic in topic_queryset:
-        count += len(topic.get_contents("None", "None"))
+    count = getattr(course, 'content_count', None)
+    if count is None:
+        count = course.count_contents()
     return str(count)
 
 
+@register.filter
+def is_starred(course, user):
+    """Is starred
+
+    Checks if the user starred the course. The flag annotated by the course list is used
+    if available, so that no further query is needed.
+
+    :param course: The course
+    :type course: Course
+    :param user: The user
+    :type user: User
+
+    :return: true if the user starred the course
+    :rtype: bool
+    """
+    starred = getattr(course, 'starred', None)
+    if starred is None:
+        starred = user.profile.stared_courses.filter(pk=course.pk).exists()
+    return starred
+
+
 @register.filter
 def rev_range(arg):
     """Review range
@@ -134,6 +158,26 @@ def content_card(content_type):
     return "content/cards/blank.html"
 
 
+@register.filter
+def preview_url(content, size):
+    """Preview URL
+
+    Gets the URL of the preview of the content in the given size of the setting
+    PREVIEW_SIZES or of a placeholder if the preview is not generated yet.
+
+    :param content: The content
+    :type content: Content
+    :param size: The name of the size
+    :type size: str
+
+    :return: the URL of the preview
+    :rtype: str
+    """
+    if not content.preview:
+        return static('content/preview_pending.svg')
+    return content.preview.storage.url(BasePDFModel.preview_name(content.preview.name, size))
+
+
 @register.filter
 def check_edit_course_permission(user, course):
     """Edit course permission
@@ -233,6 +277,40 @@ def add_content_button(user, course_id, topic_id):
             'content_data': content_data}
 
 
+@register.inclusion_tag("frontend/utils/responsive_image.html")
+def responsive_image(image, sizes, alt='', css_class='', style=''):  # pylint: disable=too-many-arguments
+    """Responsive image
+
+    Generates a picture of an uploaded image with the thumbnails of the formats and widths
+    of the settings THUMBNAIL_FORMATS and THUMBNAIL_WIDTHS, so that the browser loads the
+    smallest sufficient thumbnail in the best supported format.
+
+    :param image: The uploaded image
+    :type image: ImageFieldFile
+    :param sizes: The sizes attribute, i.e. the displayed width of the image
+    :type sizes: str
+    :param alt: The alternative text of the image
+    :type alt: str
+    :param css_class: The CSS classes of the image
+    :type css_class: str
+    :param style: The style of the image
+    :type style: str
+
+    :return: The picture as html element
+    :rtype: dict[str, Any]
+    """
+    *source_formats, image_format = settings.THUMBNAIL_FORMATS
+    sources = [(f'image/{source_format.lower()}', Thumbnails.srcset(image, source_format))
+               for source_format in source_formats]
+    return {'image': image,
+            'sources': [(mime_type, srcset) for mime_type, srcset in sources if srcset],
+            'srcset': Thumbnails.srcset(image, image_format),
+            'sizes': sizes,
+            'alt': alt,
+            'css_class': css_class,
+            'style': style}
+
+
 @register.filter
 def get_coursebook(user, course):
     """Get coursebook
@@ -247,9 +325,7 @@ def get_coursebook(user, course):
     :return: the coursebook
     :rtype: list[Content]
     """
-    favorites = Favorite.objects.filter(user=user.profile, course=course)
-    coursebook = [favorite.content for favorite in favorites]
-    return coursebook
+    return get_coursebook_contents(user.profile, course)
 
 
 def js_escape(value):
@@ -9,7 +9,8 @@ from django.utils.translation import gettext_lazy as _
 
 from content.models import CONTENT_TYPES
 
-from export.views import generate_coursebook_response
+from export.views import generate_coursebook_response, submit_export_job, \
+    export_job_status, export_job_download
 
 from frontend import views
 
@@ -26,6 +27,9 @@ urlpatterns = [
     path('search/',
          views.search.SearchView.as_view(),
          name='search'),
+    path('search/results/',
+         views.search.search_results,
+         name='search-results'),
     path('tutorial/',
          views.TutorialView.as_view(),
          name='tutorial'),
@@ -78,6 +82,14 @@ urlpatterns = [
                  generate_coursebook_response,
                  {'exp_all': True},
                  name='export-course'),
+            path('coursebook/jobs/',
+                 submit_export_job,
+                 {'exp_all': False, 'file_name': _('Coursebook')},
+                 name='coursebook-generate-job'),
+            path('export/jobs/',
+                 submit_export_job,
+                 {'exp_all': True},
+                 name='export-course-job'),
         ])),
         path('<int:course_id>/topic/<int:topic_id>/content/', include([
 
@@ -90,6 +102,9 @@ urlpatterns = [
                 path('rate/<int:pk>/',
                      views.rate_content,
                      name='rating'),
+                path('rate/<int:pk>/json/',
+                     views.rate_content_json,
+                     name='rating-json'),
                 path('comment/<int:pk>/delete/',
                      views.DeleteComment.as_view(),
                      name='comment-delete'),
@@ -165,5 +180,14 @@ urlpatterns = [
              name='period-courses'),
     ])),
 
+    path('exports/<int:pk>/', include([
+        path('',
+             export_job_status,
+             name='export-job'),
+        path('download/',
+             export_job_download,
+             name='export-job-download'),
+    ])),
+
     path('jsi18n/', JavaScriptCatalog.as_view(), name='javascript-catalog'),
 ]
@@ -5,7 +5,7 @@ frontend views related operation.
 """
 
 from .content import ContentView
-from .content import rate_content
+from .content import rate_content, rate_content_json
 
 from .course import CourseView, AddCourseView, EditCourseStructureView, CourseDeleteView
 
@@ -5,29 +5,32 @@ This file describes the frontend views related to content types.
 
 
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.http import HttpResponseRedirect, HttpResponse
+from django.http import HttpResponseRedirect, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy, reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django.views.decorators.http import require_POST
 from django.views.generic import DetailView, CreateView, DeleteView, UpdateView
 from django.conf import settings
 
-from base.models import Content, Comment, Course, Topic, Favorite
-from base.utils import get_user
+from base.models import Content, Comment, Course, Topic, Favorite, Rating
+from base.utils import get_coursebook, get_user
 
 from content.attachment.forms import ImageAttachmentFormSet, LatexPreviewImageAttachmentFormSet
 from content.attachment.models import ImageAttachment, IMAGE_ATTACHMENT_TYPES
 from content.forms import CONTENT_TYPE_FORMS, EditMD
 from content.models import CONTENT_TYPES
+from content.previews import PreviewQueue
 from content.static.yt_api import timestamp_to_seconds
 
 from frontend.forms.comment import CommentForm
 from frontend.forms.content import AddContentForm, EditContentForm, TranslateForm
 from frontend.templatetags.cc_frontend_tags import js_escape
-from frontend.views.history import Reversion
+from frontend.views.history import EditRevisionMixin, Reversion
 from frontend.views.validator import Validator
 
 from export.helper_functions import Markdown
@@ -87,15 +90,47 @@ def rate_content(request, course_id, topic_id, content_id, pk):  # pylint: disab
     :rtype: HttpResponse
     """
     content = get_object_or_404(Content, pk=content_id)
-    profile = get_user(request)
-    content.rate_content(user=profile, rating=pk)
+    if pk in dict(Rating.CHOICES):
+        content.rate_content(user=get_user(request), rating=pk)
 
     return HttpResponseRedirect(
         reverse_lazy('frontend:content', args=(course_id, topic_id, content_id,))
         + '#rating')
 
 
-class AddContentView(SuccessMessageMixin, LoginRequiredMixin, CreateView):
+@login_required
+@require_POST
+def rate_content_json(request, course_id, topic_id, content_id, pk):
+    # pylint: disable=invalid-name,unused-argument
+    """Rate content JSON
+
+    Lets the user rate content without reloading the page and returns the new rating
+    aggregates of the content.
+
+    :param request: The given request
+    :type request: HttpRequest
+    :param course_id: The course id
+    :type course_id: int
+    :param topic_id: The id of the topic
+    :type topic_id: int
+    :param content_id: The id of the content which gets rated
+    :type content_id: int
+    :param pk: The user rating (should be in [ 1, 2, 3, 4, 5])
+    :type pk: int
+
+    :return: the rating of the user, the average and the number of ratings
+    :rtype: JsonResponse
+    """
+    content = get_object_or_404(Content, pk=content_id)
+    if pk not in dict(Rating.CHOICES):
+        return JsonResponse({'error': 'invalid rating'}, status=400)
+    content.rate_content(user=get_user(request), rating=pk)
+    return JsonResponse({'rating': pk,
+                         'average': content.get_rate(),
+                         'count': content.get_rate_count()})
+
+
+class AddContentView(SuccessMessageMixin, LoginRequiredMixin, EditRevisionMixin, CreateView):
     """Add content view
 
     Adds a new content to the database.
@@ -272,10 +307,8 @@ class AddContentView(SuccessMessageMixin, LoginRequiredMixin, CreateView):
                                       content_type_data,
                                       is_file)
 
-            # Generates preview image in 'uploads/contents/'
-            preview = CONTENT_TYPES.get(content_type).objects.get(pk=content.pk).generate_preview()
-            content.preview.name = preview
-            content.save()
+            # Generates the preview image in 'uploads/previews/' in the background
+            PreviewQueue.submit(content)
 
             # Redirects to content
             course_id = self.kwargs['course_id']
@@ -291,7 +324,7 @@ class AddContentView(SuccessMessageMixin, LoginRequiredMixin, CreateView):
                                   item_forms=image_formset))
 
 
-class EditContentView(LoginRequiredMixin, UpdateView):
+class EditContentView(LoginRequiredMixin, EditRevisionMixin, UpdateView):
     """Edit content view
 
     This model represents the edit of a content view.
@@ -514,11 +547,8 @@ class EditContentView(LoginRequiredMixin, UpdateView):
                                           content_type_data,
                                           False)
 
-                # Generates preview image in 'uploads/contents/'
-                preview = CONTENT_TYPES.get(content_type) \
-                    .objects.get(pk=content.pk).generate_preview()
-                content.preview.name = preview
-                content.save()
+                # Generates the preview image in 'uploads/previews/' in the background
+                PreviewQueue.submit(content)
 
                 messages.add_message(self.request, messages.SUCCESS, _("Content updated"))
                 return HttpResponseRedirect(self.get_success_url())
@@ -842,11 +872,7 @@ class ContentReadingModeView(LoginRequiredMixin, DetailView):
         topic = Topic.objects.get(pk=topic_id)
         if self.request.GET.get('coursebook'):
             course = get_object_or_404(Course, {"pk": self.kwargs['course_id']})
-            contents = [
-                f.content for f in Favorite.objects.filter(
-                    course=course,
-                    user=self.request.user.profile)]  # models
-            # .get_coursebook_flat(get_user(self.request), course)
+            contents = get_coursebook(get_user(self.request), course)
         else:
             contents = topic.get_contents(self.request.GET.get('s'), self.request.GET.get('f'))
 
@@ -870,5 +896,10 @@ class ContentReadingModeView(LoginRequiredMixin, DetailView):
 
         if content.type == "MD":
             context['html'] = Markdown.render(content, False)
+        elif content.type in ("PDF", "Latex"):
+            # The extracted text can be read instead of the PDF
+            context['pdf_text_available'] = content.pdf_pages.exists()
+            if self.request.GET.get('text'):
+                context['pdf_pages'] = content.pdf_pages.all()
 
         return context
@@ -10,24 +10,24 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from django.http import HttpResponseRedirect, JsonResponse, HttpResponse, HttpResponseBadRequest
+from django.http import HttpResponseRedirect, JsonResponse, HttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse_lazy, reverse
 from django.views.generic import DetailView
 from django.views.generic.edit import FormMixin, CreateView, DeleteView, UpdateView
 from django.utils.translation import gettext_lazy as _
 
-from base.models import Course, CourseStructureEntry, Topic, Favorite
-from base.utils import check_owner_permission
+from base.models import Course, CourseStructureEntry, Topic
+from base.utils import check_owner_permission, get_course_structure, get_coursebook
 
 from frontend.forms import AddCourseForm, EditCourseForm, FilterAndSortForm
 from frontend.forms.course import TopicChooseForm, CreateTopicForm
 
-from frontend.views.history import Reversion
+from frontend.views.history import EditRevisionMixin, Reversion
 from frontend.views.json import JsonHandler
 
 
-class DuplicateCourseView(SuccessMessageMixin, LoginRequiredMixin, CreateView):
+class DuplicateCourseView(SuccessMessageMixin, LoginRequiredMixin, EditRevisionMixin, CreateView):
     """Duplicate course view
 
     Duplicates a course.
@@ -105,7 +105,7 @@ class DuplicateCourseView(SuccessMessageMixin, LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class AddCourseView(SuccessMessageMixin, LoginRequiredMixin, CreateView):
+class AddCourseView(SuccessMessageMixin, LoginRequiredMixin, EditRevisionMixin, CreateView):
     """Add course view
 
     Adds a new course to the database.
@@ -153,7 +153,7 @@ class AddCourseView(SuccessMessageMixin, LoginRequiredMixin, CreateView):
         return initial
 
 
-class EditCourseView(SuccessMessageMixin, LoginRequiredMixin, UpdateView):
+class EditCourseView(SuccessMessageMixin, LoginRequiredMixin, EditRevisionMixin, UpdateView):
     """Edit course view
 
     Displays the edit course page.
@@ -363,25 +363,24 @@ class CourseView(LoginRequiredMixin, DetailView, FormMixin):
 
         # Edit course structure cancel/save
         if request.is_ajax():
-            check = True
+            missing_ids = []
             # Update course structure
             topic_list = request.POST.get('topic_list')
             if topic_list:
                 json_obj = json.loads(topic_list)
                 try:
                     JsonHandler.validate_topics(json_data=json_obj)
-                except ValidationError:
-                    check = False
-                if check:
                     JsonHandler.json_to_topics_structure(self.object, json_obj)
+                except ValidationError as error:
+                    missing_ids = error.params['ids']
 
             # Clean unused topics
             ids = request.POST.getlist('ids[]')
             if ids:
                 JsonHandler.clean_topics(ids)
 
-            if not check:
-                return HttpResponseBadRequest()
+            if missing_ids:
+                return JsonResponse(data={'missing_ids': missing_ids}, status=400)
             return HttpResponse()
 
         return self.form_invalid(form)
@@ -413,38 +412,20 @@ class CourseView(LoginRequiredMixin, DetailView, FormMixin):
         :return: the context data
         :rtype: dict[str, Any]
         """
-        
-        course_id = self.get_object().id
-        favorite_list = [] # Favorite.objects.filter(course=course_id, user=get_user(self.request).profile)
         context = super().get_context_data(**kwargs)
-        structure_entries = CourseStructureEntry. \
-            objects.filter(course=context["course"]).order_by('index')
-        topics_recursive = []
-        current_topic = None
-        for favorite in Favorite.objects.filter(course=course_id, user=get_user(self.request).profile):
-            favorite_list.append(favorite.content)
-
-        for entry in structure_entries:
-            index_split = entry.index.split('/')
-            # Topic
-            if len(index_split) == 1:
-                current_topic = {'topic': entry.topic, 'subtopics': [],
-                                 'topic_contents': entry.topic.get_contents(self.sorted_by,
-                                                                            self.filtered_by)}
-                topics_recursive.append(current_topic)
-            # Subtopic
-            # Only handle up to one subtopic level
-            else:
-                current_topic["subtopics"].append({'topic': entry.topic,
-                                                   'topic_contents':
-                                                       entry.topic.
-                                                  get_contents(self.sorted_by, self.filtered_by)})
+        coursebook = get_coursebook(get_user(self.request).profile, self.object)
 
+        # Structure with contents loaded in a fixed number of queries
+        topics_recursive = get_course_structure(context['course'],
+                                                self.sorted_by,
+                                                self.filtered_by)
 
         context["structure"] = topics_recursive
         context['isCurrentUserOwner'] = self.request.user.profile in context['course'].owners.all()
         context['user'] = self.request.user
-        context['favorite'] = favorite_list
+        context['coursebook'] = coursebook
+        # Ids of the contents in the coursebook to mark them in the structure
+        context['favorite'] = {content.pk for content in coursebook}
         if self.sorted_by is not None:
             context['sorting'] = self.sorted_by
         if self.filtered_by is not None:
@@ -30,7 +30,7 @@ def add_to_coursebook(request, *args, **kwargs):  # pylint: disable=unused-argum
     topic = get_object_or_404(Topic, pk=kwargs['topic_id'])
     content = get_object_or_404(Content, pk=kwargs['content_id'])
 
-    Favorite.objects.create(content=content, user=user, course=course)
+    Favorite.objects.get_or_create(content=content, user=user, course=course)
     return HttpResponseRedirect(reverse('frontend:content',
                                         args=(course.id,
                                               topic.id,
@@ -56,7 +56,7 @@ def add_to_coursebook_from_courseview(request, *args, **kwargs):  # pylint: disa
     topic = get_object_or_404(Topic, pk=kwargs['topic_id'])
     content = get_object_or_404(Content, pk=kwargs['content_id'])
 
-    Favorite.objects.create(content=content, user=user, course=course)
+    Favorite.objects.get_or_create(content=content, user=user, course=course)
     return HttpResponseRedirect(reverse('frontend:course',
                                         args=(course.id,)))
 
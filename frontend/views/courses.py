@@ -3,11 +3,12 @@
 This file describes the frontend views related to courses.
 """
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Count, Exists, OuterRef
 from django.db.models.functions import Lower
 from django.shortcuts import get_object_or_404
 from django.views.generic import ListView
 
-from base.models import Course, Category, Period
+from base.models import Course, Category, Period, Profile
 
 
 class CourseListView(LoginRequiredMixin, ListView):  # pylint: disable=too-many-ancestors)
@@ -23,17 +24,23 @@ class CourseListView(LoginRequiredMixin, ListView):  # pylint: disable=too-many-
     :type CourseListView.paginate_by: int
     :attr CourseListView.context_object_name: The context object name
     :type CourseListView.context_object_name: str
+    :attr CourseListView.ordering: The default ordering, the ordering of the model is not
+    applied to the annotated courses
+    :type CourseListView.ordering: list[str]
     """
     model = Course
     template_name = 'frontend/course_lists/courses.html'
     paginate_by = 9
+    ordering = ['title']
 
     context_object_name = 'courses'
 
     def get_queryset(self):
         """Query set
 
-        Returns the list of courses sorted with sorting if a value is given.
+        Returns the list of courses sorted with sorting if a value is given. The number of
+        contents, whether the user starred the course and the owners are loaded with the
+        courses, so that the course cards do not need further queries.
 
         :return: the list of courses
         :rtype: QuerySet
@@ -43,14 +50,17 @@ class CourseListView(LoginRequiredMixin, ListView):  # pylint: disable=too-many-
         if 'sort' in self.kwargs:
             sorting = self.kwargs['sort']
             if sorting == "title-a":
-                queryset = Course.objects.order_by(Lower("title"))
+                queryset = queryset.order_by(Lower("title"))
             elif sorting == "title-z":
-                queryset = Course.objects.order_by(Lower("title").desc())
+                queryset = queryset.order_by(Lower("title").desc())
             elif sorting == "date-new":
-                queryset = Course.objects.order_by("-creation_date")
+                queryset = queryset.order_by("-creation_date")
             elif sorting == "date-old":
-                queryset = Course.objects.order_by("creation_date")
-        return queryset
+                queryset = queryset.order_by("creation_date")
+        starred = Profile.objects.filter(user=self.request.user, stared_courses=OuterRef('pk'))
+        return queryset.annotate(content_count=Count('topics__contents'),
+                                 starred=Exists(starred)) \
+            .prefetch_related('owners')
 
     def get_context_data(self, *, object_list=None, **kwargs):
         """Context data
@@ -20,14 +20,17 @@ from django.utils.translation import gettext_lazy as _
 
 import reversion
 from reversion.models import Version
+from reversion.views import RevisionMixin
 
 from reversion_compare.views import HistoryCompareDetailView
 
 from base.models import Course, Content, Topic
+from base.search import SearchIndex
 
 from content.attachment.models import ImageAttachment
-from content.models import ImageContent, MDContent, TextField, YTVideoContent, PDFContent, Latex, \
-    CONTENT_TYPES
+from content.extraction import PDFTextExtractor
+from content.models import ImageContent, MDContent, TextField, YTVideoContent, PDFContent, Latex
+from content.previews import PreviewQueue
 
 from export.views import generate_pdf_from_latex
 
@@ -86,6 +89,28 @@ class Reversion:
         return diff
 
 
+class EditRevisionMixin(RevisionMixin):
+    """Edit revision mixin
+
+    Creates a revision of the changed objects for the POST requests of an edit view.
+    Other requests, e.g. the AJAX previews of LaTeX code, do not create revisions, and a
+    revision without changes is discarded by the revision policy.
+    """
+
+    def revision_request_creates_revision(self, request):
+        """Revision request creates revision
+
+        Returns whether the request is wrapped in a revision.
+
+        :param request: The given request
+        :type request: HttpRequest
+
+        :return: true if the request creates a revision
+        :rtype: bool
+        """
+        return request.method == 'POST' and 'latex-preview' not in request.POST
+
+
 class BaseHistoryCompareView(LoginRequiredMixin, HistoryCompareDetailView):
     """Base history compare view
 
@@ -309,6 +334,7 @@ class BaseContentHistoryCompareView(BaseHistoryCompareView):
         topic_id = self.kwargs['topic_id']
         pk = self.kwargs['pk']  # pylint: disable=invalid-name
         with transaction.atomic(), reversion.create_revision():
+            reversion.set_user(request.user)
             versions = Version.objects.get(pk=request.POST.get('ver_pk')).revision.version_set.all()
 
             # revert added attachments
@@ -329,6 +355,9 @@ class BaseContentHistoryCompareView(BaseHistoryCompareView):
                         deserialized_obj.object.author_id = content.author_id
                         deserialized_obj.object.topic_id = content.topic_id
                         deserialized_obj.object.type = content.type
+                        # The ratings are not reverted, so keep their aggregates
+                        deserialized_obj.object.rating_average = content.rating_average
+                        deserialized_obj.object.rating_count = content.rating_count
                     elif isinstance(deserialized_obj.object, Latex):
                         deserialized_obj.object.save()
                         topic = Topic.objects.get(pk=topic_id)
@@ -337,12 +366,22 @@ class BaseContentHistoryCompareView(BaseHistoryCompareView):
                         deserialized_obj.object.pdf.save(f"{topic}" + ".pdf", ContentFile(pdf))
                     elif isinstance(deserialized_obj.object, ImageAttachment):
                         deserialized_obj.object.content_id = pk
+                    elif isinstance(deserialized_obj.object, YTVideoContent):
+                        # The length is not reverted, so keep it unless the video URL changed
+                        deserialized_obj.object.length = YTVideoContent.objects \
+                            .filter(pk=pk, url=deserialized_obj.object.url) \
+                            .values_list('length', flat=True).first()
                     deserialized_obj.save()
 
+            # The reverted objects are saved raw, so the search index and the text of the
+            # PDF are not updated by the signals
             content = Content.objects.get(pk=pk)
-            content.preview = CONTENT_TYPES.get(content.type) \
-                .objects.get(pk=content.pk).generate_preview()
-            content.save()
+            SearchIndex.index_content(content)
+            if content.type in (PDFContent.TYPE, Latex.TYPE):
+                PDFTextExtractor.submit(pk)
+
+            # Generates the preview image in the background
+            PreviewQueue.submit(content)
 
         return HttpResponseRedirect(reverse_lazy(
             'frontend:content',
@@ -398,6 +437,7 @@ class BaseCourseHistoryCompareView(BaseHistoryCompareView):
         pk = self.kwargs['pk']  # pylint: disable=invalid-name
         ver_pk = request.POST.get('ver_pk')
         with transaction.atomic(), reversion.create_revision():
+            reversion.set_user(request.user)
             version = Version.objects.get(id=ver_pk)
 
             date_time = version.revision.date_created.strftime("%d. %b. %Y, %H:%M")
@@ -4,6 +4,7 @@ This file describes the json handling on resources needed for frontend views.
 """
 
 from django.core.exceptions import ValidationError
+from django.db import transaction
 
 from base.models import CourseStructureEntry, Topic
 
@@ -20,7 +21,8 @@ class JsonHandler:
 
         Checks if the topics from the json data exists in the database. If the topics
         are not valid, that means topics does not exists in the course structure, a
-        validation error will be thrown.
+        validation error will be thrown. The error lists the ids of all missing topics
+        in its parameter ids. All topics are checked with one query.
 
         :param json_data: The json data containing topics and sub topics
         :type json_data: list[dict[str, Any]]
@@ -28,23 +30,29 @@ class JsonHandler:
         :return: None if all topics in the json data exists
         :rtype: None or ValidationError
         """
-        # Main topics
+        # Main topics and sub topics
+        ids = []
         for topic in json_data:
-            if not Topic.objects.filter(id=topic['id']).exists():
-                raise ValidationError(f'The topic with the id {topic["id"]} does not exist')
-            # Sub topics
-            if 'children' in topic:
-                for sub_topic in topic['children']:
-                    if not Topic.objects.filter(id=sub_topic['id']).exists():
-                        raise ValidationError(
-                            f'The sub topic with the id {sub_topic["id"]} does not exist')
+            ids.append(topic['id'])
+            ids.extend(sub_topic['id'] for sub_topic in topic.get('children', []))
+        # Compare as strings since the ids may be sent as numbers or strings
+        existing = {str(topic_id) for topic_id in
+                    Topic.objects.filter(id__in=ids).values_list('id', flat=True)}
+        missing = [topic_id for topic_id in dict.fromkeys(ids) if str(topic_id) not in existing]
+        if missing:
+            raise ValidationError('The topics with the ids %(ids)s do not exist',
+                                  code='missing_topics',
+                                  params={'ids': missing})
 
     @staticmethod
     def json_to_topics_structure(course, json_data):
         """Json to topic structure
 
         Creates a course structure from the json data and override the current stored
-        entries in the database.
+        entries in the database. Only the differences to the stored entries are written:
+        changed entries are updated, new entries are created and the remaining entries,
+        including further entries with the index of another entry, are deleted, all in one
+        transaction.
 
         Example json data:
 
@@ -58,49 +66,47 @@ class JsonHandler:
         :return: true if the structure was changed after its call
         :rtype: bool
         """
-        course_id = course.id
-        index = 0
+        # The topic ids of the new structure by their index, the ids may be sent as numbers
+        # or strings
+        structure = {}
         # Main topics
-        for topic in json_data:
-            index += 1
-            current_id = topic['id']
-            current_index = f'{index}'
-            current_topic = CourseStructureEntry.objects.filter(
-                index=current_index,
-                course_id=course_id)
-            # Updates the entry in the data base if it exists, else we create a new entry
-            if current_topic.exists():
-                current_topic.update(topic_id=current_id)
-            else:
-                CourseStructureEntry.objects.create(
-                    index=current_index,
-                    course_id=course_id,
-                    topic_id=current_id)
+        for index, topic in enumerate(json_data, start=1):
+            structure[f'{index}'] = int(topic['id'])
             # Sub topics
-            sub_index = 0
-            if 'children' in topic:
-                for sub_topic in topic['children']:
-                    sub_index += 1
-                    current_id = sub_topic['id']
-                    current_index = f'{index}/{sub_index}'
-                    current_topic = CourseStructureEntry.objects.filter(
-                        index=current_index,
-                        course_id=course_id)
-                    # Updates the entry in the data base if it exists, else we create a new entry
-                    if current_topic.exists():
-                        current_topic.update(topic_id=current_id)
-                    else:
-                        CourseStructureEntry.objects.create(
-                            index=current_index,
-                            course_id=course_id,
-                            topic_id=current_id)
-            # Clean sub topic fragments
-            JsonHandler.clean_structure_sub_topic(course=course,
-                                                  index=index,
-                                                  sub_index=sub_index + 1)
-        # Clean topic fragments
-        JsonHandler.clean_structure_topic(course=course, index=index + 1)
-        return True
+            for sub_index, sub_topic in enumerate(topic.get('children', []), start=1):
+                structure[f'{index}/{sub_index}'] = int(sub_topic['id'])
+
+        with transaction.atomic():
+            entries = {}
+            # Further entries with the index of an entry are deleted
+            duplicates = []
+            for entry in CourseStructureEntry.objects.filter(course=course).order_by('pk'):
+                if entry.index in entries:
+                    duplicates.append(entry)
+                else:
+                    entries[entry.index] = entry
+            created = []
+            updated = []
+            for index, topic_id in structure.items():
+                entry = entries.pop(index, None)
+                # Updates the entry in the data base if it exists, else we create a new entry
+                if entry is None:
+                    created.append(CourseStructureEntry(course=course,
+                                                        index=index,
+                                                        topic_id=topic_id))
+                elif entry.topic_id != topic_id:
+                    entry.topic_id = topic_id
+                    updated.append(entry)
+            # Clean topic fragments which are not part of the structure anymore
+            deleted = list(entries.values()) + duplicates
+            if deleted:
+                CourseStructureEntry.objects.filter(
+                    pk__in=[entry.pk for entry in deleted]).delete()
+            if updated:
+                CourseStructureEntry.objects.bulk_update(updated, ['topic'])
+            if created:
+                CourseStructureEntry.objects.bulk_create(created)
+        return bool(created or updated or deleted)
 
     @staticmethod
     def topics_structure_to_json(course):
@@ -145,59 +151,15 @@ class JsonHandler:
             json_obj.append(last_main_topic)
         return json_obj
 
-    @staticmethod
-    def clean_structure_topic(course, index):
-        """Clean structure topic
-
-        Cleans all course structure entries after the given index (include).
-        That means all topics starting from the given index and its sub topics
-        are removed after this call.
-
-        :param course: The course where we want to clean the entries
-        :type course: Course
-        :param index: The index where we start to clean
-        :type index: int
-        """
-        course_id = course.id
-        topic = CourseStructureEntry.objects.filter(index=f'{index}',
-                                                    course_id=course_id)
-        while topic.exists():
-            topic.delete()
-            JsonHandler.clean_structure_sub_topic(course=course, index=index, sub_index=1)
-            index += 1
-            topic = CourseStructureEntry.objects.filter(index=f'{index}',
-                                                        course_id=course_id)
-
-    @staticmethod
-    def clean_structure_sub_topic(course, index, sub_index):
-        """Clean structure sub topic
-
-        Cleans all course structure entries after the given sub index (include) of
-        the given index. That means all sub topics starting from the given sub index
-        of the given index are removed after this call.
-
-        :param course: The course where we want to clean the entries
-        :type course: Course
-        :param index: The index where we start to clean
-        :type index: int
-        :param sub_index: The sub index where we start
-        :type sub_index: int
-        """
-        course_id = course.id
-        topic = CourseStructureEntry.objects.filter(index=f'{index}/{sub_index}',
-                                                    course_id=course_id)
-        while topic.exists():
-            topic.delete()
-            sub_index += 1
-            topic = CourseStructureEntry.objects.filter(index=f'{index}/{sub_index}',
-                                                        course_id=course_id)
-
     @staticmethod
     def clean_topics(ids):
         """Clean topics
 
-        Cleans the topics if they were not used in the course structure.
+        Cleans the topics if they were not used in the course structure. The unused topics
+        are determined and deleted with one query each.
+
+        :param ids: The ids of the topics to clean
+        :type ids: list[int or str]
         """
-        for topic_id in ids:
-            if not CourseStructureEntry.objects.filter(topic_id=topic_id).exists():
-                Topic.objects.filter(pk=topic_id).delete()
+        used = CourseStructureEntry.objects.filter(topic_id__in=ids).values('topic_id')
+        Topic.objects.filter(pk__in=ids).exclude(pk__in=used).delete()
@@ -3,16 +3,26 @@
 This file describes the frontend views related to search.
 """
 
-from django.views.generic import ListView
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.generic import ListView
 
-from base.models import Course, CourseStructureEntry
+from base.models import Content, Course, CourseStructureEntry, SearchDocument
+from base.search import SearchIndex
 
 
 class SearchView(ListView, LoginRequiredMixin):  # pylint: disable=too-many-ancestors
     """Search view
 
-    This model represents the search for course and topic titles.
+    This model represents the search for courses, topics and contents. The results are
+    looked up in the search index and ordered by their rank. Each section shows at most
+    SEARCH_RESULTS_LIMIT results, the further results of a section are shown page by page
+    with a cursor.
 
     :attr SearchView.model: The model of the view
     :type SearchView.model: Model
@@ -25,27 +35,138 @@ class SearchView(ListView, LoginRequiredMixin):  # pylint: disable=too-many-ance
     template_name = 'frontend/search.html'
     context_object_name = 'search_data'
 
+    def get_section(self):
+        """Section
+
+        Returns the section of the search which should be paged, if the request asks
+        for one.
+
+        :return: the kind of the documents of the section or None for all sections
+        :rtype: str or None
+        """
+        section = self.request.GET.get('section')
+        if section in dict(SearchDocument.KIND_CHOICES):
+            return section
+        return None
+
     def get_queryset(self):
         """Query set
 
-        Returns the query set of the search.
+        Returns the query set of the search. The matching documents of each section are
+        found with a single query, the matching objects are then loaded with one query
+        per kind.
 
         :return: The query set of the search
-        :rtype: dict[str, QuerySet[CourseStructureEntry]]
+        :rtype: dict[str, list[Course] or list[CourseStructureEntry]
+                or list[list[CourseStructureEntry, list[Content]]] or dict[str, str]]
         """
-        query = self.request.GET.get('q')
-        query = query.strip().lower()
-        courses = Course.objects.filter(title__icontains=query)
-        course_structure_entries = \
-            CourseStructureEntry.objects.filter(topic__title__icontains=query)
-        content_list = []
-        for entry in CourseStructureEntry.objects.all():
-            contents = entry.topic.get_contents('None', 'None').filter(description__icontains=query)
-            if contents:
-                content_list.append([entry, contents])
+        query = self.request.GET.get('q', '')
+        section = self.get_section()
+        limit = settings.SEARCH_RESULTS_LIMIT
+        documents = []
+        next_cursors = {}
+        for kind, _ in SearchDocument.KIND_CHOICES:
+            if section not in (None, kind):
+                continue
+            cursor = self.request.GET.get('cursor') if section else None
+            # One more document tells whether there is a next page
+            page = SearchIndex.search(query, [kind], limit + 1, cursor)
+            if len(page) > limit:
+                page = page[:limit]
+                next_cursors[kind] = SearchIndex.cursor(page[-1])
+            documents.extend(page)
+        search_data = SearchView.load_results(documents)
+        search_data['next_cursors'] = next_cursors
+        return search_data
+
+    @staticmethod
+    def load_results(documents):
+        """Load results
+
+        Loads the courses, structure entries and contents of the found documents with one
+        query per kind. The results keep the order of the documents.
+
+        :param documents: The found documents ordered by their rank
+        :type documents: list[SearchDocument]
+
+        :return: the found courses, structure entries of the found topics and the found
+        contents grouped by the structure entries of their topics
+        :rtype: dict[str, list[Course] or list[CourseStructureEntry]
+                or list[list[CourseStructureEntry, list[Content]]]]
+        """
+        ranked = {kind: [] for kind, _ in SearchDocument.KIND_CHOICES}
+        for document in documents:
+            ranked[document.kind].append(document.object_id)
+
+        courses = Course.objects.in_bulk(ranked[SearchDocument.COURSE])
+        courses = [courses[pk] for pk in ranked[SearchDocument.COURSE] if pk in courses]
+
+        topic_ranks = {pk: rank for rank, pk in enumerate(ranked[SearchDocument.TOPIC])}
+        course_structure_entries = sorted(
+            CourseStructureEntry.objects.filter(topic_id__in=topic_ranks)
+            .select_related('course', 'topic'),
+            key=lambda entry: (topic_ranks[entry.topic_id], entry.course_id, entry.pk))
+
+        # The contents grouped by their topics, the topics are ordered by their best content
+        contents = Content.objects.in_bulk(ranked[SearchDocument.CONTENT])
+        topic_contents = {}
+        for pk in ranked[SearchDocument.CONTENT]:
+            if pk in contents:
+                topic_contents.setdefault(contents[pk].topic_id, []).append(contents[pk])
+        content_ranks = {pk: rank for rank, pk in enumerate(topic_contents)}
+        content_list = [[entry, topic_contents[entry.topic_id]] for entry in sorted(
+            CourseStructureEntry.objects.filter(topic_id__in=topic_contents)
+            .select_related('course', 'topic'),
+            key=lambda entry: (content_ranks[entry.topic_id], entry.course_id, entry.pk))]
         return {'courses': courses, 'course_structure_entries': course_structure_entries,
                 'content_list': content_list}
 
+    @staticmethod
+    def serialize_results(documents):
+        """Serialize results
+
+        Serializes the found documents for the JSON search. Each result contains the links
+        to the courses in which it can be found. The objects are loaded with one query
+        per kind.
+
+        :param documents: The found documents ordered by their rank
+        :type documents: list[SearchDocument]
+
+        :return: the serialized results
+        :rtype: list[dict[str, Any]]
+        """
+        ids = {kind: [] for kind, _ in SearchDocument.KIND_CHOICES}
+        for document in documents:
+            ids[document.kind].append(document.object_id)
+        contents = Content.objects.only('topic').in_bulk(ids[SearchDocument.CONTENT])
+        topic_ids = set(ids[SearchDocument.TOPIC])
+        topic_ids.update(content.topic_id for content in contents.values())
+        entries = {}
+        for entry in CourseStructureEntry.objects.filter(topic_id__in=topic_ids) \
+                .select_related('course').order_by('course_id', 'pk'):
+            entries.setdefault(entry.topic_id, []).append(entry)
+
+        results = []
+        for document in documents:
+            if document.kind == SearchDocument.COURSE:
+                links = [{'course': document.title,
+                          'url': reverse('frontend:course', args=(document.object_id,))}]
+            elif document.kind == SearchDocument.TOPIC:
+                links = [{'course': entry.course.title,
+                          'url': reverse('frontend:course', args=(entry.course_id,))}
+                         for entry in entries.get(document.object_id, [])]
+            elif document.object_id in contents:
+                topic_id = contents[document.object_id].topic_id
+                links = [{'course': entry.course.title,
+                          'url': reverse('frontend:content',
+                                         args=(entry.course_id, topic_id, document.object_id))}
+                         for entry in entries.get(topic_id, [])]
+            else:
+                continue
+            results.append({'kind': document.kind, 'id': document.object_id,
+                            'title': document.title, 'rank': document.rank, 'links': links})
+        return results
+
     def get_context_data(self, *, object_list=None, **kwargs):
         """Context data
 
@@ -62,4 +183,47 @@ class SearchView(ListView, LoginRequiredMixin):  # pylint: disable=too-many-ance
         """
         context = super().get_context_data(**kwargs)
         context['search_query'] = self.request.GET.get('q')
+        context['section'] = self.get_section()
         return context
+
+
+@login_required
+def search_results(request):
+    """Search results
+
+    Returns the results of the search as JSON ordered by their rank. The request can
+    restrict the search to a section, start after a cursor and limit the number of results
+    up to SEARCH_STREAM_LIMIT. The documents are fetched from the index in chunks. If there
+    are more results, the cursor of the next page is sent in the attribute next.
+
+    :param request: The given request
+    :type request: WSGIRequest
+
+    :return: the JSON response
+    :rtype: JsonResponse
+    """
+    query = request.GET.get('q', '')
+    section = request.GET.get('section')
+    kinds = [section] if section in dict(SearchDocument.KIND_CHOICES) else None
+    try:
+        limit = int(request.GET.get('limit', settings.SEARCH_RESULTS_LIMIT))
+    except ValueError:
+        limit = settings.SEARCH_RESULTS_LIMIT
+    limit = max(1, min(limit, settings.SEARCH_STREAM_LIMIT))
+    # One more document tells whether there is a next page
+    documents = SearchIndex.documents(query, kinds, limit + 1,
+                                      request.GET.get('cursor')).iterator()
+
+    results = []
+    count = 0
+    last = None
+    while count < limit:
+        chunk = list(islice(documents, min(50, limit - count)))
+        if not chunk:
+            break
+        count += len(chunk)
+        last = chunk[-1]
+        results.extend(SearchView.serialize_results(chunk))
+    more = last is not None and next(documents, None) is not None
+    return JsonResponse({'query': query, 'results': results,
+                         'next': SearchIndex.cursor(last) if more else None})
@@ -0,0 +1,147 @@
+"""Purpose of this file
+
+This file contains the test cases for /base/models/content.py.
+"""
+
+from io import StringIO
+
+from django.contrib.auth.models import User  # pylint: disable=imported-auth-user
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from reversion.models import Version
+
+from base.models import Category, Content, Rating, Topic
+
+
+class ContentRatingTestCase(TestCase):
+    """Content rating test case
+
+    Defines the test cases for the rating aggregates of the model Content.
+    """
+
+    def setUp(self):
+        """Setup
+
+        Sets up the test database.
+        """
+        self.user1 = User.objects.create(username='user1')
+        self.user2 = User.objects.create(username='user2')
+        category = Category.objects.create(title="Category")
+        topic = Topic.objects.create(title="Topic", category=category)
+        self.content = Content.objects.create(author=self.user1.profile, topic=topic,
+                                              type='Textfield', language='de')
+
+    def test_no_ratings(self):
+        """Rating aggregates test case - no ratings
+
+        Tests that a content without ratings has no average and a count of zero.
+        """
+        self.assertEqual(-1, self.content.get_rate())
+        self.assertEqual(0, self.content.get_rate_amount())
+        self.assertEqual(0, self.content.get_rate_count())
+
+    def test_rate_content_updates_aggregates(self):
+        """Rating aggregates test case - rate content
+
+        Tests that rating a content keeps the stored aggregates current.
+        """
+        self.content.rate_content(user=self.user1.profile, rating=5)
+        self.content.rate_content(user=self.user2.profile, rating=2)
+        content = Content.objects.get(pk=self.content.pk)
+        self.assertEqual(3.5, content.rating_average)
+        self.assertEqual(2, content.rating_count)
+
+        # A user rating again replaces their previous rating
+        self.content.rate_content(user=self.user2.profile, rating=4)
+        content = Content.objects.get(pk=self.content.pk)
+        self.assertEqual(4.5, content.rating_average)
+        self.assertEqual(2, content.rating_count)
+
+    def test_rate_content_single_write(self):
+        """Rating aggregates test case - single write
+
+        Tests that a rating is stored with one statement, which replaces a previous rating of
+        the user, and that the content is not saved again.
+        """
+        self.content.rate_content(user=self.user1.profile, rating=1)
+        with CaptureQueriesContext(connection) as context:
+            self.content.rate_content(user=self.user1.profile, rating=3)
+        writes = [query['sql'] for query in context.captured_queries
+                  if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        # The rating and the aggregates of the content
+        self.assertEqual(2, len(writes))
+        self.assertEqual(3, Rating.objects.get(content=self.content).rating)
+        self.assertFalse(Version.objects.get_for_object(self.content).exists())
+
+    def test_read_aggregates_without_queries(self):
+        """Rating aggregates test case - no queries
+
+        Tests that reading the rating of a loaded content does not query the database.
+        """
+        self.content.rate_content(user=self.user1.profile, rating=4)
+        content = Content.objects.get(pk=self.content.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(4, content.get_rate())
+            self.assertEqual(4, content.get_rate_num())
+            self.assertEqual(1, content.get_rate_amount())
+            self.assertEqual(1, content.get_rate_count())
+
+    def test_rebuild_command(self):
+        """Rating aggregates test case - rebuild command
+
+        Tests that the management command recomputes stale aggregates.
+        """
+        Rating.objects.create(user=self.user1.profile, content=self.content, rating=1)
+        Rating.objects.create(user=self.user2.profile, content=self.content, rating=2)
+        self.assertEqual(0, Content.objects.get(pk=self.content.pk).rating_count)
+
+        call_command('rebuild_rating_aggregates', stdout=StringIO())
+        content = Content.objects.get(pk=self.content.pk)
+        self.assertEqual(1.5, content.rating_average)
+        self.assertEqual(2, content.rating_count)
+
+
+class TopicGetContentsTestCase(TestCase):
+    """Topic get contents test case
+
+    Defines the test cases for the function get_contents of the model Topic.
+    """
+
+    def setUp(self):
+        """Setup
+
+        Sets up the test database.
+        """
+        self.user1 = User.objects.create(username='user1')
+        self.user2 = User.objects.create(username='user2')
+        category = Category.objects.create(title="Category")
+        self.topic = Topic.objects.create(title="Topic", category=category)
+        self.unrated, self.low, self.high = [
+            Content.objects.create(author=self.user1.profile, topic=self.topic,
+                                   type='Textfield', language='de', description=description)
+            for description in ('unrated', 'low', 'high')
+        ]
+        self.low.rate_content(user=self.user1.profile, rating=2)
+        self.high.rate_content(user=self.user1.profile, rating=5)
+        self.high.rate_content(user=self.user2.profile, rating=4)
+
+    def test_sorted_by_rating(self):
+        """Get contents test case - sorted by rating
+
+        Tests that the contents are sorted by their rating with unrated contents last.
+        """
+        contents = self.topic.get_contents('Rating', 'None')
+        self.assertEqual([self.high, self.low, self.unrated], list(contents))
+
+    def test_sorted_by_rating_is_lazy(self):
+        """Get contents test case - sorted by rating stays a queryset
+
+        Tests that the rating sort returns a queryset which can be filtered further
+        and is evaluated with a single query.
+        """
+        contents = self.topic.get_contents('Rating', 'None')
+        with self.assertNumQueries(1):
+            filtered = list(contents.filter(description__in=['low', 'unrated']))
+        self.assertEqual([self.low, self.unrated], filtered)
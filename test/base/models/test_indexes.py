@@ -0,0 +1,80 @@
+"""Purpose of this file
+
+This file contains the test cases for the indexes and constraints of /base/models.
+"""
+
+import re
+
+from test import utils
+
+from django.db import IntegrityError, connection
+from django.test import TestCase
+
+from base.models import Comment, Content, Course, CourseStructureEntry, Favorite, Rating
+
+
+class IndexTestCase(TestCase):
+    """Index test case
+
+    Defines the test cases which check with the query plans of SQLite that the frequent
+    lookups are served by the indexes.
+    """
+
+    def setUp(self):
+        """Setup
+
+        Sets up the test database.
+        """
+        utils.setup_database()
+        self.content = Content.objects.first()
+        self.profile = self.content.author
+        self.course = Course.objects.first()
+
+    def assert_uses_index(self, queryset, index, columns):
+        """Assert uses index
+
+        Asserts that the query plan searches the table with the index on the given columns
+        and does not sort the rows afterwards.
+
+        :param queryset: The query
+        :type queryset: QuerySet
+        :param index: The name of the index, None for any index
+        :type index: str or None
+        :param columns: The columns which are searched in the index
+        :type columns: list[str]
+        """
+        plan = queryset.explain()
+        name = re.escape(index) if index else r'\S+'
+        condition = re.escape(' AND '.join(f'{column}=?' for column in columns))
+        self.assertRegex(plan, rf'SEARCH \S+ USING (COVERING )?INDEX {name} \({condition}\)')
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_query_plans(self):
+        """Query plans test case
+
+        Tests that the frequent lookups use the composite indexes.
+        """
+        if connection.vendor != 'sqlite':
+            self.skipTest('The query plans are only checked on SQLite')
+        self.assert_uses_index(CourseStructureEntry.objects.filter(course=self.course, index='1'),
+                               'structure_course_index_idx', ['course_id', 'index'])
+        # The unique constraint is implemented by an automatic index
+        self.assert_uses_index(Favorite.objects.filter(user=self.profile, course=self.course),
+                               None, ['user_id', 'course_id'])
+        self.assert_uses_index(Rating.objects.filter(content=self.content, user=self.profile),
+                               None, ['content_id', 'user_id'])
+        self.assert_uses_index(Comment.objects.filter(content=self.content)
+                               .order_by('-creation_date'),
+                               'comment_content_date_idx', ['content_id'])
+        self.assert_uses_index(Content.objects.filter(topic=self.content.topic)
+                               .order_by('-creation_date'),
+                               'content_topic_date_idx', ['topic_id'])
+
+    def test_unique_favorite(self):
+        """Unique favorite test case
+
+        Tests that a content can only be added once to the coursebook of a user.
+        """
+        Favorite.objects.create(user=self.profile, course=self.course, content=self.content)
+        with self.assertRaises(IntegrityError):
+            Favorite.objects.create(user=self.profile, course=self.course, content=self.content)
@@ -0,0 +1,119 @@
+"""Purpose of this file
+
+This file contains the test cases for /base/revisions.py.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from test.test_cases import BaseCourseViewTestCase
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+import reversion
+from reversion.models import Revision, Version
+
+from base.revisions import RevisionPolicy
+
+
+class RevisionPolicyTestCase(BaseCourseViewTestCase):
+    """Revision policy test case
+
+    Defines the test cases for the revisions of the edit views and the pruning of old
+    versions.
+    """
+
+    def edit_course(self, **data):
+        """Edit course
+
+        Posts the course form with the given changes to the edit course view.
+
+        :param data: The changed fields of the course
+        :type data: dict[str, Any]
+
+        :return: the response of the view
+        :rtype: HttpResponse
+        """
+        data = {'title': self.course1.title, 'description': self.course1.description,
+                'owners': [self.user.profile.pk], 'category': self.cat.pk,
+                'change_log': 'edited', **data}
+        return self.client.post(reverse('frontend:course-edit',
+                                        kwargs={'pk': self.course1.pk}), data)
+
+    def add_versions(self, count, days):
+        """Add versions
+
+        Adds versions of the course which are backdated by the given number of days.
+
+        :param count: The number of versions
+        :type count: int
+        :param days: The age of the versions in days
+        :type days: int
+        """
+        for i in range(count):
+            with reversion.create_revision():
+                self.course1.description = f'{days} days ago {i}'
+                self.course1.save()
+                reversion.set_date_created(timezone.now() - timedelta(days=days))
+
+    def test_edit_view_revision(self):
+        """Edit view test case - revision
+
+        Tests that an edit creates a revision with its user and comment, and that an edit
+        without changes does not create a revision.
+        """
+        versions = Version.objects.get_for_object(self.course1)
+        self.assertEqual(1, versions.count())
+        self.edit_course(description='changed')
+        self.assertEqual(2, versions.count())
+        revision = versions.first().revision
+        self.assertEqual(self.user, revision.user)
+        self.assertEqual('edited', revision.comment)
+
+        self.edit_course(description='changed')
+        self.assertEqual(2, versions.count())
+        self.assertEqual(2, Revision.objects.count())
+
+    def test_other_requests(self):
+        """Other requests test case
+
+        Tests that requests outside the edit views do not create revisions.
+        """
+        path = reverse('frontend:course', kwargs={'pk': self.course1.pk})
+        self.client.post(path, {'save': 'true', 'course_pk': self.course1.pk})
+        self.client.get(reverse('frontend:course-edit', kwargs={'pk': self.course1.pk}))
+        self.assertEqual(1, Revision.objects.count())
+
+    def test_prune(self):
+        """Prune test case
+
+        Tests that only the versions which are older than the retention period and not
+        among the latest versions of their object are deleted.
+        """
+        self.add_versions(3, days=400)
+        self.add_versions(2, days=10)
+        self.assertEqual((3, 3), RevisionPolicy.prune(days=30, keep=2, dry_run=True))
+        self.assertEqual(6, Version.objects.get_for_object(self.course1).count())
+
+        self.assertEqual((3, 3), RevisionPolicy.prune(days=30, keep=2))
+        descriptions = [version.field_dict['description']
+                        for version in Version.objects.get_for_object(self.course1)]
+        # The initial version is not older than the retention period
+        self.assertEqual(['10 days ago 1', '10 days ago 0', 'desc'], descriptions)
+        self.assertEqual(3, Revision.objects.count())
+
+        self.assertEqual((0, 0), RevisionPolicy.prune(days=30, keep=2))
+        self.assertEqual((1, 1), RevisionPolicy.prune(days=0, keep=2))
+
+    def test_prune_command(self):
+        """Prune command test case
+
+        Tests that the management command deletes the expired versions.
+        """
+        self.add_versions(2, days=400)
+        out = StringIO()
+        call_command('prune_revisions', '--days=30', '--keep=1', stdout=out)
+        self.assertIn('Deleted 1 versions and 1 revisions', out.getvalue())
+        self.assertEqual(2, Version.objects.get_for_object(self.course1).count())
@@ -0,0 +1,192 @@
+"""Purpose of this file
+
+This file contains the test cases for /base/search.py.
+"""
+
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User  # pylint: disable=imported-auth-user
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from base.models import Category, Content, Course, SearchDocument, SearchTerm, Topic
+from base.search import SearchIndex
+
+from content.models import Latex, TextField
+
+
+class SearchIndexTestCase(TestCase):
+    """Search index test case
+
+    Defines the test cases for the class SearchIndex using the FTS5 table.
+    """
+
+    def setUp(self):
+        """Setup
+
+        Sets up the test database.
+        """
+        user = User.objects.create(username='user')
+        category = Category.objects.create(title="Category")
+        self.course = Course.objects.create(title='Linear Algebra',
+                                            description='Vectors and matrices',
+                                            category=category)
+        self.topic = Topic.objects.create(title="Eigenvalues", category=category)
+        self.content = Content.objects.create(author=user.profile, topic=self.topic,
+                                              type='Textfield', language='de',
+                                              description='Summary')
+        TextField.objects.create(content=self.content, textfield='The characteristic polynomial')
+        self.latex = Content.objects.create(author=user.profile, topic=self.topic,
+                                            type='Latex', language='de')
+        Latex.objects.create(content=self.latex, textfield=r'\textbf{Diagonalisierung}')
+
+    def search(self, query, kinds=None):
+        """Search
+
+        Searches the index and returns the kinds and ids of the results.
+
+        :param query: The search query
+        :type query: str
+        :param kinds: The kinds of the documents to search
+        :type kinds: list[str] or None
+
+        :return: the kinds and ids of the results in their order
+        :rtype: list[tuple[str, int]]
+        """
+        return [(document.kind, document.object_id)
+                for document in SearchIndex.search(query, kinds)]
+
+    def test_search_titles_and_bodies(self):
+        """Search test case - titles and bodies
+
+        Tests that course titles and descriptions, topic titles, content descriptions and
+        content bodies are found.
+        """
+        self.assertEqual([(SearchDocument.COURSE, self.course.pk)], self.search('algebra'))
+        self.assertEqual([(SearchDocument.COURSE, self.course.pk)], self.search('MATRICES'))
+        self.assertEqual([(SearchDocument.TOPIC, self.topic.pk)], self.search('eigenvalues'))
+        self.assertEqual([(SearchDocument.CONTENT, self.content.pk)], self.search('summary'))
+        self.assertEqual([(SearchDocument.CONTENT, self.content.pk)],
+                         self.search('characteristic polynomial'))
+        self.assertEqual([(SearchDocument.CONTENT, self.latex.pk)],
+                         self.search('diagonalisierung'))
+        # LaTeX commands are not indexed
+        self.assertEqual([], self.search('textbf'))
+        self.assertEqual([], self.search('characteristic algebra'))
+        self.assertEqual([], self.search(' '))
+
+    def test_search_prefix(self):
+        """Search test case - prefix
+
+        Tests that the last term of the query matches as a prefix.
+        """
+        self.assertEqual([(SearchDocument.COURSE, self.course.pk)], self.search('linear alg'))
+        self.assertEqual([], self.search('lin algebra'))
+
+    def test_search_ranked(self):
+        """Search test case - ranked
+
+        Tests that matches in titles are ranked higher and the kinds can be restricted.
+        """
+        topic = Topic.objects.create(title="Matrices", category=self.topic.category)
+        self.assertEqual([(SearchDocument.TOPIC, topic.pk),
+                          (SearchDocument.COURSE, self.course.pk)],
+                         self.search('matrices'))
+        self.assertEqual([(SearchDocument.COURSE, self.course.pk)],
+                         self.search('matrices', [SearchDocument.COURSE]))
+
+    def test_search_cursor(self):
+        """Search test case - cursor
+
+        Tests that the pages of a search continue after the cursor of the previous page.
+        """
+        for i in range(5):
+            Topic.objects.create(title=f'Matrices {"x " * i}', category=self.topic.category)
+        expected = self.search('matrices')
+        pages = []
+        cursor = None
+        while True:
+            page = SearchIndex.search('matrices', limit=2, after=cursor)
+            if not page:
+                break
+            self.assertLessEqual(len(page), 2)
+            pages.extend((document.kind, document.object_id) for document in page)
+            cursor = SearchIndex.cursor(page[-1])
+        self.assertEqual(6, len(expected))
+        self.assertEqual(expected, pages)
+        # An invalid cursor starts from the beginning
+        page = SearchIndex.search('matrices', limit=2, after='invalid')
+        self.assertEqual(expected[:2], [(document.kind, document.object_id) for document in page])
+
+    def test_search_single_query(self):
+        """Search test case - single query
+
+        Tests that a search runs a single query.
+        """
+        with CaptureQueriesContext(connection) as context:
+            SearchIndex.search('the characteristic poly')
+        self.assertEqual(1, len(context.captured_queries))
+
+    def test_update_and_delete(self):
+        """Update and delete test case
+
+        Tests that the index is updated when objects are saved or deleted.
+        """
+        self.course.title = 'Analysis'
+        self.course.save()
+        self.assertEqual([], self.search('linear'))
+        self.assertEqual([(SearchDocument.COURSE, self.course.pk)], self.search('analysis'))
+
+        self.content.textfield.textfield = 'Determinant'
+        self.content.textfield.save()
+        self.assertEqual([], self.search('polynomial'))
+        self.assertEqual([(SearchDocument.CONTENT, self.content.pk)], self.search('determinant'))
+
+        self.topic.delete()
+        self.assertEqual([], self.search('eigenvalues'))
+        self.assertEqual([], self.search('determinant'))
+        self.assertEqual(1, SearchDocument.objects.count())
+
+    def test_rebuild(self):
+        """Rebuild test case
+
+        Tests that the management command rebuilds the index.
+        """
+        SearchDocument.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 4 search documents', out.getvalue())
+        self.assertEqual([(SearchDocument.CONTENT, self.content.pk)], self.search('polynomial'))
+
+
+class SearchTermsTestCase(SearchIndexTestCase):
+    """Search terms test case
+
+    Defines the test cases for the class SearchIndex using the search terms, i.e. if the
+    database does not support FTS5.
+    """
+
+    def setUp(self):
+        """Setup
+
+        Sets up the test database without the FTS5 table.
+        """
+        patcher = mock.patch('base.search.SearchIndex.fts_enabled', return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def test_terms_weighted(self):
+        """Terms test case - weighted
+
+        Tests that the terms are stored once per document with their weights.
+        """
+        document = SearchDocument.objects.get(kind=SearchDocument.COURSE, object_id=self.course.pk)
+        terms = dict(document.terms.values_list('term', 'weight'))
+        self.assertEqual({'linear': 10, 'algebra': 10, 'vectors': 1, 'and': 1, 'matrices': 1},
+                         terms)
+        self.course.delete()
+        self.assertFalse(SearchTerm.objects.filter(document=document).exists())
@@ -0,0 +1,155 @@
+"""Purpose of this file
+
+This file contains the test cases for /base/storage.py.
+"""
+
+import os
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from test.test_cases import MediaTestCase
+from test import utils
+
+import reversion
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+
+from base.models import Category, MediaBlob
+from base.storage import ContentAddressedStorage
+
+from content.attachment.models import ImageAttachment
+
+
+class ContentAddressedStorageTestCase(MediaTestCase):
+    """Content-addressed storage test case
+
+    Defines the test cases for the class ContentAddressedStorage.
+    """
+
+    def test_save_identical(self):
+        """Save test case - identical files
+
+        Tests that identical files are stored once and keep their names.
+        """
+        self.assertIsInstance(default_storage, ContentAddressedStorage)
+        first = default_storage.save('uploads/first.txt', ContentFile(b'content'))
+        second = default_storage.save('uploads/second.txt', ContentFile(b'content'))
+        other = default_storage.save('uploads/first.txt', ContentFile(b'other content'))
+
+        self.assertTrue(first.endswith('/first.txt'))
+        self.assertTrue(second.endswith('/second.txt'))
+        self.assertEqual(default_storage.path(first), default_storage.path(second))
+        self.assertNotEqual(default_storage.path(first), default_storage.path(other))
+        self.assertEqual(default_storage.url(first), default_storage.url(second))
+        with default_storage.open(second) as file:
+            self.assertEqual(b'content', file.read())
+
+        blob = MediaBlob.objects.get(name=default_storage.blob(first))
+        self.assertEqual(2, blob.references)
+        self.assertEqual(7, blob.size)
+        self.assertTrue(MediaBlob.objects.filter(name=default_storage.blob(other)).exists())
+
+    def test_save_concurrent(self):
+        """Save test case - concurrent
+
+        Tests that a blob which is written again, e.g. by a concurrent upload which did not
+        see it yet, keeps the name of its digest.
+        """
+        first = default_storage.save('uploads/first.txt', ContentFile(b'content'))
+        with mock.patch.object(ContentAddressedStorage, 'exists', return_value=False):
+            second = default_storage.save('uploads/second.txt', ContentFile(b'content'))
+        blob_name = default_storage.blob(first)
+        self.assertEqual(blob_name, default_storage.blob(second))
+        self.assertEqual([os.path.basename(blob_name)],
+                         os.listdir(os.path.dirname(default_storage.path(first))))
+        self.assertEqual(2, MediaBlob.objects.get(name=blob_name).references)
+        self.assertEqual(1, MediaBlob.objects.filter(name__startswith=os.path.dirname(blob_name))
+                         .count())
+        with default_storage.open(second) as file:
+            self.assertEqual(b'content', file.read())
+
+    def test_save_long_name(self):
+        """Save test case - long name
+
+        Tests that the original name is shortened to fit into a file field.
+        """
+        name = default_storage.save(f'uploads/{"x" * 100}.pdf', ContentFile(b'%PDF'))
+        self.assertEqual(100, len(name))
+        self.assertTrue(name.endswith('x.pdf'))
+        self.assertTrue(default_storage.exists(name))
+
+    def test_delete(self):
+        """Delete test case
+
+        Tests that deleting a file removes a reference, but keeps the blob.
+        """
+        name = default_storage.save('uploads/file.txt', ContentFile(b'content'))
+        default_storage.delete(name)
+        self.assertEqual(0, MediaBlob.objects.get(name=default_storage.blob(name)).references)
+        self.assertTrue(default_storage.exists(name))
+
+    def test_collect_garbage(self):
+        """Collect garbage test case
+
+        Tests that only blobs without references of file fields or versions are deleted.
+        """
+        category = Category.objects.first()
+        category.image = utils.generate_image_file(1)
+        category.save()
+        with reversion.create_revision():
+            attachment = ImageAttachment.objects.create(content=utils.create_content('Image'),
+                                                        image=ContentFile(b'v', name='v.png'))
+        attachment.delete()
+        orphan = default_storage.save('uploads/orphan.txt', ContentFile(b'orphan'))
+        untracked = default_storage.save('uploads/untracked.txt', ContentFile(b'untracked'))
+        MediaBlob.objects.filter(name=default_storage.blob(untracked)).delete()
+
+        out = StringIO()
+        call_command('collect_media_garbage', '--dry-run', '--grace-period', '0', stdout=out)
+        self.assertIn('Would delete 2 blobs (15 bytes)', out.getvalue())
+        self.assertTrue(default_storage.exists(orphan))
+
+        # Blobs within the grace period are kept
+        call_command('collect_media_garbage', stdout=out)
+        self.assertTrue(default_storage.exists(orphan))
+
+        call_command('collect_media_garbage', '--grace-period', '0', stdout=out)
+        self.assertIn('Deleted 2 blobs (15 bytes)', out.getvalue())
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertFalse(default_storage.exists(untracked))
+        self.assertFalse(MediaBlob.objects.filter(name=default_storage.blob(orphan)).exists())
+        self.assertTrue(os.path.exists(category.image.path))
+        # The image of the deleted attachment can be restored from its version
+        self.assertTrue(default_storage.exists(attachment.image.name))
+        self.assertEqual(1, MediaBlob.objects.get(name=default_storage.blob(category.image.name))
+                         .references)
+
+    def test_collect_garbage_saved_again(self):
+        """Collect garbage test case - saved again
+
+        Tests that the grace period starts with the last save of a blob and that a blob
+        which is saved again during the garbage collection is kept.
+        """
+        name = default_storage.save('uploads/old.txt', ContentFile(b'old'))
+        expired = timezone.now() - timedelta(days=1)
+        MediaBlob.objects.filter(name=default_storage.blob(name)) \
+            .update(creation_date=expired, last_saved=expired)
+        default_storage.save('uploads/again.txt', ContentFile(b'old'))
+        self.assertEqual((0, 0), default_storage.collect_garbage(grace_period=60))
+
+        MediaBlob.objects.filter(name=default_storage.blob(name)).update(last_saved=expired)
+        bulk_update = MediaBlob.objects.bulk_update
+
+        def save_after_recount(*args, **kwargs):
+            bulk_update(*args, **kwargs)
+            default_storage.save('uploads/during.txt', ContentFile(b'old'))
+
+        with mock.patch.object(MediaBlob.objects, 'bulk_update', save_after_recount):
+            default_storage.collect_garbage(grace_period=60)
+        self.assertTrue(default_storage.exists(name))
+        default_storage.collect_garbage(grace_period=0)
+        self.assertFalse(default_storage.exists(name))
@@ -0,0 +1,129 @@
+"""Purpose of this file
+
+This file contains the test cases for /base/thumbnails.py.
+"""
+
+import io
+import os
+
+from test.test_cases import MediaTestCase
+from test import utils
+
+from PIL import Image
+
+from django.core.files.images import ImageFile
+from django.template import Context, Template
+
+from base.models import Category
+from base.thumbnails import Thumbnails
+
+
+class ThumbnailsTestCase(MediaTestCase):
+    """Thumbnails test case
+
+    Defines the test cases for the class Thumbnails.
+    """
+
+    def setUp(self):
+        """Setup
+
+        Sets up the test database with a category with an image.
+        """
+        super().setUp()
+        file = io.BytesIO()
+        Image.new('RGB', size=(800, 400), color=(155, 0, 0)).save(file, 'jpeg')
+        file.name = 'category.jpg'
+        file.seek(0)
+        self.category = Category.objects.first()
+        self.category.image = ImageFile(file)
+        self.category.save()
+
+    def thumbnail_paths(self, name):
+        """Thumbnail paths
+
+        Returns the paths of the thumbnails of an image.
+
+        :param name: The name of the image
+        :type name: str
+
+        :return: the paths of the thumbnails
+        :rtype: list[str]
+        """
+        image = ImageFile(None, name=name)
+        return [thumbnail.storage.path(thumbnail.name)
+                for image_format in ('WEBP', 'JPEG')
+                for _, thumbnail in Thumbnails.files(image, image_format)]
+
+    def test_srcset(self):
+        """Srcset test case
+
+        Tests that the thumbnails are generated in each width without scaling up the image.
+        """
+        srcset = Thumbnails.srcset(self.category.image, 'WEBP')
+        self.assertEqual(['320w', '640w', '1280w'],
+                         [candidate.split()[1] for candidate in srcset.split(', ')])
+        widths = []
+        for _, thumbnail in Thumbnails.files(self.category.image, 'WEBP'):
+            with Image.open(thumbnail.storage.path(thumbnail.name)) as image:
+                self.assertEqual('WEBP', image.format)
+                widths.append(image.width)
+        self.assertEqual([320, 640, 800], widths)
+
+    def test_srcset_missing(self):
+        """Srcset test case - missing
+
+        Tests that an image whose file is missing has no srcset.
+        """
+        self.assertEqual('', Thumbnails.srcset(Category(image='missing.png').image, 'WEBP'))
+
+    def test_replace_and_delete(self):
+        """Replace and delete test case
+
+        Tests that the thumbnails are deleted when the image is replaced or the object is
+        deleted.
+        """
+        Thumbnails.srcset(self.category.image, 'WEBP')
+        Thumbnails.srcset(self.category.image, 'JPEG')
+        previous = self.thumbnail_paths(self.category.image.name)
+        self.assertTrue(all(os.path.exists(path) for path in previous))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.image = utils.generate_image_file(1)
+            self.category.save()
+        self.assertFalse(any(os.path.exists(path) for path in previous))
+
+        Thumbnails.srcset(self.category.image, 'JPEG')
+        current = self.thumbnail_paths(self.category.image.name)
+        self.assertTrue(any(os.path.exists(path) for path in current))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.delete()
+        self.assertFalse(any(os.path.exists(path) for path in current))
+
+    def test_replace_shared(self):
+        """Replace test case - shared image
+
+        Tests that the thumbnails are kept when the image is replaced, but another object
+        still uses its blob.
+        """
+        Category.objects.create(title='Copy', image=self.category.image.name)
+        Thumbnails.srcset(self.category.image, 'JPEG')
+        previous = self.thumbnail_paths(self.category.image.name)
+        self.assertTrue(any(os.path.exists(path) for path in previous))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.image = utils.generate_image_file(1)
+            self.category.save()
+        self.assertTrue(any(os.path.exists(path) for path in previous))
+
+    def test_responsive_image(self):
+        """Responsive image test case
+
+        Tests that the tag responsive_image renders the thumbnails as sources of a picture.
+        """
+        template = Template('{% load cc_frontend_tags %}'
+                            '{% responsive_image image "20rem" alt="Category" %}')
+        html = template.render(Context({'image': self.category.image}))
+        self.assertIn('<source type="image/webp"', html)
+        self.assertIn(f'src="{self.category.image.url}"', html)
+        self.assertEqual(2, html.count('sizes="20rem"'))
+        self.assertIn('alt="Category"', html)
@@ -0,0 +1,69 @@
+"""Purpose of this file
+
+This file contains the test cases for /base/utils.py.
+"""
+
+from test.test_cases import BaseCourseViewTestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from base.models import Content, Favorite, Topic
+from base.utils import get_coursebook
+
+
+class CoursebookTestCase(BaseCourseViewTestCase):
+    """Coursebook test case
+
+    Defines the test cases for the function get_coursebook.
+    """
+
+    def setUp(self):
+        """Setup
+
+        Sets up the test database with favourites which were added in a different order
+        than the course structure.
+        """
+        super().setUp()
+        self.profile = self.user.profile
+        self.contents = {}
+        for name, topic in (('sub', self.topic3), ('second', self.topic2),
+                            ('first', self.topic1), ('first-later', self.topic1),
+                            ('removed', Topic.objects.create(title='Removed', category=self.cat))):
+            self.contents[name] = Content.objects.create(author=self.profile, topic=topic,
+                                                         type='Textfield', language='de')
+            Favorite.objects.create(user=self.profile, course=self.course1,
+                                    content=self.contents[name])
+
+    def test_get_coursebook(self):
+        """Get coursebook test case
+
+        Tests that the contents are ordered by the course structure.
+        """
+        with self.assertNumQueries(3):
+            coursebook = get_coursebook(self.profile, self.course1)
+            # The related objects are loaded with the contents
+            _ = [(content.author, content.topic, list(content.tags.all()))
+                 for content in coursebook]
+        self.assertEqual([self.contents[name] for name in
+                          ('first', 'first-later', 'second', 'sub', 'removed')], coursebook)
+
+    def test_course_view_query_count(self):
+        """Course view test case - query count
+
+        Tests that the number of queries of the coursebook does not depend on its size.
+        """
+        path = reverse('frontend:course', kwargs={'pk': self.course1.pk})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path)
+        queries = len(context.captured_queries)
+        self.assertEqual({content.pk for content in self.contents.values()},
+                         response.context['favorite'])
+        for _ in range(5):
+            Favorite.objects.create(user=self.profile, course=self.course1,
+                                    content=Content.objects.create(
+                                        author=self.profile, topic=self.topic2,
+                                        type='Textfield', language='de'))
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(path)
+        self.assertEqual(queries, len(context.captured_queries))
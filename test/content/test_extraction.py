@@ -0,0 +1,155 @@
+"""Purpose of this file
+
+This file contains the test cases for /content/extraction.py.
+"""
+
+import subprocess
+from io import StringIO
+from unittest import mock
+
+from test.test_cases import MediaTestCase
+from test import utils
+
+import reversion
+from reversion.models import Version
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from base.models import Course
+from base.search import SearchIndex
+
+from content.extraction import PDFTextExtractor
+from content.models import PDFContent, PDFPageText
+
+
+def pdftotext(*pages):
+    """pdftotext
+
+    Returns the result of a pdftotext run which extracted the given pages.
+
+    :param pages: The text of the pages
+    :type pages: str
+
+    :return: the completed process
+    :rtype: CompletedProcess
+    """
+    stdout = ''.join(f'{page}\f' for page in pages).encode('utf-8')
+    return subprocess.CompletedProcess(args=[], returncode=0, stdout=stdout, stderr=b'')
+
+
+@override_settings(PDF_TEXT_WORKERS=0)
+class PDFTextExtractorTestCase(MediaTestCase):
+    """PDF text extractor test case
+
+    Defines the test cases for the class PDFTextExtractor.
+    """
+
+    def create_pdf(self, data=b'%PDF-1.4 first'):
+        """Create PDF
+
+        Creates a PDF content whose text is extracted when it is saved.
+
+        :param data: The data of the PDF
+        :type data: bytes
+
+        :return: the created PDF content
+        :rtype: PDFContent
+        """
+        content = utils.create_content(PDFContent.TYPE)
+        return PDFContent.objects.create(content=content, source='Source',
+                                         pdf=ContentFile(data, name='test.pdf'))
+
+    def test_extract_pages(self):
+        """Extract test case - pages
+
+        Tests that the text is stored per page and found by the search.
+        """
+        with mock.patch('content.extraction.subprocess.run',
+                        return_value=pdftotext('Fourier series', '', 'Laplace transform')):
+            pdf = self.create_pdf()
+        pages = PDFPageText.objects.filter(content=pdf.content)
+        self.assertEqual([(1, 'Fourier series'), (3, 'Laplace transform')],
+                         list(pages.values_list('page', 'text')))
+        self.assertEqual(PDFTextExtractor.file_hash(pdf.pdf.path),
+                         PDFContent.objects.get(pk=pdf.pk).text_hash)
+        self.assertEqual([pdf.pk], [document.object_id
+                                    for document in SearchIndex.search('laplace')])
+
+    def test_extract_unchanged(self):
+        """Extract test case - unchanged PDF
+
+        Tests that the text of an unchanged PDF is not extracted again, unless it is forced
+        or the PDF changes.
+        """
+        with mock.patch('content.extraction.subprocess.run',
+                        return_value=pdftotext('First')) as run:
+            pdf = PDFContent.objects.get(pk=self.create_pdf().pk)
+            pdf.source = 'Other source'
+            pdf.save()
+            self.assertEqual(1, run.call_count)
+            self.assertTrue(PDFTextExtractor.extract(pdf.pk, force=True))
+            self.assertEqual(2, run.call_count)
+
+            pdf.pdf.save('test.pdf', ContentFile(b'%PDF-1.4 second'))
+            self.assertEqual(3, run.call_count)
+
+    def test_extract_failed(self):
+        """Extract test case - failed
+
+        Tests that a failed extraction keeps the PDF pending for the next extraction.
+        """
+        error = subprocess.CalledProcessError(1, 'pdftotext')
+        with mock.patch('content.extraction.subprocess.run', side_effect=error):
+            pdf = self.create_pdf()
+        self.assertEqual('', PDFContent.objects.get(pk=pdf.pk).text_hash)
+        self.assertFalse(PDFPageText.objects.exists())
+
+        out = StringIO()
+        with mock.patch('content.extraction.subprocess.run', return_value=pdftotext('Text')):
+            call_command('extract_pdf_text', stdout=out)
+        # The LaTeX content of the test database is extracted as well
+        self.assertIn('Extracted the text of 2 PDFs', out.getvalue())
+
+    def test_revert(self):
+        """Revert test case
+
+        Tests that the text of a reverted PDF is extracted again.
+        """
+        def run(args, **kwargs):  # pylint: disable=unused-argument
+            with open(args[3], 'rb') as file:
+                return pdftotext(file.read().decode())
+
+        with mock.patch('content.extraction.subprocess.run', side_effect=run):
+            with reversion.create_revision():
+                pdf = self.create_pdf(b'Fourier series')
+            version = Version.objects.get_for_object(pdf).get()
+            with reversion.create_revision():
+                pdf.pdf = ContentFile(b'Laplace transform', name='test.pdf')
+                pdf.save()
+            self.assertEqual(['Laplace transform'], [page.text for page in
+                                                     PDFPageText.objects.filter(content_id=pdf.pk)])
+
+            path = reverse('frontend:pdf-history', args=(Course.objects.first().pk,
+                                                         pdf.content.topic_id, pdf.pk))
+            self.client.post(path, {'ver_pk': version.pk})
+        self.assertEqual(['Fourier series'], [page.text for page in
+                                              PDFPageText.objects.filter(content_id=pdf.pk)])
+
+    def test_reading_mode_text(self):
+        """Reading mode test case - text
+
+        Tests that the reading mode shows the extracted text on request.
+        """
+        with mock.patch('content.extraction.subprocess.run',
+                        return_value=pdftotext('Fourier series')):
+            pdf = self.create_pdf()
+        path = reverse('frontend:content-reading-mode',
+                       args=(Course.objects.first().pk, pdf.content.topic_id, pdf.pk))
+        response = self.client.get(path)
+        self.assertContains(response, '?text=True')
+        self.assertNotContains(response, 'Fourier series')
+        response = self.client.get(path, {'text': 'True'})
+        self.assertContains(response, 'Fourier series')
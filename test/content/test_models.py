@@ -4,14 +4,30 @@ This file contains the test cases for /content/models.py.
 """
 
 import os
+from io import StringIO
+from unittest import mock
 
 
 from test.test_cases import MediaTestCase
 from test import utils
 
-from django.test import override_settings
+import reversion
+from reversion.models import Version
 
-from base.models import Content
+from django.contrib.auth.models import User  # pylint: disable=imported-auth-user
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from PIL import Image
+
+from base.models import Content, Course
+
+from content.static.yt_api import get_video_length, get_video_lengths
+from export.helper_functions import Latex
 
 import content.models as model
 
@@ -40,5 +56,216 @@ class LatexTestCase(MediaTestCase):  # pylint: disable=too-few-public-methods)
         content.preview.name = preview_path
         content.save()
 
-        self.assertEqual('uploads/previews/Topic_Category.jpg', content.preview.name)
+        self.assertEqual(f'uploads/previews/{latex.preview_stem()}.jpg', content.preview.name)
         self.assertTrue(bool(content.preview))
+
+
+@override_settings(MEDIA_ROOT=utils.MEDIA_ROOT)
+class LatexPreviewTestCase(MediaTestCase):
+    """LaTeX preview test case
+
+    Defines the test cases for the preview sizes of the model Latex.
+    """
+
+    def test_generate_preview(self):
+        """Generate preview test case
+
+        Tests that only the size shown on the cards is rendered by default.
+        """
+        latex = model.Latex.objects.first()
+        page = Image.new('RGB', (400, 566), 'white')
+        with mock.patch('content.models.convert_from_path', return_value=[page]) as convert:
+            preview_path = latex.generate_preview()
+        convert.assert_called_once_with(latex.pdf.path, first_page=1, last_page=1,
+                                        size=(400, None))
+        self.assertFalse(os.path.exists(os.path.join(
+            utils.MEDIA_ROOT, model.BasePDFModel.preview_name(preview_path, 'detail'))))
+        with Image.open(os.path.join(utils.MEDIA_ROOT, preview_path)) as image:
+            self.assertEqual((400, 566), image.size)
+
+    @override_settings(PREVIEW_SIZES={'card': (400, 600), 'detail': (900, 1300),
+                                      'reading': (1400, 2000)})
+    def test_generate_preview_sizes(self):
+        """Generate preview test case - sizes
+
+        Tests that only the first page is rendered and stored as a progressive thumbnail
+        in each size.
+        """
+        latex = model.Latex.objects.first()
+        page = Image.new('RGB', (1400, 1980), 'white')
+        with mock.patch('content.models.convert_from_path', return_value=[page]) as convert:
+            preview_path = latex.generate_preview()
+        convert.assert_called_once_with(latex.pdf.path, first_page=1, last_page=1,
+                                        size=(1400, None))
+        digest = latex.pdf.name.split('/')[1]
+        self.assertEqual(f'uploads/previews/{digest}.jpg', preview_path)
+
+        expected = {'card': (400, 566), 'detail': (900, 1273), 'reading': (1400, 1980)}
+        for size, dimensions in expected.items():
+            path = os.path.join(utils.MEDIA_ROOT,
+                                model.BasePDFModel.preview_name(preview_path, size))
+            with Image.open(path) as image:
+                self.assertEqual(dimensions, image.size)
+                self.assertTrue(image.info.get('progressive'))
+        self.assertEqual(f'uploads/previews/{digest}_detail.jpg',
+                         model.BasePDFModel.preview_name(preview_path, 'detail'))
+
+    def test_preview_stem(self):
+        """Preview stem test case
+
+        Tests that the previews of PDFs with the same name are named after the contents
+        of the PDFs.
+        """
+        first = model.Latex.objects.first()
+        first.pdf.save('Topic.pdf', ContentFile(b'%PDF first'), save=False)
+        second = model.Latex.objects.create(textfield='second',
+                                            content=utils.create_content(model.Latex.TYPE))
+        second.pdf.save('Topic.pdf', ContentFile(b'%PDF second'), save=False)
+        self.assertNotEqual(first.preview_stem(), second.preview_stem())
+
+        second.pdf.save('Other.pdf', ContentFile(b'%PDF first'), save=False)
+        self.assertEqual(first.preview_stem(), second.preview_stem())
+
+        with mock.patch.object(second.pdf, 'storage', FileSystemStorage()):
+            self.assertEqual(f'content_{second.pk}', second.preview_stem())
+
+
+class YTVideoContentTestCase(TestCase):
+    """YouTube video content test case
+
+    Defines the test cases for the stored lengths of the model YTVideoContent.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """Set up class
+
+        Starts a stub server for the YouTube API.
+        """
+        super().setUpClass()
+        cls.youtube = utils.YouTubeStubServer({'video0': 'PT6S', 'video1': 'PT1M30S'})
+        cls.youtube_settings = override_settings(YT_API_URL=cls.youtube.url)
+        cls.youtube_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Tear down class
+
+        Stops the stub server for the YouTube API.
+        """
+        cls.youtube_settings.disable()
+        cls.youtube.close()
+        super().tearDownClass()
+
+    def setUp(self):
+        """Setup
+
+        Sets up the test database.
+        """
+        utils.setup_database()
+        self.youtube.requests.clear()
+
+    def create_video(self, video_id, length=None):
+        """Create video
+
+        Creates a YouTube video content.
+
+        :param video_id: The id of the YouTube video
+        :type video_id: str
+        :param length: The stored length of the video
+        :type length: float or None
+
+        :return: the created video
+        :rtype: YTVideoContent
+        """
+        content = utils.create_content(model.YTVideoContent.TYPE)
+        return model.YTVideoContent.objects.create(
+            content=content, url=f'https://www.youtube.com/watch?v={video_id}',
+            start_time='0:00', end_time='0:05', length=length)
+
+    def test_clean_stores_length(self):
+        """Clean test case - length stored
+
+        Tests that the length requested for the validation is stored with the video.
+        """
+        video = self.create_video('video0')
+        video.full_clean()
+        video.save()
+        self.assertEqual(6, model.YTVideoContent.objects.get(pk=video.pk).length)
+
+    def test_get_length_without_request(self):
+        """Get length test case - stored
+
+        Tests that a stored length is used for the export without requesting the API.
+        """
+        video = self.create_video('video1', length=90)
+        rendered = Latex.pre_render(video.content, True).decode(Latex.encoding)
+        self.assertIn('1 Minutes, 30 Seconds', rendered)
+        self.assertEqual([], self.youtube.requests)
+
+    def test_get_length_missing(self):
+        """Get length test case - missing
+
+        Tests that a missing length is requested once and stored.
+        """
+        video = self.create_video('video1')
+        self.assertEqual(90, video.get_length())
+        self.assertEqual(90, model.YTVideoContent.objects.get(pk=video.pk).length)
+        self.assertEqual(1, len(self.youtube.requests))
+
+    def test_get_length_not_found(self):
+        """Get length test case - not found
+
+        Tests that the length of a video which can not be found is missing and that such a
+        video is not valid.
+        """
+        self.assertIsNone(get_video_length('unknown'))
+        video = self.create_video('unknown')
+        self.assertIsNone(video.get_length())
+        self.assertIsNone(model.YTVideoContent.objects.get(pk=video.pk).length)
+        rendered = Latex.pre_render(video.content, True).decode(Latex.encoding)
+        self.assertNotIn('Seconds', rendered)
+        with self.assertRaises(ValidationError):
+            video.clean()
+
+    def test_revert_keeps_length(self):
+        """Revert test case - length
+
+        Tests that a revert keeps the stored length of the video.
+        """
+        with reversion.create_revision():
+            video = self.create_video('video1', length=90)
+        version = Version.objects.get_for_object(video).get()
+        with reversion.create_revision():
+            video.start_time = '0:01'
+            video.save()
+
+        self.client.force_login(User.objects.first())
+        path = reverse('frontend:ytvideo-history', args=(Course.objects.first().pk,
+                                                    video.content.topic_id, video.pk))
+        self.client.post(path, {'ver_pk': version.pk})
+        video = model.YTVideoContent.objects.get(pk=video.pk)
+        self.assertEqual('0:00', video.start_time)
+        self.assertEqual(90, video.length)
+        self.assertEqual([], self.youtube.requests)
+
+    def test_get_video_lengths_batches(self):
+        """Get video lengths test case - batches
+
+        Tests that the videos are requested in batches of 50 ids.
+        """
+        ids = ['video0', 'video1'] + [f'unknown{idx}' for idx in range(58)]
+        self.assertEqual({'video0': 6, 'video1': 90}, get_video_lengths(ids))
+        self.assertEqual([50, 10], [len(request) for request in self.youtube.requests])
+
+    def test_refresh_command(self):
+        """Refresh video lengths test case
+
+        Tests that the management command refreshes the missing lengths with one request.
+        """
+        missing = self.create_video('video0')
+        stored = self.create_video('video1', length=1)
+        call_command('refresh_video_lengths', '--missing', stdout=StringIO())
+        self.assertEqual(6, model.YTVideoContent.objects.get(pk=missing.pk).length)
+        self.assertEqual(1, model.YTVideoContent.objects.get(pk=stored.pk).length)
+        self.assertEqual([['video0']], self.youtube.requests)
@@ -0,0 +1,127 @@
+"""Purpose of this file
+
+This file contains the test cases for /content/previews.py.
+"""
+
+from io import StringIO
+from unittest import mock
+
+from test.test_cases import MediaTestCase
+from test import utils
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
+
+from base.models import Content
+
+from content.models import Latex, TextField
+from content.previews import PreviewQueue
+
+
+@override_settings(PREVIEW_WORKERS=0, PREVIEW_RETRIES=1, PREVIEW_RETRY_DELAY=0)
+class PreviewQueueTestCase(MediaTestCase):
+    """Preview queue test case
+
+    Defines the test cases for the class PreviewQueue.
+    """
+
+    def test_submit(self):
+        """Submit test case
+
+        Tests that a submitted content gets its generated preview.
+        """
+        content = Content.objects.first()
+        with mock.patch('content.models.Latex.generate_preview',
+                        return_value='uploads/previews/test.jpg') as generate_preview, \
+                self.captureOnCommitCallbacks(execute=True):
+            PreviewQueue.submit(content)
+        generate_preview.assert_called_once()
+        self.assertEqual('uploads/previews/test.jpg', Content.objects.get(pk=content.pk).preview)
+        self.assertEqual([], PreviewQueue.missing())
+
+    def test_submit_in_transaction(self):
+        """Submit test case - transaction
+
+        Tests that a content submitted inside a transaction gets its preview after the
+        commit and that the database connection of the transaction is kept.
+        """
+        content = Content.objects.first()
+        with mock.patch('content.models.Latex.generate_preview',
+                        return_value='uploads/previews/test.jpg') as generate_preview, \
+                mock.patch('content.previews.close_old_connections') as close, \
+                self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                PreviewQueue.submit(content)
+                Content.objects.filter(pk=content.pk).update(description='Edited')
+                generate_preview.assert_not_called()
+        generate_preview.assert_called_once()
+        close.assert_not_called()
+        content = Content.objects.get(pk=content.pk)
+        self.assertEqual('Edited', content.description)
+        self.assertEqual('uploads/previews/test.jpg', content.preview)
+
+    def test_submit_failed(self):
+        """Submit test case - failed
+
+        Tests that a failed direct generation is not retried and the placeholder is kept.
+        """
+        content = Content.objects.first()
+        Content.objects.filter(pk=content.pk).update(preview='uploads/previews/old.jpg')
+        with mock.patch('content.models.Latex.generate_preview',
+                        side_effect=OSError) as generate_preview, \
+                mock.patch('content.previews.time.sleep') as sleep, \
+                self.assertLogs('content.previews', 'ERROR'), \
+                self.captureOnCommitCallbacks(execute=True):
+            PreviewQueue.submit(content)
+        generate_preview.assert_called_once()
+        sleep.assert_not_called()
+        self.assertFalse(Content.objects.get(pk=content.pk).preview)
+        self.assertEqual([content.pk], PreviewQueue.missing())
+
+    def test_work_retry(self):
+        """Work test case - retry
+
+        Tests that a failed generation of a worker is retried.
+        """
+        content = Content.objects.first()
+        with mock.patch('content.models.Latex.generate_preview',
+                        side_effect=[OSError, 'uploads/previews/test.jpg']) as generate_preview, \
+                self.assertLogs('content.previews', 'ERROR'):
+            self.assertTrue(PreviewQueue.work(content.pk))
+        self.assertEqual(2, generate_preview.call_count)
+        self.assertEqual('uploads/previews/test.jpg', Content.objects.get(pk=content.pk).preview)
+
+        with mock.patch('content.models.Latex.generate_preview', side_effect=OSError), \
+                self.assertLogs('content.previews', 'ERROR'):
+            self.assertFalse(PreviewQueue.work(content.pk))
+
+    def test_submit_without_preview(self):
+        """Submit test case - without preview
+
+        Tests that contents without a generated preview are not submitted.
+        """
+        content = utils.create_content(TextField.TYPE)
+        TextField.objects.create(content=content, textfield='Text')
+        self.assertFalse(PreviewQueue.has_preview(TextField.TYPE))
+        self.assertTrue(PreviewQueue.has_preview(Latex.TYPE))
+        with mock.patch('content.previews.PreviewQueue.generate') as generate, \
+                self.captureOnCommitCallbacks(execute=True):
+            PreviewQueue.submit(content)
+        generate.assert_not_called()
+        self.assertNotIn(content.pk, PreviewQueue.missing())
+
+    def test_command(self):
+        """Command test case
+
+        Tests that the management command generates the missing previews or all previews.
+        """
+        with mock.patch('content.models.Latex.generate_preview',
+                        return_value='uploads/previews/test.jpg') as generate_preview:
+            for args, expected in (((), 'Generated 1 of 1 previews'),
+                                   ((), 'Generated 0 of 0 previews'),
+                                   (('--all',), 'Generated 1 of 1 previews')):
+                out = StringIO()
+                call_command('generate_previews', *args, stdout=out)
+                self.assertIn(expected, out.getvalue())
+        self.assertEqual(2, generate_preview.call_count)
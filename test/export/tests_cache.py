@@ -0,0 +1,178 @@
+"""Purpose of this file
+
+This file contains the test cases for /export/cache.py.
+"""
+
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from export.cache import CompilationCache, MarkdownCache
+from export.helper_functions import Latex
+
+# Temporary cache directory
+CACHE_DIR = tempfile.mkdtemp()
+# Temporary Markdown cache directory
+MARKDOWN_CACHE_DIR = tempfile.mkdtemp()
+
+
+@override_settings(LATEX_CACHE_DIR=CACHE_DIR, LATEX_CACHE_MAX_SIZE=1024 * 1024)
+class CompilationCacheTestCase(SimpleTestCase):
+    """Compilation cache test case
+
+    Defines the test cases for the class CompilationCache.
+    """
+
+    def tearDown(self):
+        """Tear down
+
+        Deletes the cache entries after each test.
+        """
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    def test_get_set(self):
+        """Get and set test case
+
+        Tests that a stored compilation can be retrieved again.
+        """
+        key = CompilationCache.key(b'source', 1)
+        self.assertIsNone(CompilationCache.get(key))
+        CompilationCache.set(key, b'%PDF', (b'log', None), b'source')
+        self.assertEqual((b'%PDF', (b'log', None), b'source'), CompilationCache.get(key))
+
+    def test_get_set_without_pdf(self):
+        """Get and set test case - failed compilation
+
+        Tests that a compilation without PDF is cached with its log.
+        """
+        key = CompilationCache.key(b'broken', 1)
+        CompilationCache.set(key, None, (b'! error', None), b'broken')
+        self.assertEqual((None, (b'! error', None), b'broken'), CompilationCache.get(key))
+
+    def test_key_covers_inputs(self):
+        """Key test case
+
+        Tests that the key changes with the passes, the template and referenced files.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'image.png').replace('\\', '/')
+            with open(path, 'wb') as file:
+                file.write(b'first')
+            source = rb'\includegraphics{' + path.encode() + b'}'
+            key = CompilationCache.key(source, 1)
+
+            self.assertEqual(key, CompilationCache.key(source, 1))
+            self.assertNotEqual(key, CompilationCache.key(source, 2))
+            self.assertNotEqual(key, CompilationCache.key(source + b' ', 1))
+
+            with open(path, 'wb') as file:
+                file.write(b'second')
+            self.assertNotEqual(key, CompilationCache.key(source, 1))
+
+    def test_evict_least_recently_used(self):
+        """Evict test case
+
+        Tests that the least recently used entries are evicted first.
+        """
+        for name in ('a', 'b', 'c'):
+            CompilationCache.set(name, b'x' * 100, (b'', None), b'')
+        os.utime(os.path.join(CACHE_DIR, 'a'), (1, 1))
+        os.utime(os.path.join(CACHE_DIR, 'b'), (2, 2))
+        os.utime(os.path.join(CACHE_DIR, 'c'), (3, 3))
+        # Reading an entry marks it as recently used
+        CompilationCache.get('a')
+
+        CompilationCache.evict(max_size=250)
+        self.assertIsNotNone(CompilationCache.get('a'))
+        self.assertIsNone(CompilationCache.get('b'))
+        self.assertIsNotNone(CompilationCache.get('c'))
+
+    @override_settings(LATEX_CACHE_MAX_SIZE=1000)
+    def test_set_evicts_when_full(self):
+        """Set test case - eviction
+
+        Tests that the cache directory is only walked once the stored entries exceed the
+        maximum size, and that the eviction makes room for the following entries.
+        """
+        CompilationCache.clear()
+        with mock.patch.object(CompilationCache, 'evict_directory',
+                               wraps=CompilationCache.evict_directory) as evict:
+            for idx, name in enumerate(('a', 'b', 'c')):
+                CompilationCache.set(name, b'x' * 300, (b'', None), b'')
+                os.utime(os.path.join(CACHE_DIR, name), (idx + 1, idx + 1))
+            evict.assert_not_called()
+
+            CompilationCache.set('d', b'x' * 300, (b'', None), b'')
+            evict.assert_called_once()
+        self.assertIsNone(CompilationCache.get('a'))
+        for name in ('b', 'c', 'd'):
+            self.assertIsNotNone(CompilationCache.get(name))
+
+    def test_render_compiles_once(self):
+        """Render test case - compiled once
+
+        Tests that rendering identical sources runs pdflatex only once.
+        """
+        context = {'preview_data': r'\section{Cache}', 'export_pdf': False,
+                   'image_formset': mock.Mock(is_valid=mock.Mock(return_value=False))}
+        process = mock.Mock(communicate=mock.Mock(return_value=(b'output', None)))
+        with mock.patch('export.helper_functions.get_template') as get_template, \
+                mock.patch('export.helper_functions.Latex.preview_prerender',
+                           return_value=b'\\end{document}'), \
+                mock.patch('export.helper_functions.Popen', return_value=process) as popen:
+            get_template.return_value.render.return_value = r'\documentclass{article}'
+            first = Latex.render(context, 'content/export/base.tex')
+            second = Latex.render(context, 'content/export/base.tex')
+        self.assertEqual(1, popen.call_count)
+        self.assertEqual(first, second)
+
+
+@override_settings(MARKDOWN_CACHE_DIR=MARKDOWN_CACHE_DIR, MARKDOWN_CACHE_MAX_SIZE=1024 * 1024)
+class MarkdownCacheTestCase(SimpleTestCase):
+    """Markdown cache test case
+
+    Defines the test cases for the class MarkdownCache.
+    """
+
+    def tearDown(self):
+        """Tear down
+
+        Deletes the cache entries after each test.
+        """
+        shutil.rmtree(MARKDOWN_CACHE_DIR, ignore_errors=True)
+
+    def test_get_set(self):
+        """Get and set test case
+
+        Tests that a stored PDF can be retrieved again and the key covers the options.
+        """
+        key = MarkdownCache.key('<p>Text</p>', Latex.markdown_options)
+        self.assertNotEqual(key, MarkdownCache.key('<p>Text</p>', {}))
+        self.assertIsNone(MarkdownCache.get(key))
+        MarkdownCache.set(key, b'%PDF')
+        self.assertEqual(b'%PDF', MarkdownCache.get(key))
+
+    def test_render_markdown_converts_once(self):
+        """Render Markdown test case - converted once
+
+        Tests that the Markdown contents are converted in parallel into their directories
+        and identical HTML is only converted once.
+        """
+        contents = [mock.Mock(pk=pk, topic=mock.Mock(title='Topic'), description='')
+                    for pk in (1, 2, 3)]
+        html = {1: '<p>Same</p>', 2: '<p>Same</p>', 3: '<p>Other</p>'}
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch('export.helper_functions.Markdown.render',
+                           side_effect=lambda content, _: html[content.pk]), \
+                mock.patch('export.helper_functions.pdfkit.from_string',
+                           side_effect=lambda source, options: source.encode()) as convert:
+            Latex.render_markdown([(content, directory) for content in contents], False,
+                                  max_workers=3)
+            Latex.render_markdown([(contents[2], directory)], False)
+            with open(os.path.join(directory, 'MD_3.pdf'), 'rb') as file:
+                self.assertEqual(b'<p>Other</p>', file.read())
+            self.assertEqual(3, len(os.listdir(directory)))
+        self.assertEqual(2, convert.call_count)
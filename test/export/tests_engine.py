@@ -0,0 +1,195 @@
+"""Purpose of this file
+
+This file contains the test cases for /export/engine.py.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from unittest import mock
+
+from django.template.loader import get_template
+from django.test import SimpleTestCase, override_settings
+
+from export.engine import AuxFiles, CompilationTimings, PreambleFormat
+
+# Temporary format directory
+FORMAT_DIR = tempfile.mkdtemp()
+# Temporary directory of the auxiliary files
+AUX_DIR = tempfile.mkdtemp()
+
+
+@override_settings(LATEX_FORMAT_DIR=FORMAT_DIR, LATEX_FORMAT_ENABLED=True)
+class PreambleFormatTestCase(SimpleTestCase):
+    """Preamble format test case
+
+    Defines the test cases for the class PreambleFormat.
+    """
+
+    def setUp(self):
+        """Setup
+
+        Resets the pdflatex version and the failed formats of the process.
+        """
+        PreambleFormat._version = b'pdfTeX 3.14'
+        PreambleFormat._failed = set()
+
+    def tearDown(self):
+        """Tear down
+
+        Deletes the formats after each test.
+        """
+        PreambleFormat._version = None
+        PreambleFormat._failed = set()
+        shutil.rmtree(FORMAT_DIR, ignore_errors=True)
+
+    @staticmethod
+    def build(args, cwd=None, **kwargs):  # pylint: disable=unused-argument
+        """Build
+
+        Simulates pdflatex building a format in its working directory.
+
+        :param args: The arguments of the command
+        :type args: list[str]
+        :param cwd: The working directory
+        :type cwd: str
+        :param kwargs: The keyword arguments
+        :type kwargs: Any
+
+        :return: the completed process
+        :rtype: subprocess.CompletedProcess
+        """
+        name = next(arg for arg in args if arg.startswith('-jobname=')).split('=', 1)[1]
+        with open(os.path.join(cwd, f'{name}.fmt'), 'wb') as file:
+            file.write(b'format')
+        return subprocess.CompletedProcess(args, 0)
+
+    def test_preamble(self):
+        """Preamble test case
+
+        Tests that the preamble of the export template ends before the title information.
+        """
+        rendered_tpl = get_template('content/export/base.tex') \
+            .render({'fragment': True, 'export_pdf': False}).encode()
+        preamble = PreambleFormat.preamble(rendered_tpl)
+        self.assertTrue(preamble.endswith(PreambleFormat.marker))
+        self.assertIn(rb'\usepackage{hyperref}', preamble)
+        self.assertNotIn(rb'\title', preamble)
+        self.assertIsNone(PreambleFormat.preamble(rb'\documentclass{article}'))
+
+    def test_command(self):
+        """Command test case
+
+        Tests that the format is built once per preamble and loaded by the command.
+        """
+        rendered_tpl = rb'\documentclass{article}\csname endofdump\endcsname\begin{document}'
+        with mock.patch('export.engine.subprocess.run', side_effect=self.build) as run:
+            command, env = PreambleFormat.command(rendered_tpl)
+            self.assertEqual(command, PreambleFormat.command(rendered_tpl + b'Body')[0])
+        self.assertEqual(1, run.call_count)
+        self.assertIn('mylatexformat.ltx', run.call_args[0][0])
+        name = PreambleFormat.name(PreambleFormat.preamble(rendered_tpl), b'pdfTeX 3.14')
+        self.assertEqual(['pdflatex', f'-fmt={name}'], command)
+        self.assertTrue(os.path.exists(os.path.join(FORMAT_DIR, f'{name}.fmt')))
+        self.assertTrue(env['TEXFORMATS'].startswith(os.path.abspath(FORMAT_DIR)))
+        # Only the finished format is left in the directory
+        self.assertEqual([f'{name}.fmt'], os.listdir(FORMAT_DIR))
+
+    def test_command_failed(self):
+        """Command test case - failed
+
+        Tests that a format which can not be built falls back to pdflatex and is not
+        built again.
+        """
+        rendered_tpl = rb'\documentclass{article}\csname endofdump\endcsname'
+        with mock.patch('export.engine.subprocess.run',
+                        return_value=subprocess.CompletedProcess([], 1)) as run:
+            self.assertEqual((['pdflatex'], None), PreambleFormat.command(rendered_tpl))
+            self.assertEqual((['pdflatex'], None), PreambleFormat.command(rendered_tpl))
+        self.assertEqual(1, run.call_count)
+
+    @override_settings(LATEX_FORMAT_ENABLED=False)
+    def test_command_disabled(self):
+        """Command test case - disabled
+
+        Tests that the documents are compiled without a format if the formats are disabled.
+        """
+        rendered_tpl = rb'\documentclass{article}\csname endofdump\endcsname'
+        with mock.patch('export.engine.subprocess.run') as run:
+            self.assertEqual((['pdflatex'], None), PreambleFormat.command(rendered_tpl))
+        run.assert_not_called()
+
+
+@override_settings(LATEX_AUX_DIR=AUX_DIR)
+class AuxFilesTestCase(SimpleTestCase):
+    """Auxiliary files test case
+
+    Defines the test cases for the class AuxFiles.
+    """
+
+    def tearDown(self):
+        """Tear down
+
+        Deletes the stored auxiliary files after each test.
+        """
+        shutil.rmtree(AUX_DIR, ignore_errors=True)
+
+    def test_store_restore(self):
+        """Store and restore test case
+
+        Tests that the auxiliary files of a document are restored into another directory
+        and that removed files are not restored.
+        """
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            for name in ('texput.aux', 'texput.toc', 'texput.pdf'):
+                with open(os.path.join(first, name), 'wb') as file:
+                    file.write(name.encode())
+            AuxFiles.store('course-1', first)
+            AuxFiles.restore('course-1', second)
+            self.assertEqual({'texput.aux': b'texput.aux', 'texput.toc': b'texput.toc'},
+                             AuxFiles.snapshot(second))
+
+            os.remove(os.path.join(first, 'texput.toc'))
+            AuxFiles.store('course-1', first)
+            with tempfile.TemporaryDirectory() as third:
+                AuxFiles.restore('course-1', third)
+                self.assertEqual(['texput.aux'], os.listdir(third))
+
+        # The files of other documents are kept separately
+        with tempfile.TemporaryDirectory() as other:
+            AuxFiles.restore('course-2', other)
+            self.assertEqual([], os.listdir(other))
+
+    def test_stable(self):
+        """Stable test case
+
+        Tests that a pass is stable if it did not change the existing auxiliary files.
+        """
+        self.assertTrue(AuxFiles.stable({'texput.aux': b'a'}, {'texput.aux': b'a'}))
+        self.assertFalse(AuxFiles.stable({}, {'texput.aux': b'a'}))
+        self.assertFalse(AuxFiles.stable({'texput.aux': b'a'}, {'texput.aux': b'b'}))
+        self.assertFalse(AuxFiles.stable({}, {}))
+
+
+class CompilationTimingsTestCase(SimpleTestCase):
+    """Compilation timings test case
+
+    Defines the test cases for the class CompilationTimings.
+    """
+
+    def test_phase(self):
+        """Phase test case
+
+        Tests that phases with the same name are summed up in their order.
+        """
+        timings = CompilationTimings()
+        with mock.patch('export.engine.time.perf_counter', side_effect=[0, 1, 1, 3, 3, 3.5]):
+            with timings.phase('render'):
+                pass
+            with timings.phase('pass 1'):
+                pass
+            with timings.phase('render'):
+                pass
+        self.assertEqual({'render': 1.5, 'pass 1': 2}, timings.phases)
+        self.assertEqual('render=1.500s pass 1=2.000s', str(timings))
@@ -4,15 +4,21 @@ This file contains the test cases for /export/helper_functions.py.
 """
 
 import os
+import tempfile
+from unittest import mock
 
 from test import utils
 
-from django.test import TestCase
+from django.contrib.auth.models import User  # pylint: disable=imported-auth-user
+from django.test import TestCase, override_settings
+
+from base.models import Course
 
 import content.models as model
 
 import export.helper_functions as helper
 from content.attachment.forms import LatexPreviewImageAttachmentFormSet
+from content.attachment.models import ImageAttachment
 from export.templatetags.cc_export_tags import tex_escape
 
 
@@ -102,6 +108,109 @@ class LaTeXTestCase(TestCase):
                      f"\\includegraphics[width=\\textwidth]{{1_{test_files[1].name}}}"
         self.assertIn(latex_code, pre_render.decode(helper.Latex.encoding))
 
+    @override_settings(LATEX_CACHE_ENABLED=False)
+    def test_render_fragments(self):
+        """Render fragments test case
+
+        Tests that every content is compiled separately and the fragments are stitched
+        together with a numbered table of contents, while an erroneous content only
+        replaces its own fragment with the error log.
+        """
+        first = model.Content.objects.first()
+        second = utils.create_content(model.TextField.TYPE)
+        second.description = 'Broken'
+        model.TextField.objects.create(textfield='Undefined', content=second)
+        sources = []
+
+        def popen(*args, cwd=None, **kwargs):  # pylint: disable=unused-argument
+            def communicate(source):
+                sources.append(source)
+                with open(os.path.join(cwd, 'texput.pdf'), 'wb') as file:
+                    file.write(source)
+                if b'Undefined' in source and b'errors were found' not in source:
+                    return b'! Undefined control sequence.', None
+                return b'output', None
+            return mock.Mock(communicate=communicate)
+
+        context = {'user': User.objects.first(), 'course': Course.objects.first(),
+                   'export_pdf': True, 'contents': [first, second]}
+        with mock.patch('export.helper_functions.Popen', side_effect=popen):
+            pdf, _, tex = helper.Latex.render_fragments(context, 'content/export/base.tex',
+                                                        max_workers=2)
+        # Two fragments, one error fragment and two passes of the stitched document
+        self.assertEqual(5, len(sources))
+        self.assertEqual(tex, pdf)
+        tex = tex.decode(helper.Latex.encoding)
+        self.assertIn('\\tableofcontents', tex)
+        self.assertIn('{fragment_0.pdf}', tex)
+        self.assertIn('{fragment_1.pdf}', tex)
+        self.assertIn(first.description, tex)
+        self.assertIn('Broken', tex)
+        fragments = [source.decode(helper.Latex.encoding) for source in sources[:3]]
+        self.assertTrue(all('\\maketitle' not in fragment for fragment in fragments))
+        self.assertEqual(1, sum('errors were found' in fragment for fragment in fragments))
+        # The sections are numbered as in a single document
+        self.assertIn('\\setcounter{section}{0}', ''.join(fragments))
+        self.assertIn('\\setcounter{section}{1}', ''.join(fragments))
+        self.assertIn('\\numberline{ 1 }', tex)
+        self.assertIn('\\numberline{ 2 }', tex)
+
+    def test_aux_key(self):
+        """Aux key test case
+
+        Tests that the exports of the whole course and of the coursebook keep their
+        auxiliary files separately.
+        """
+        course = Course.objects.first()
+        user = User.objects.first()
+        template = 'content/export/base.tex'
+        course_key = helper.Latex.aux_key({'export_pdf': True, 'course': course, 'user': user,
+                                           'exp_all': True}, template)
+        coursebook_key = helper.Latex.aux_key({'export_pdf': True, 'course': course,
+                                               'user': user, 'exp_all': False}, template)
+        self.assertNotEqual(course_key, coursebook_key)
+        self.assertNotEqual(course_key, helper.Latex.aux_key(
+            {'export_pdf': True, 'course': course, 'user': user, 'exp_all': True}, template,
+            fragments=True))
+        self.assertIsNone(helper.Latex.aux_key({'export_pdf': False, 'course': course},
+                                               template))
+
+    @override_settings(LATEX_CACHE_ENABLED=False, LATEX_AUX_DIR=tempfile.mkdtemp())
+    def test_compile_aux_files(self):
+        """Compile test case - auxiliary files
+
+        Tests that the second pass is skipped once the table of contents is stable and
+        that the auxiliary files are kept for the next build of the export.
+        """
+        passes = []
+
+        def popen(*args, cwd=None, **kwargs):  # pylint: disable=unused-argument
+            def communicate(source):
+                passes.append(source)
+                with open(os.path.join(cwd, 'texput.toc'), 'wb') as file:
+                    file.write(source)
+                with open(os.path.join(cwd, 'texput.pdf'), 'wb') as file:
+                    file.write(source)
+                return b'output', None
+            return mock.Mock(communicate=communicate)
+
+        def compile_export(source):
+            with tempfile.TemporaryDirectory() as directory, \
+                    mock.patch('export.helper_functions.Popen', side_effect=popen):
+                return helper.Latex.compile(None, {}, source, 2, directory,
+                                            aux_key='course-1-user-1')
+
+        # The first build writes the table of contents
+        compile_export(b'\\section{First}')
+        self.assertEqual(2, len(passes))
+        # An unchanged export converges in one pass with the kept table of contents
+        pdf, _, _ = compile_export(b'\\section{First}')
+        self.assertEqual(3, len(passes))
+        self.assertEqual(b'\\section{First}', pdf)
+        # A changed table of contents needs a second pass
+        compile_export(b'\\section{Second}')
+        self.assertEqual(5, len(passes))
+
 
 class MarkdownTestCase(TestCase):
     """Markdown test case
@@ -147,3 +256,30 @@ class MarkdownTestCase(TestCase):
         self.assertEqual(md1, res1)
         md2 = helper.Markdown.render(content2, False)
         self.assertEqual(md2, res2)
+
+    @override_settings(MEDIA_ROOT=utils.MEDIA_ROOT)
+    def test_markdown_render_stored(self):
+        """Markdown render test case - stored HTML
+
+        Tests that the rendered HTML is stored and rendered again after the Markdown script
+        or the attachments changed.
+        """
+        content = utils.create_content(model.MDContent.TYPE)
+        md_content = model.MDContent.objects.create(textfield="![alt](Image-0)", content=content)
+        self.assertEqual('<p><img src="Image-0" alt="alt" /></p>\n',
+                         helper.Markdown.render(content, False))
+        content = model.Content.objects.get(pk=content.pk)
+        with self.assertNumQueries(1):
+            # Only the Markdown content is loaded
+            helper.Markdown.render(content, False)
+
+        attachment = ImageAttachment.objects.create(content=content,
+                                                    image=utils.generate_image_file(0))
+        content = model.Content.objects.get(pk=content.pk)
+        self.assertIn(attachment.image.url, helper.Markdown.render(content, False))
+
+        md_content = model.MDContent.objects.get(pk=md_content.pk)
+        md_content.textfield = "*Changed*"
+        md_content.save()
+        content = model.Content.objects.get(pk=content.pk)
+        self.assertEqual('<p><em>Changed</em></p>\n', helper.Markdown.render(content, False))
@@ -0,0 +1,173 @@
+"""Purpose of this file
+
+This file contains the test cases for /export/jobs.py.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from test.test_cases import MediaTestCase
+
+from django.contrib.auth.models import User  # pylint: disable=imported-auth-user
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from base.models import Course
+
+from export.jobs import ExportJobQueue, start_export_jobs
+from export.models import ExportJob
+
+# Result of a successful compilation
+COMPILED = (b'%PDF-1.5', (b'output', None), b'\\documentclass{article}')
+# Result of a failed compilation
+FAILED = (None, (b'! Undefined control sequence.', None), b'\\broken')
+
+
+@override_settings(EXPORT_JOB_WORKERS=0)
+class ExportJobQueueTestCase(MediaTestCase):
+    """Export job queue test case
+
+    Defines the test cases for the class ExportJobQueue and the export job views.
+    """
+
+    def setUp(self):
+        """Setup
+
+        Sets up the test database.
+        """
+        super().setUp()
+        self.user = User.objects.first()
+        self.course = Course.objects.first()
+
+    def submit(self):
+        """Submit
+
+        Submits an export of the whole course via the view.
+
+        :return: the response of the view
+        :rtype: JsonResponse
+        """
+        return self.client.post(reverse('frontend:export-course-job', args=(self.course.pk,)))
+
+    def test_submit_and_download(self):
+        """Submit test case - successful
+
+        Tests that a submitted job is compiled and its PDF can be downloaded.
+        """
+        with mock.patch('export.views.Latex.render_fragments', return_value=COMPILED) as render:
+            response = self.submit()
+        self.assertEqual(202, response.status_code)
+        self.assertEqual(1, render.call_count)
+        job = ExportJob.objects.get(pk=response.json()['id'])
+        self.assertEqual(ExportJob.DONE, job.status)
+
+        status = self.client.get(response.json()['status_url'])
+        self.assertEqual('done', status.json()['status'])
+        download = self.client.get(response.json()['download_url'])
+        self.assertEqual(200, download.status_code)
+        self.assertEqual(b'%PDF-1.5', b''.join(download.streaming_content))
+        self.assertIn('Course.pdf', download['Content-Disposition'])
+
+    def test_submit_failed(self):
+        """Submit test case - failed
+
+        Tests that the rendering error of a failed job is shown on download.
+        """
+        with mock.patch('export.views.Latex.render_fragments', return_value=FAILED):
+            response = self.submit()
+        job = ExportJob.objects.get(pk=response.json()['id'])
+        self.assertEqual(ExportJob.FAILED, job.status)
+        download = self.client.get(response.json()['download_url'])
+        self.assertContains(download, 'Undefined control sequence')
+
+    def test_download_pending(self):
+        """Download test case - pending
+
+        Tests that a job which is not finished cannot be downloaded.
+        """
+        job = ExportJob.objects.create(user=self.user.profile, course=self.course,
+                                       file_name='Course')
+        response = self.client.get(reverse('frontend:export-job-download', args=(job.pk,)))
+        self.assertEqual(409, response.status_code)
+        self.assertEqual('pending', response.json()['status'])
+
+    def test_foreign_job(self):
+        """Status test case - foreign job
+
+        Tests that users cannot see the jobs of other users.
+        """
+        other = User.objects.create(username='other')
+        job = ExportJob.objects.create(user=other.profile, course=self.course,
+                                       file_name='Course')
+        response = self.client.get(reverse('frontend:export-job', args=(job.pk,)))
+        self.assertEqual(404, response.status_code)
+
+    def test_run_claims_once(self):
+        """Run test case - claimed once
+
+        Tests that a job is only compiled once even if it is run several times.
+        """
+        job = ExportJob.objects.create(user=self.user.profile, course=self.course,
+                                       file_name='Course')
+        with mock.patch('export.views.Latex.render_fragments', return_value=COMPILED) as render:
+            self.assertTrue(ExportJobQueue.run(job.pk))
+            self.assertFalse(ExportJobQueue.run(job.pk))
+        self.assertEqual(1, render.call_count)
+
+    def test_resume_interrupted_jobs(self):
+        """Run export jobs test case - resume
+
+        Tests that pending and interrupted jobs are compiled by the management command
+        while recently started jobs are left alone.
+        """
+        pending = ExportJob.objects.create(user=self.user.profile, course=self.course,
+                                           file_name='Course')
+        interrupted = ExportJob.objects.create(user=self.user.profile, course=self.course,
+                                               file_name='Course', status=ExportJob.RUNNING,
+                                               start_date=timezone.now() - timedelta(days=1))
+        running = ExportJob.objects.create(user=self.user.profile, course=self.course,
+                                           file_name='Course', status=ExportJob.RUNNING,
+                                           start_date=timezone.now())
+        with mock.patch('export.views.Latex.render_fragments', return_value=COMPILED):
+            call_command('run_export_jobs', stdout=StringIO())
+        self.assertEqual(ExportJob.DONE, ExportJob.objects.get(pk=pending.pk).status)
+        self.assertEqual(ExportJob.DONE, ExportJob.objects.get(pk=interrupted.pk).status)
+        self.assertEqual(ExportJob.RUNNING, ExportJob.objects.get(pk=running.pk).status)
+
+    def test_delete_expired(self):
+        """Delete expired test case
+
+        Tests that old finished jobs are deleted.
+        """
+        expired = ExportJob.objects.create(user=self.user.profile, course=self.course,
+                                           file_name='Course', status=ExportJob.DONE,
+                                           end_date=timezone.now() - timedelta(days=30))
+        recent = ExportJob.objects.create(user=self.user.profile, course=self.course,
+                                          file_name='Course', status=ExportJob.DONE,
+                                          end_date=timezone.now())
+        ExportJobQueue.delete_expired()
+        self.assertFalse(ExportJob.objects.filter(pk=expired.pk).exists())
+        self.assertTrue(ExportJob.objects.filter(pk=recent.pk).exists())
+
+    @override_settings(EXPORT_JOB_WORKERS=1)
+    def test_start_with_first_request(self):
+        """Start test case - first request
+
+        Tests that the pending jobs of a previous run are resumed with the first request of
+        the process and that the pool is only started once.
+        """
+        pending = ExportJob.objects.create(user=self.user.profile, course=self.course,
+                                           file_name='Course')
+        request_started.connect(start_export_jobs)
+        # The pool of the process is not started yet
+        with mock.patch.object(ExportJobQueue, '_executor', None), \
+                mock.patch('export.jobs.ThreadPoolExecutor') as pool:
+            request_started.send(sender=self.__class__)
+            request_started.send(sender=self.__class__)
+            self.assertIs(pool.return_value, ExportJobQueue.executor())
+        pool.assert_called_once_with(max_workers=1, thread_name_prefix='export-job')
+        pool.return_value.submit.assert_called_once_with(ExportJobQueue.work, pending.pk)
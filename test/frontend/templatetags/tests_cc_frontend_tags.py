@@ -5,7 +5,9 @@ This file contains the test cases for /export/templatetags/cc_export_tags.py
 
 from django.test import TestCase
 
-from frontend.templatetags.cc_frontend_tags import js_escape
+from base.models import Content
+
+from frontend.templatetags.cc_frontend_tags import js_escape, preview_url
 
 
 class JSEscapeTestCase(TestCase):
@@ -25,3 +27,21 @@ class JSEscapeTestCase(TestCase):
         self.assertEqual('\\\\Hello World', escaped)
         escaped = js_escape('\\Hello\nWorld')
         self.assertEqual('\\\\Hello\\nWorld', escaped)
+
+
+class PreviewURLTestCase(TestCase):
+    """Preview URL test case
+
+    Defines the test cases for the filter preview_url.
+    """
+
+    def test_preview_url(self):
+        """Test preview_url
+
+        Tests that preview_url returns the preview in the given size or the placeholder
+        """
+        content = Content(preview='uploads/previews/test.jpg')
+        self.assertEqual('/media/uploads/previews/test.jpg', preview_url(content, 'card'))
+        self.assertEqual('/media/uploads/previews/test_reading.jpg',
+                         preview_url(content, 'reading'))
+        self.assertEqual('/static/content/preview_pending.svg', preview_url(Content(), 'card'))
@@ -7,13 +7,11 @@ This file contains the test cases for /frontend/forms/content.py.
 from test import utils
 from test.test_cases import MediaTestCase
 
-from unittest import skip
-
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 
-from base.models import Content, Course
+from base.models import Content, Course, Rating
 
 import content.forms as form
 import content.models as model
@@ -58,6 +56,27 @@ class AddContentViewTestCase(MediaTestCase):
     Defines the test cases for the add content view.
     """
 
+    @classmethod
+    def setUpClass(cls):
+        """Set up class
+
+        Starts a stub server for the YouTube API.
+        """
+        super().setUpClass()
+        cls.youtube = utils.YouTubeStubServer({'9xwazD5SyVg': 'PT6S'})
+        cls.youtube_settings = override_settings(YT_API_URL=cls.youtube.url)
+        cls.youtube_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Tear down class
+
+        Stops the stub server for the YouTube API.
+        """
+        cls.youtube_settings.disable()
+        cls.youtube.close()
+        super().tearDownClass()
+
     def post_redirects_to_content(self, path, data):
         """POST redirection to content
 
@@ -214,7 +233,6 @@ class AddContentViewTestCase(MediaTestCase):
         content = model.TextField.objects.first()
         self.assertEqual(content.textfield, "Lorem ipsum")
 
-    @skip('Need Youtube API Key')
     def test_add_yt(self):
         """POST test case - add YouTube Video
 
@@ -238,7 +256,6 @@ class AddContentViewTestCase(MediaTestCase):
         content = model.YTVideoContent.objects.first()
         self.assertEqual(content.url, "https://www.youtube.com/watch?v=9xwazD5SyVg")
 
-    @skip('Need Youtube API Key')
     def test_add_yt_correct_times(self):
         """POST test case - add YouTube Video
 
@@ -265,7 +282,6 @@ class AddContentViewTestCase(MediaTestCase):
         self.assertEqual(content.start_time, "0:01")
         self.assertEqual(content.end_time, "0:05")
 
-    @skip('Need Youtube API Key')
     def test_add_yt_wrong_times(self):
         """POST test case - add YouTube Video
 
@@ -289,7 +305,6 @@ class AddContentViewTestCase(MediaTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(model.YTVideoContent.objects.count(), 0)
 
-    @skip('Need Youtube API Key')
     def test_add_yt_equal_times(self):
         """POST test case - add YouTube Video
 
@@ -313,7 +328,6 @@ class AddContentViewTestCase(MediaTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(model.YTVideoContent.objects.count(), 0)
 
-    @skip('Need Youtube API Key')
     def test_add_yt_times_longer_than_video(self):
         """POST test case - add YouTube Video
 
@@ -337,7 +351,6 @@ class AddContentViewTestCase(MediaTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(model.YTVideoContent.objects.count(), 0)
 
-    @skip('Need Youtube API Key')
     def test_add_yt_wrong_timestamps(self):
         """POST test case - add YouTube Video
 
@@ -754,3 +767,35 @@ class EditContentViewTestCase(MediaTestCase):
         md_content = model.MDContent.objects.first()
         self.assertEqual(md_content.source, 'src text')
         self.assertEqual(md_content.textfield, 'Lorem ipsum')
+
+
+class RateContentViewTestCase(MediaTestCase):
+    """Rate content test case
+
+    Defines the test cases for the rate content views.
+    """
+
+    def test_rate_json(self):
+        """POST test case - rate content JSON
+
+        Tests that the rating is stored and the new rating aggregates are returned.
+        """
+        path = reverse('frontend:rating-json', kwargs={
+            'course_id': 1, 'topic_id': 1, 'content_id': 1, 'pk': 4
+        })
+        response = self.client.post(path)
+        self.assertEqual({'rating': 4, 'average': 4, 'count': 1}, response.json())
+        self.client.post(path.replace('/4/', '/2/'))
+        self.assertEqual(2, Rating.objects.get(content_id=1).rating)
+
+    def test_rate_json_invalid(self):
+        """POST test case - rate content JSON invalid
+
+        Tests that an invalid rating and a GET request are rejected.
+        """
+        path = reverse('frontend:rating-json', kwargs={
+            'course_id': 1, 'topic_id': 1, 'content_id': 1, 'pk': 6
+        })
+        self.assertEqual(400, self.client.post(path).status_code)
+        self.assertEqual(405, self.client.get(path).status_code)
+        self.assertFalse(Rating.objects.exists())
@@ -5,9 +5,12 @@ This file contains the test cases for /frontend/views/course.py.
 import json
 
 from test.test_cases import BaseCourseViewTestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
-from base.models import CourseStructureEntry, Topic
+from base.models import Content, CourseStructureEntry, Tag, Topic
+from content.models import TextField
 from frontend.forms.course import CreateTopicForm
 
 
@@ -89,6 +92,64 @@ class CourseViewTestCase(BaseCourseViewTestCase):
         self.assertEqual(list(ids), [2, 3, 4])
 
 
+    def add_topic_with_contents(self, index, count):
+        """Add topic with contents
+
+        Adds a topic at the given index to the course structure with the given number of
+        text contents, each with a tag and a rating.
+
+        :param index: The index of the topic in the course structure
+        :type index: str
+        :param count: The number of contents to add to the topic
+        :type count: int
+        """
+        topic = Topic.objects.create(title=f"Topic {index}", category=self.cat)
+        CourseStructureEntry.objects.create(course=self.course1, index=index, topic=topic)
+        tag = Tag.objects.create(title=f"Tag {index}")
+        for _ in range(count):
+            content = Content.objects.create(author=self.user.profile, topic=topic,
+                                             type=TextField.TYPE, language='de')
+            TextField.objects.create(content=content, textfield='text', source='source')
+            content.tags.add(tag)
+            content.rate_content(user=self.user.profile, rating=4)
+
+    def count_course_view_queries(self, data=None):
+        """Count course view queries
+
+        Renders the course view and returns the number of executed queries.
+
+        :param data: The filter and sort data to post, None for a get request
+        :type data: dict[str, str]
+
+        :return: the number of executed queries
+        :rtype: int
+        """
+        with CaptureQueriesContext(connection) as context:
+            if data is None:
+                response = self.client.get(self.path)
+            else:
+                response = self.client.post(self.path, data)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_course_view_query_count_constant(self):
+        """CourseView get test case - constant number of queries
+
+        Tests that the number of queries to render the course view does not grow
+        with the number of topics and contents in the course.
+        """
+        self.add_topic_with_contents('3', 2)
+        small_course = self.count_course_view_queries()
+        small_sorted = self.count_course_view_queries({'sort': 'Rating', 'filter': 'None'})
+
+        self.add_topic_with_contents('4', 5)
+        self.add_topic_with_contents('4/1', 5)
+        self.add_topic_with_contents('5', 10)
+        self.assertEqual(small_course, self.count_course_view_queries())
+        self.assertEqual(small_sorted,
+                         self.count_course_view_queries({'sort': 'Rating', 'filter': 'None'}))
+
+
 class EditStructureViewTestView(BaseCourseViewTestCase):
     """ edit course structure test cases
 
@@ -0,0 +1,68 @@
+"""Purpose of this file
+
+This file contains the test cases for /frontend/views/courses.py.
+"""
+
+from test.test_cases import BaseCourseViewTestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from base.models import Content, Course, CourseStructureEntry, Topic
+
+
+class CourseListViewTestCase(BaseCourseViewTestCase):
+    """Course list view test case
+
+    Defines the test cases for the view CourseListView and its subclasses.
+    """
+
+    def setUp(self):
+        """Setup
+
+        Sets up the test database with contents in the topics of the course.
+        """
+        super().setUp()
+        for topic in (self.topic1, self.topic1, self.topic3):
+            Content.objects.create(author=self.user.profile, topic=topic,
+                                   type='Textfield', language='de')
+        self.user.profile.stared_courses.add(self.course1)
+
+    def test_content_count(self):
+        """CourseListView test case - content count
+
+        Tests that the number of contents and the starred flag are annotated on the
+        courses.
+        """
+        response = self.client.get(reverse('frontend:courses-sort',
+                                           kwargs={'sort': 'title-z'}))
+        course = next(course for course in response.context['courses']
+                      if course.pk == self.course1.pk)
+        self.assertEqual(3, course.content_count)
+        self.assertEqual(3, self.course1.count_contents())
+        self.assertTrue(course.starred)
+        self.assertContains(response, 'Contents: 3')
+
+    def test_query_count(self):
+        """CourseListView test case - query count
+
+        Tests that the number of queries does not depend on the number of courses.
+        """
+        paths = [reverse('frontend:courses'),
+                 reverse('frontend:category-courses', kwargs={'pk': self.cat.pk})]
+        queries = []
+        for path in paths:
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(path)
+            queries.append(len(context.captured_queries))
+        for i in range(5):
+            course = Course.objects.create(title=f'Course {i}', category=self.cat)
+            course.owners.add(self.user.profile)
+            topic = Topic.objects.create(title=f'Topic {i}', category=self.cat)
+            CourseStructureEntry.objects.create(course=course, index=1, topic=topic)
+            Content.objects.create(author=self.user.profile, topic=topic,
+                                   type='Textfield', language='de')
+        for path, expected in zip(paths, queries):
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(path)
+            self.assertEqual(expected, len(context.captured_queries))
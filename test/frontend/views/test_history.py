@@ -11,11 +11,13 @@ import reversion
 from reversion import set_comment, is_registered
 from reversion.models import Version
 
+from django.contrib.auth.models import User  # pylint: disable=imported-auth-user
 from django.urls import reverse
 
 from content.attachment.models import ImageAttachment
 from frontend.views.history import Reversion
 from base.models import Content, Course
+from base.search import SearchIndex
 
 import content.models as model
 
@@ -172,11 +174,29 @@ class ContentHistoryCompareViewTestCase(MediaTestCase):
         self.assertEqual(text1.textfield, 'Hello!')
         # topic id should not be changed
         self.assertEqual(text1.content.topic_id, 1)
+        # the search index should contain the reverted text
+        self.assertIn(text1.pk, [document.object_id for document in SearchIndex.search('hello')])
 
-    def assert_revert_to_2nd_version(self):
+    def test_textfield_revert_keeps_ratings(self):
+        """Revert version test case - Textfield ratings
+
+        Tests that a content revert keeps the rating aggregates of the content.
+        """
+        text1 = model.TextField.objects.get(pk=2)
+        text1.content.rate_content(User.objects.first().profile, 4)
+        self.client.post(self.textfield_path, {'ver_pk': '2'})
+
+        content = Content.objects.get(pk=text1.pk)
+        self.assertEqual(4.0, content.rating_average)
+        self.assertEqual(1, content.rating_count)
+
+    def assert_revert_to_2nd_version(self, versions=4):
         """assert revert to 2nd version
 
         Assert that the textfield gets reverted to the 2nd version successfully
+
+        :param versions: The expected number of versions after the revert
+        :type versions: int
         """
         # performing the revert to the 2nd version with post
         data = {'ver_pk': '6'}
@@ -188,8 +208,8 @@ class ContentHistoryCompareViewTestCase(MediaTestCase):
 
         queryset = Version.objects.get_for_object(text1)
         self.version_ids1 = queryset.values_list("pk", flat=True)
-        # the number of versions should be 4 now
-        self.assertEqual(self.version_ids1.count(), 4)
+        # the number of versions should be 4 now, unless the revert changed nothing
+        self.assertEqual(self.version_ids1.count(), versions)
         # the textfield should be identical to version 2
         self.assertEqual(text1.textfield, 'test test')
         # the source should be identical to version 2 too
@@ -207,7 +227,9 @@ class ContentHistoryCompareViewTestCase(MediaTestCase):
             text1 = model.TextField.objects.get(pk=2)
             text1.save()
             set_comment('nothing changed')
-        self.assert_revert_to_2nd_version()
+        # the revisions without changes are discarded
+        self.assertEqual(Version.objects.get_for_object(text1).count(), 2)
+        self.assert_revert_to_2nd_version(versions=2)
 
     def test_textfield_revert_many_fields(self):
         """Revert version test case - Textfield many fields changed
@@ -249,8 +271,18 @@ class ContentHistoryCompareViewTestCase(MediaTestCase):
             text1 = model.TextField.objects.get(pk=2)
             text1.save()
             set_comment('nothing changed')
-        # performing the revert to the 2nd version with post
-        data2 = {"version_id2": self.version_ids1[0], "version_id1": self.version_ids1[1]}
+        # the revision without changes is discarded
+        self.assertEqual(Version.objects.get_for_object(text1).count(), 2)
+        # change the textfield and change it back to get a version without differences
+        for textfield in ['changed', 'test test']:
+            with reversion.create_revision():
+                text1.textfield = textfield
+                text1.save()
+                set_comment('change text')
+        version_ids1 = Version.objects.get_for_object(text1).values_list("pk", flat=True)
+        self.assertEqual(version_ids1.count(), 4)
+        # performing the compare of the latest version with the 2nd version
+        data2 = {"version_id2": version_ids1[0], "version_id1": version_ids1[2]}
         response = self.client.get(self.textfield_path, data2)
         self.assert_contains_html(response,
                                   "There are no differences.")
@@ -455,10 +487,13 @@ class CourseHistoryCompareViewTestCase(BaseCourseViewTestCase):
         # the category should not be changed after revert
         self.assertEqual(self.course1.category_id, self.cat_id)
 
-    def assert_revert_to_2nd_version(self):
+    def assert_revert_to_2nd_version(self, versions=4):
         """assert contains html
 
         Assert that the course gets reverted to the 2nd version successfully
+
+        :param versions: The expected number of versions after the revert
+        :type versions: int
         """
         # performing the revert with post
         path = reverse('frontend:course-history', kwargs={
@@ -472,8 +507,8 @@ class CourseHistoryCompareViewTestCase(BaseCourseViewTestCase):
 
         self.queryset = Version.objects.get_for_object(self.course1)
         self.version_ids1 = self.queryset.values_list("pk", flat=True)
-        # the number of versions should be 4 now
-        self.assertEqual(self.version_ids1.count(), 4)
+        # the number of versions should be 4 now, unless the revert changed nothing
+        self.assertEqual(self.version_ids1.count(), versions)
         # the desc should be identical to version 2
         self.assertEqual(self.course1.description, 'test test')
         # the title should be identical to version 1
@@ -490,7 +525,9 @@ class CourseHistoryCompareViewTestCase(BaseCourseViewTestCase):
         with reversion.create_revision():
             self.course1.save()
             set_comment('nothing changed')
-        self.assert_revert_to_2nd_version()
+        # the revisions without changes are discarded
+        self.assertEqual(Version.objects.get_for_object(self.course1).count(), 2)
+        self.assert_revert_to_2nd_version(versions=2)
 
     def test_revert_course_many_changes(self):
         """Revert test cases - Many changes
@@ -533,11 +570,21 @@ class CourseHistoryCompareViewTestCase(BaseCourseViewTestCase):
         with reversion.create_revision():
             self.course1.save()
             set_comment('nothing changed')
-        # performing compare
+        # the revision without changes is discarded
+        self.assertEqual(Version.objects.get_for_object(self.course1).count(), 2)
+        # change the description and change it back to get a version without differences
+        for description in ['changed', 'test test']:
+            with reversion.create_revision():
+                self.course1.description = description
+                self.course1.save()
+                set_comment('change desc')
+        version_ids1 = self.queryset.values_list("pk", flat=True)
+        self.assertEqual(version_ids1.count(), 4)
+        # performing compare of the latest version with the 2nd version
         path = reverse('frontend:course-history', kwargs={
             'pk': self.course1.pk
         })
-        data = {"version_id2": self.version_ids1[0], "version_id1": self.version_ids1[1]}
+        data = {"version_id2": version_ids1[0], "version_id1": version_ids1[2]}
         response = self.client.get(path, data)
 
         self.assert_contains_html(response,
@@ -5,6 +5,8 @@ This file contains the test cases for /frontend/views/json.py.
 
 from test.test_cases import BaseCourseViewTestCase
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from frontend.views.json import JsonHandler
 
@@ -94,29 +96,31 @@ class ValidateTopicsTestCase(BaseCourseViewTestCase):
                      ]
         self.assertRaises(ValidationError, JsonHandler.validate_topics, json_data)
 
+    def test_validate_topics_missing_ids(self):
+        """Validate topics test case - Missing ids
+
+        Tests that the function validate_topics checks all topics with one query and the
+        validation error lists every missing id.
+        """
+        json_data = [{'value': 'Topic1 (Category)', 'id': 2},
+                     {'value': 'Topic5 (Category)', 'id': 8,
+                      'children': [{'value': 'Topic3 (Category)', 'id': 4},
+                                   {'value': 'Topic6 (Category)', 'id': 9}]},
+                     {'value': 'Topic7 (Category)', 'id': 10}]
+        with CaptureQueriesContext(connection) as context:
+            with self.assertRaises(ValidationError) as error:
+                JsonHandler.validate_topics(json_data)
+        self.assertEqual(1, len(context.captured_queries))
+        self.assertEqual('missing_topics', error.exception.code)
+        self.assertEqual([8, 9, 10], error.exception.params['ids'])
+
 
 class CleanTestCase(BaseCourseViewTestCase):
     """ test cases for JsonHandlers clean methods
 
-    Defines the test cases for JsonHandler.clean_structure_topic,
-    clean_structure_sub_topic, clean_topics
+    Defines the test cases for JsonHandler.clean_topics
     """
 
-    def add_subtopics(self):
-        """Add Subtopics
-
-        Adds 4 subtopics to topic 2
-        """
-        index = 2
-        sub_index = 2
-        title = 'Topic'
-        title_index = 4
-        for i in range(4):
-            topic = Topic.objects.create(title=f'{title}{title_index + i}', category=self.cat)
-            entry = CourseStructureEntry(course=self.course1,
-                                         index=f'{index}/{sub_index + i}', topic=topic)
-            entry.save()
-
     def test_clean_topics_no_deletion(self):
         """Clean topics test case - No deletion
 
@@ -158,77 +162,27 @@ class CleanTestCase(BaseCourseViewTestCase):
         # unused ids 1, 5, 6, 7 should be deleted, and 8 has not effect
         self.assertEqual(list(ids), [2, 3, 4])
 
-    def test_clean_structure_sub_topic_no_deletion(self):
-        """Clean structure sub topics test case - No deletion
-
-        Tests the function clean_structure_sub_topic if the result of it does not delete any sub
-        topics since the main topic does not exists topic in the course structure.
-        """
-        JsonHandler.clean_structure_sub_topic(self.course1, 2, 2)
-        # no topics of the course should be deleted
-        ids = self.course1.topics.all().values_list("pk", flat=True)
-        self.assertEqual(list(ids), [2, 3, 4])
-
-    def test_clean_structure_sub_topic_deletion_one(self):
-        """Clean structure sub topics test case - Deletion of one sub topic
-
-        Tests the function clean_structure_sub_topic if the result of it does delete one sub
-        topic since the main topic does exists topic in the course structure.
-        """
-        JsonHandler.clean_structure_sub_topic(self.course1, 2, 1)
-        # the course should only has two topics now
-        self.assertEqual(self.course1.topics.all().count(), 2)
-        self.assertEqual(list(CourseStructureEntry.objects.all().values_list("index", flat=True)),
-                         ['1', '2'])
-
-    def test_clean_structure_sub_topic_deletion_many(self):
-        """Clean structure sub topics test case - Deletion of many sub topics
+    def test_clean_topics_query_count(self):
+        """Clean topics test case - Query count
 
-        Tests clean_structure_sub_topic if more than 1 element to be deleted.
+        Tests that the number of queries of the function clean_topics does not depend on
+        the number of topics.
         """
-        self.add_subtopics()
-        # The four new sub topics should be added
-        ids_1 = self.course1.topics.all().values_list("pk", flat=True)
-        self.assertEqual(list(ids_1), [2, 3, 4, 5, 6, 7, 8])
-        JsonHandler.clean_structure_sub_topic(self.course1, 2, 2)
-        ids = self.course1.topics.all().values_list("pk", flat=True)
-        # the course should be same as before
+        # Delete the unused topic of the setup with its contents first
+        JsonHandler.clean_topics([1])
+        counts = []
+        for amount in (1, 50):
+            for i in range(amount):
+                Topic.objects.create(title=f'Unused{i}', category=self.cat)
+            ids = list(Topic.objects.values_list("pk", flat=True))
+            with CaptureQueriesContext(connection) as context:
+                JsonHandler.clean_topics(ids)
+            # The search documents are removed per deleted topic
+            counts.append(len([query for query in context.captured_queries
+                               if 'base_search' not in query['sql']]))
+        self.assertEqual(counts[0], counts[1])
+        ids = Topic.objects.all().values_list("pk", flat=True)
         self.assertEqual(list(ids), [2, 3, 4])
-        self.assertEqual(list(CourseStructureEntry.objects.all().values_list("index", flat=True)),
-                         ['1', '2', '2/1'])
-
-    def test_clean_structure_topics_no_deletion(self):
-        """Clean structure topics test case - No deletion
-
-        Tests the function clean_structure_sub_topic if the result of it does not delete any
-        topics since the topic does not exists in the course structure.
-        """
-        JsonHandler.clean_structure_topic(self.course1, 5)
-        # There should be no topics deleted
-        ids = self.course1.topics.all().values_list("pk", flat=True)
-        self.assertEqual(list(ids), [2, 3, 4])
-        self.assertIsNotNone(CourseStructureEntry.objects.get(index='2/1', topic=self.topic3))
-
-    def test_clean_structure_topics_deletion_one(self):
-        """Clean structure topics test case - Deletion of one topic
-
-        Tests the function clean_structure_sub_topic if the result of it does delete a topic
-        topics since the topic exists in the course structure.
-        """
-        JsonHandler.clean_structure_topic(self.course1, 2)
-        ids = self.course1.topics.all().values_list("pk", flat=True)
-        self.assertEqual(list(ids), [2])
-
-    def test_clean_structure_topics_deletion_many(self):
-        """Clean structure topics test case - Deletion of many topic
-
-        Tests the function clean_structure_sub_topic if the result of it does delete many topic
-        topics since the topics exists in the course structure.
-        """
-        self.add_subtopics()
-        JsonHandler.clean_structure_topic(self.course1, 2)
-        ids = self.course1.topics.all().values_list("pk", flat=True)
-        self.assertEqual(list(ids), [2])
 
 
 class JsonTestCase(BaseCourseViewTestCase):
@@ -338,10 +292,10 @@ class JsonTestCase(BaseCourseViewTestCase):
                      {'value': 'Topic1 (Category)', 'id': 2,
                      'children': [{'value': 'Topic3 (Category)', 'id': 4}]}]
         JsonHandler.json_to_topics_structure(self.course1, json_data)
-        self.assertEqual(list(CourseStructureEntry.objects.all()
+        self.assertEqual(list(CourseStructureEntry.objects.order_by("pk")
                               .values_list("index", flat=True)),
                          ['1', '2', '2/1'])
-        self.assertEqual(list(CourseStructureEntry.objects.all()
+        self.assertEqual(list(CourseStructureEntry.objects.order_by("topic_id")
                               .values_list("topic_id", flat=True)),
                          [2, 3, 4])
         self.assertIsNotNone(CourseStructureEntry.objects.get(index='2/1', topic=self.topic3))
@@ -369,10 +323,10 @@ class JsonTestCase(BaseCourseViewTestCase):
                       'children': [{'value': 'Topic3 (Category)', 'id': 4}]},
                      {'value': 'Topic1 (Category)', 'id': 2}]
         JsonHandler.json_to_topics_structure(self.course1, json_data)
-        self.assertEqual(list(CourseStructureEntry.objects.all()
+        self.assertEqual(list(CourseStructureEntry.objects.order_by("pk")
                               .values_list("index", flat=True)),
                          ['1', '2', '1/1'])
-        self.assertEqual(list(CourseStructureEntry.objects.all()
+        self.assertEqual(list(CourseStructureEntry.objects.order_by("topic_id")
                               .values_list("topic_id", flat=True)),
                          [2, 3, 4])
         self.assertIsNotNone(CourseStructureEntry.objects.get(index='1/1', topic=self.topic3))
@@ -390,10 +344,10 @@ class JsonTestCase(BaseCourseViewTestCase):
                       'children': [{'value': 'Topic3 (Category)', 'id': 4}]},
                      {'value': 'Topic4 (Category)', 'id': 5}]  # entry for a new topic
         JsonHandler.json_to_topics_structure(self.course1, json_data)
-        self.assertEqual(list(CourseStructureEntry.objects.all()
+        self.assertEqual(list(CourseStructureEntry.objects.order_by("pk")
                               .values_list("index", flat=True)),
                          ['1', '2', '2/1', '3'])
-        self.assertEqual(list(CourseStructureEntry.objects.all()
+        self.assertEqual(list(CourseStructureEntry.objects.order_by("topic_id")
                               .values_list("topic_id", flat=True)),
                          [2, 3, 4, 5])
         self.assertIsNotNone(CourseStructureEntry.objects.get(index='3', topic=topic4))
@@ -415,11 +369,60 @@ class JsonTestCase(BaseCourseViewTestCase):
                      ]
         JsonHandler.json_to_topics_structure(self.course1, json_data)
         # the new structure should subject to the new json data
-        self.assertEqual(list(CourseStructureEntry.objects.all()
+        self.assertEqual(list(CourseStructureEntry.objects.order_by("pk")
                               .values_list("index", flat=True)),
                          ['1', '2', '2/1', '1/1', '2/2'])
-        self.assertEqual(list(CourseStructureEntry.objects.all()
+        self.assertEqual(list(CourseStructureEntry.objects.order_by("topic_id")
                               .values_list("topic_id", flat=True)),
                          [2, 3, 4, 5, 6])
         self.assertIsNotNone(CourseStructureEntry.objects.get(index='2/2', topic=topic4))
         self.assertIsNotNone(CourseStructureEntry.objects.get(index='1/1', topic=topic5))
+
+    def test_json_to_topics_structure_query_count(self):
+        """Json to topics structure - Number of queries
+
+        Tests that reordering a large structure takes a constant number of queries and
+        that an unchanged structure is not written.
+        """
+        topics = Topic.objects.bulk_create(
+            [Topic(title=f'Topic{i}', category=self.cat) for i in range(4, 204)])
+        json_data = [{'id': topic.id} for topic in Topic.objects.filter(title__in=[
+            topic.title for topic in topics])]
+        JsonHandler.json_to_topics_structure(self.course1, json_data)
+        self.assertEqual(200, CourseStructureEntry.objects.filter(course=self.course1).count())
+
+        json_data.reverse()
+        json_data[0]['children'] = [{'id': self.topic1.id}]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(JsonHandler.json_to_topics_structure(self.course1, json_data))
+        self.assertLessEqual(len(queries), 6)
+        self.assertEqual(json_data[0]['id'],
+                         CourseStructureEntry.objects.get(course=self.course1, index='1').topic_id)
+        self.assertEqual(self.topic1.id, CourseStructureEntry.objects.get(course=self.course1,
+                                                                         index='1/1').topic_id)
+        self.assertFalse(JsonHandler.json_to_topics_structure(self.course1, json_data))
+
+    def test_json_to_topics_structure_string_ids(self):
+        """Json to topics structure - String ids
+
+        Tests that an unchanged structure with the ids sent as strings is not written.
+        """
+        json_data = [{'id': str(self.topic1.id)},
+                     {'id': str(self.topic2.id), 'children': [{'id': str(self.topic3.id)}]}]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(JsonHandler.json_to_topics_structure(self.course1, json_data))
+        self.assertFalse([query for query in queries.captured_queries
+                          if query['sql'].startswith(('UPDATE', 'INSERT', 'DELETE'))])
+
+    def test_json_to_topics_structure_duplicate_index(self):
+        """Json to topics structure - Duplicate index
+
+        Tests that further entries with the same index are deleted.
+        """
+        CourseStructureEntry.objects.create(course=self.course1, index='2', topic=self.topic1)
+        json_data = [{'id': self.topic1.id},
+                     {'id': self.topic2.id, 'children': [{'id': self.topic3.id}]}]
+        self.assertTrue(JsonHandler.json_to_topics_structure(self.course1, json_data))
+        self.assertEqual([('1', self.topic1.id), ('2', self.topic2.id), ('2/1', self.topic3.id)],
+                         list(CourseStructureEntry.objects.filter(course=self.course1)
+                              .order_by('index').values_list('index', 'topic_id')))
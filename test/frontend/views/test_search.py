@@ -0,0 +1,163 @@
+"""Purpose of this file
+
+This file contains the test cases for /frontend/views/search.py.
+"""
+
+from test.test_cases import BaseCourseViewTestCase
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from base.models import Content, CourseStructureEntry, Topic
+from content.models import TextField
+
+
+class SearchViewTestCase(BaseCourseViewTestCase):
+    """ test cases for SearchView
+
+    Defines the test cases for view SearchView
+    """
+    def setUp(self):
+        """Setup
+
+        Sets up the test database.
+        """
+        super().setUp()
+        self.path = reverse('frontend:search')
+        for topic in (self.topic1, self.topic2):
+            content = Content.objects.create(author=self.user.profile, topic=topic,
+                                             type='Textfield', language='de',
+                                             description=f'Notes of {topic.title}')
+            TextField.objects.create(content=content, textfield='Fourier transform')
+
+    def test_search(self):
+        """SearchView test case - results
+
+        Tests that courses, topics and contents are found.
+        """
+        response = self.client.get(self.path, {'q': 'course test'})
+        self.assertEqual([self.course1], response.context['search_data']['courses'])
+
+        response = self.client.get(self.path, {'q': 'topic3'})
+        entries = response.context['search_data']['course_structure_entries']
+        self.assertEqual([self.topic3], [entry.topic for entry in entries])
+
+        response = self.client.get(self.path, {'q': 'fourier'})
+        content_list = response.context['search_data']['content_list']
+        self.assertEqual([self.topic1, self.topic2], sorted(
+            (entry.topic for entry, _ in content_list), key=lambda topic: topic.pk))
+        self.assertContains(response, 'Notes of Topic1')
+
+    def test_search_empty(self):
+        """SearchView test case - empty query
+
+        Tests that an empty query has no results.
+        """
+        response = self.client.get(self.path)
+        self.assertEqual([], response.context['search_data']['courses'])
+        self.assertContains(response, 'No contents found')
+
+    def test_search_query_count(self):
+        """SearchView test case - query count
+
+        Tests that the number of queries does not depend on the number of results.
+        """
+        Topic.objects.create(title='Fourier', category=self.cat)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.path, {'q': 'fourier'})
+        queries = len(context.captured_queries)
+        for i in range(20):
+            Topic.objects.create(title=f'Fourier {i}', category=self.cat)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.path, {'q': 'fourier'})
+        self.assertEqual(queries, len(context.captured_queries))
+
+    @override_settings(SEARCH_RESULTS_LIMIT=2)
+    def test_search_pages(self):
+        """SearchView test case - pages
+
+        Tests that the sections are limited and the further results are shown page by page.
+        """
+        for i in range(3):
+            CourseStructureEntry.objects.create(
+                course=self.course1, index=3 + i,
+                topic=Topic.objects.create(title=f'Fourier {i}', category=self.cat))
+        response = self.client.get(self.path, {'q': 'fourier'})
+        search_data = response.context['search_data']
+        self.assertEqual(2, len(search_data['course_structure_entries']))
+        self.assertIn('topic', search_data['next_cursors'])
+        self.assertNotIn('content', search_data['next_cursors'])
+
+        response = self.client.get(self.path, {'q': 'fourier', 'section': 'topic',
+                                               'cursor': search_data['next_cursors']['topic']})
+        search_data = response.context['search_data']
+        self.assertEqual(1, len(search_data['course_structure_entries']))
+        self.assertEqual({}, search_data['next_cursors'])
+        self.assertNotContains(response, 'No contents found')
+
+
+class SearchResultsTestCase(BaseCourseViewTestCase):
+    """ test cases for search_results
+
+    Defines the test cases for the function based view search_results
+    """
+    def setUp(self):
+        """Setup
+
+        Sets up the test database.
+        """
+        super().setUp()
+        self.path = reverse('frontend:search-results')
+        for i in range(5):
+            content = Content.objects.create(author=self.user.profile, topic=self.topic1,
+                                             type='Textfield', language='de',
+                                             description=f'Notes {i}')
+            TextField.objects.create(content=content, textfield='Fourier transform')
+
+    def get(self, **params):
+        """Get
+
+        Requests the search results.
+
+        :param params: The parameters of the request
+        :type params: dict[str, Any]
+
+        :return: the decoded JSON response
+        :rtype: dict[str, Any]
+        """
+        response = self.client.get(self.path, params)
+        self.assertEqual('application/json', response['Content-Type'])
+        return response.json()
+
+    def test_pages(self):
+        """search_results test case - pages
+
+        Tests that the results are returned page by page with their links.
+        """
+        data = self.get(q='notes topic1', limit=2)
+        self.assertEqual([], data['results'])
+        self.assertIsNone(data['next'])
+
+        data = self.get(q='fourier', limit=3)
+        self.assertEqual(3, len(data['results']))
+        result = data['results'][0]
+        self.assertEqual('content', result['kind'])
+        self.assertEqual([{'course': 'Course Test',
+                           'url': reverse('frontend:content',
+                                          args=(self.course1.pk, self.topic1.pk, result['id']))}],
+                         result['links'])
+        rest = self.get(q='fourier', limit=3, cursor=data['next'])
+        self.assertEqual(2, len(rest['results']))
+        self.assertIsNone(rest['next'])
+
+    def test_section(self):
+        """search_results test case - section
+
+        Tests that the results can be restricted to a section.
+        """
+        data = self.get(q='topic1', section='topic')
+        self.assertEqual([('topic', self.topic1.pk)],
+                         [(result['kind'], result['id']) for result in data['results']])
+        self.assertEqual(reverse('frontend:course', args=(self.course1.pk,)),
+                         data['results'][0]['links'][0]['url'])
@@ -0,0 +1,70 @@
+"""Purpose of this file
+
+This file contains the test runner, which keeps the files written by the tests out of
+the repository.
+"""
+
+import os
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """Test runner
+
+    Runs the tests with the cache directories of the compiled LaTeX documents, the
+    converted Markdown contents, the precompiled preambles and the auxiliary files in a
+    temporary directory, which is deleted after the run.
+
+    :attr TestRunner.cache_dir: The temporary cache directory of the run
+    :type TestRunner.cache_dir: str or None
+    :attr TestRunner.cache_settings: The settings which point to the cache directory
+    :type TestRunner.cache_settings: override_settings or None
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Initializer
+
+        Initializes the test runner without a cache directory.
+
+        :param args: The arguments
+        :type args: Any
+        :param kwargs: The keyword arguments
+        :type kwargs: Any
+        """
+        super().__init__(*args, **kwargs)
+        self.cache_dir = None
+        self.cache_settings = None
+
+    def setup_test_environment(self, **kwargs):
+        """Setup test environment
+
+        Creates the temporary cache directory and points the settings to it.
+
+        :param kwargs: The keyword arguments
+        :type kwargs: Any
+        """
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp(prefix='cache-')
+        self.cache_settings = override_settings(
+            LATEX_CACHE_DIR=os.path.join(self.cache_dir, 'latex'),
+            MARKDOWN_CACHE_DIR=os.path.join(self.cache_dir, 'markdown'),
+            LATEX_FORMAT_DIR=os.path.join(self.cache_dir, 'latex_formats'),
+            LATEX_AUX_DIR=os.path.join(self.cache_dir, 'latex_aux'),
+        )
+        self.cache_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        """Tear down test environment
+
+        Restores the settings and deletes the temporary cache directory.
+
+        :param kwargs: The keyword arguments
+        :type kwargs: Any
+        """
+        self.cache_settings.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -5,6 +5,10 @@ This files is used as a collection utility operation for testing purpose.
 
 import tempfile
 import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
 from PIL import Image
 
@@ -89,3 +93,60 @@ def create_content(content_type):
                                   type=content_type,
                                   description='this is a description',
                                   language='de')
+
+
+class YouTubeStubServer:
+    """YouTube stub server
+
+    Local HTTP server which stands in for the videos endpoint of the YouTube API. It
+    answers with the durations of the known videos and records the requested ids.
+
+    :attr YouTubeStubServer.durations: The ISO 8601 durations of the videos by their ids
+    :type YouTubeStubServer.durations: dict[str, str]
+    :attr YouTubeStubServer.requests: The ids requested per request
+    :type YouTubeStubServer.requests: list[list[str]]
+    """
+
+    def __init__(self, durations):
+        """Initializer
+
+        Starts the server in a background thread.
+
+        :param durations: The ISO 8601 durations of the videos by their ids
+        :type durations: dict[str, str]
+        """
+        self.durations = durations
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Request handler of the stub server"""
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """Answers a request for videos"""
+                ids = parse_qs(urlparse(self.path).query)['id'][0].split(',')
+                stub.requests.append(ids)
+                items = [{'id': video_id, 'contentDetails': {'duration': stub.durations[video_id]}}
+                         for video_id in ids if video_id in stub.durations]
+                body = json.dumps({'items': items}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                """Suppresses the request logging"""
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/videos'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Close
+
+        Stops the server.
+        """
+        self.server.shutdown()
+        self.server.server_close()
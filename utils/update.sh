@@ -20,6 +20,8 @@ pip install --upgrade setuptools pip wheel
 pip install --upgrade -r requirements.txt
 
 ./manage.py migrate
+# index the data of earlier versions, which existed before the search index
+./manage.py rebuild_search_index
 ./manage.py collectstatic --noinput
 ./manage.py compilemessages --ignore=cache --ignore=venv
 